@@ -0,0 +1,104 @@
+"""
+Compares the sync read endpoints served over WSGI with their async versions
+served over ASGI, under many concurrent clients.
+
+Start both deployments against the same database, e.g.
+
+    gunicorn mybackend.wsgi:application --bind 127.0.0.1:8000 --workers 1 --threads 8
+    gunicorn mybackend.asgi:application --bind 127.0.0.1:8001 --workers 1 -k uvicorn.workers.UvicornWorker
+
+then run
+
+    python -m benchmarks.async_vs_wsgi --token <token> --concurrency 1000 --requests 20000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+# (label, sync path, async path)
+ENDPOINTS = [
+    ('get_tasks', '/api/tasks/get/?limit=100', '/api/tasks/async/get/?limit=100'),
+    ('get_tags', '/api/tags/get/', '/api/tags/async/get/'),
+]
+
+
+async def _request(host, port, path, token, timeout):
+    started = time.perf_counter()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAuthorization: {token}\r\n"
+            f"Connection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    return int(status_line.split()[1]), time.perf_counter() - started
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load(base_url, path, token, concurrency, total, timeout):
+    parts = urlsplit(base_url)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            try:
+                status, elapsed = await _request(parts.hostname, parts.port or 80, path, token, timeout)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                errors += 1
+                return
+            if status == 200:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': total,
+        'errors': errors,
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(len(latencies) / duration, 1) if duration else None,
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 2) if latencies else None,
+        'p95_ms': round(_percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
+
+
+async def main(args):
+    results = {}
+    for label, sync_path, async_path in ENDPOINTS:
+        results[label] = {
+            'wsgi': await run_load(args.wsgi_url, sync_path, args.token, args.concurrency, args.requests, args.timeout),
+            'asgi': await run_load(args.asgi_url, async_path, args.token, args.concurrency, args.requests, args.timeout),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--wsgi-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--asgi-url', default='http://127.0.0.1:8001')
+    parser.add_argument('--token', required=True)
+    parser.add_argument('--concurrency', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,209 @@
+"""
+Generates a synthetic data set for the load benchmarks: --users accounts with
+--tags tags each, and tasks spread over them with a Zipf distribution (a few
+heavy accounts and a long tail of light ones) averaging --tasks per user.
+Rows go in with COPY on PostgreSQL and executemany on SQLite. Tag counters
+and daily rollups are then rebuilt from the tasks.
+
+Users are named bench_<n>, all have the password "benchmark-password" and an
+API token, and bench_0 is staff. The same --seed gives the same data.
+
+    python -m benchmarks.datagen --users 1000 --tags 8 --tasks 200 --reset
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import time
+
+USERNAME_PREFIX = 'bench_'
+PASSWORD = 'benchmark-password'
+START_DATE = datetime.date(2025, 1, 1)
+
+# Rows per COPY / executemany call
+LOAD_CHUNK_SIZE = 50000
+
+WORDS = (
+    'meeting review report budget design release planning call email draft '
+    'invoice client project deadline sprint standup demo research lunch gym '
+    'dentist groceries travel booking refactor deploy backup interview notes '
+    'proposal contract migration roadmap launch survey training workshop'
+).split()
+TAG_NAMES = ('work', 'home', 'errands', 'health', 'finance', 'study', 'family', 'travel', 'side-project', 'admin')
+
+
+def tasks_per_user(users, mean, skew, rng):
+    """
+    Task counts for each user: Zipf weights 1/rank**skew scaled to the mean,
+    handed out in random order.
+    """
+    weights = [1 / rank ** skew for rank in range(1, users + 1)]
+    scale = mean * users / sum(weights)
+    counts = [int(round(weight * scale)) for weight in weights]
+    rng.shuffle(counts)
+    return counts
+
+
+def _sentence(rng, low, high):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+
+def _reserve_ids(cursor, table, count):
+    """
+    Ids for rows that others reference, taken before they are loaded.
+    """
+    from django.db import connection
+
+    if connection.vendor == 'postgresql':
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+            [table, count]
+        )
+        return [row[0] for row in cursor.fetchall()]
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}")
+    first = cursor.fetchone()[0] + 1
+    return list(range(first, first + count))
+
+
+def load_rows(cursor, table, columns, rows):
+    """
+    Loads an iterable of row tuples in chunks and returns how many were loaded.
+    """
+    from django.db import connection
+    from tasks.bulk import copy_rows
+
+    total = 0
+    chunk = []
+
+    def flush():
+        if connection.vendor == 'postgresql':
+            copy_rows(cursor, table, columns, chunk)
+        else:
+            cursor.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+                chunk
+            )
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == LOAD_CHUNK_SIZE:
+            flush()
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        flush()
+        total += len(chunk)
+    return total
+
+
+def reset():
+    """
+    Deletes every bench_ user and everything they own.
+    """
+    from django.db import transaction
+    from tasks.models import Task, TaskDailyRollup
+    from users.models import CustomUser
+
+    users = CustomUser.objects.filter(username__startswith=USERNAME_PREFIX)
+    with transaction.atomic():
+        # The big tables first, as single statements, so the cascade below
+        # has nothing left to collect from them
+        deleted = TaskDailyRollup.objects.filter(user__in=users).delete()[0]
+        deleted += Task.objects.filter(user__in=users).delete()[0]
+        return deleted + users.delete()[0]
+
+
+def generate(users, tags, mean_tasks, skew, days, seed):
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from tags.counters import rebuild_tag_counters
+    from tasks.bulk import TASK_INSERT_COLUMNS
+    from tasks.rollups import rebuild_rollups
+
+    rng = random.Random(seed)
+    ops = connection.ops
+    # Hashed once: every bench user logs in with the same password
+    password = make_password(PASSWORD)
+    now = ops.adapt_datetimefield_value(timezone.now())
+    dates = [ops.adapt_datefield_value(START_DATE + datetime.timedelta(days=offset)) for offset in range(days)]
+    task_counts = tasks_per_user(users, mean_tasks, skew, rng)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        user_ids = _reserve_ids(cursor, 'users_customuser', users)
+        tag_ids = _reserve_ids(cursor, 'tags_tag', users * tags)
+        # Loaded rows are version 1 of each account
+        load_rows(cursor, 'users_customuser', ('id', 'password', 'username', 'email', 'name', 'data_version', 'sync_floor', 'is_staff'), (
+            (user_id, password, f'{USERNAME_PREFIX}{n}', f'{USERNAME_PREFIX}{n}@example.com', f'Bench User {n}', 1, 0, n == 0)
+            for n, user_id in enumerate(user_ids)
+        ))
+        load_rows(cursor, 'authtoken_token', ('key', 'created', 'user_id'), (
+            ('%040x' % rng.getrandbits(160), now, user_id) for user_id in user_ids
+        ))
+        load_rows(cursor, 'tags_tag', ('id', 'user_id', 'name', 'task_count', 'completed_count', 'change_seq'), (
+            (tag_ids[n * tags + index], user_id, TAG_NAMES[index] if index < len(TAG_NAMES) else f'tag-{index}', 0, 0, 1)
+            for n, user_id in enumerate(user_ids) for index in range(tags)
+        ))
+
+        def task_rows():
+            for n, user_id in enumerate(user_ids):
+                own_tags = tag_ids[n * tags:(n + 1) * tags]
+                for _ in range(task_counts[n]):
+                    # (title, user_id, description, priority, tag_id, date_created, is_completed, change_seq)
+                    yield (
+                        _sentence(rng, 1, 4)[:50],
+                        user_id,
+                        _sentence(rng, 0, 20),
+                        rng.choice((1, 2, 2, 3)),
+                        rng.choice(own_tags) if own_tags and rng.random() < 0.7 else None,
+                        rng.choice(dates),
+                        rng.random() < 0.4,
+                        1,
+                    )
+
+        task_total = load_rows(cursor, 'tasks_task', TASK_INSERT_COLUMNS, task_rows())
+
+        rebuild_tag_counters()
+        rebuild_rollups()
+
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE users_customuser, authtoken_token, tags_tag, tasks_task, tasks_taskdailyrollup")
+
+    return {
+        'users': users,
+        'tags': users * tags,
+        'tasks': task_total,
+        'max_tasks_per_user': max(task_counts),
+        'median_tasks_per_user': sorted(task_counts)[users // 2],
+    }
+
+
+def main(args):
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mybackend.settings')
+    django.setup()
+
+    from django.db import connection
+
+    report = {'vendor': connection.vendor, 'seed': args.seed}
+    started = time.perf_counter()
+    if args.reset:
+        report['deleted_rows'] = reset()
+    report.update(generate(args.users, args.tags, args.tasks, args.skew, args.days, args.seed))
+    report['duration_s'] = round(time.perf_counter() - started, 3)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--tags', type=int, default=8, help='tags per user')
+    parser.add_argument('--tasks', type=float, default=200, help='mean tasks per user')
+    parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent of tasks per user; 0 gives every user the mean')
+    parser.add_argument('--days', type=int, default=365, help='task dates are spread over this many days from 2025-01-01')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reset', action='store_true', help='delete the bench_ users from a previous run first')
+    main(parser.parse_args())
@@ -0,0 +1,91 @@
+"""
+Runs random FilterTasksView queries for one user against PostgreSQL, once as
+plain statements and once through mybackend.prepared, and reports queries per
+second plus the prepared statement counters and server-side plan reuse
+(pg_prepared_statements, PostgreSQL 14+).
+
+    python -m benchmarks.filter_shapes --user 1 --queries 5000
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import time
+
+
+def make_filter_bodies(tag_ids, count, seed=0):
+    rng = random.Random(seed)
+    start = datetime.date(2025, 1, 1)
+    bodies = []
+    for _ in range(count):
+        body = {}
+        if tag_ids and rng.random() < 0.5:
+            body['tags'] = rng.sample(tag_ids, rng.randint(1, min(len(tag_ids), 8)))
+        if rng.random() < 0.5:
+            body['start_date'] = (start + datetime.timedelta(days=rng.randint(0, 180))).isoformat()
+        if rng.random() < 0.5:
+            body['end_date'] = (start + datetime.timedelta(days=rng.randint(180, 364))).isoformat()
+        body['completed'] = rng.choice(['true', 'false', 'all'])
+        if rng.random() < 0.3:
+            body['priority'] = rng.choice(['low', 'medium', 'high'])
+        if rng.random() < 0.5:
+            body['limit'] = 100
+        bodies.append(body)
+    return bodies
+
+
+def main(args):
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mybackend.settings')
+    django.setup()
+
+    from django.db import connection
+    from mybackend.prepared import prepared_queries, server_statement_stats
+    from tasks.filters import build_task_filters
+    from tasks.pagination import paginate_query, parse_page_params
+    from tasks.queries import TASK_LIST_SELECT
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM tags_tag WHERE user_id = %s", [args.user])
+        tag_ids = [row[0] for row in cursor.fetchall()]
+
+    queries = []
+    for body in make_filter_bodies(tag_ids, args.queries):
+        filter_sql, filter_params, _ = build_task_filters(body)
+        queries.append(paginate_query(
+            TASK_LIST_SELECT + " WHERE t.user_id = %s" + filter_sql,
+            [args.user] + filter_params,
+            parse_page_params(body)
+        ))
+
+    def run_plain(cursor, query, params):
+        cursor.execute(query, params)
+
+    report = {'queries': args.queries, 'shapes': len({query for query, _ in queries})}
+    for name, run in (('plain', run_plain), ('prepared', prepared_queries.execute)):
+        with connection.cursor() as cursor:
+            started = time.perf_counter()
+            for query, params in queries:
+                run(cursor, query, params)
+                cursor.fetchall()
+            elapsed = time.perf_counter() - started
+        report[name] = {'queries_per_s': round(args.queries / elapsed), 'mean_ms': round(elapsed / args.queries * 1000, 3)}
+
+    report['counters'] = prepared_queries.stats()
+    with connection.cursor() as cursor:
+        plans = server_statement_stats(cursor)
+    report['server'] = {
+        'statements': len(plans),
+        'generic_plans': sum(row[1] for row in plans),
+        'custom_plans': sum(row[2] for row in plans),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--user', type=int, required=True)
+    parser.add_argument('--queries', type=int, default=5000)
+    main(parser.parse_args())
@@ -0,0 +1,488 @@
+"""
+Load driver covering every endpoint in mybackend/urls.py. It runs in process
+through Django's test clients, so there's no network and no server to start:
+the full middleware stack and views run against the configured database.
+
+Run benchmarks.datagen first. Each of --concurrency threads then sends a
+weighted random mix of requests (see MIXES), each as a randomly chosen bench_
+user, until --requests have been sent in total. Writes touch the generated
+data; deletes only remove users, tags and tasks the driver created itself.
+The report, printed and optionally saved with --output for
+benchmarks.report, holds p50/p95/p99 latency, throughput and queries per
+request for each endpoint (named after its URL) and overall.
+
+    python -m benchmarks.load --mix mixed --concurrency 8 --requests 20000 --output run.json
+
+Queries per request come from the Server-Timing header set by the SQL
+instrumentation middleware, so they're missing for the async endpoints and
+with SQL_INSTRUMENTATION off. The async endpoints run on one event loop
+thread shared by all threads. The PostgreSQL-only endpoints (search, async
+reads) are skipped on other databases.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import threading
+import time
+import uuid
+
+from benchmarks.datagen import PASSWORD, START_DATE, USERNAME_PREFIX, WORDS
+from benchmarks.filter_shapes import make_filter_bodies
+from benchmarks.report import summarize
+
+# Relative weights per URL name. Every mix covers every endpoint.
+MIXES = {
+    # Mostly list, filter and stats reads; what a client polling its planner sends
+    'read': {
+        'get_tasks': 20, 'get_tasks_by_date': 15, 'filter_tasks': 15, 'search_tasks': 5, 'task_stats': 8,
+        'async_get_tasks': 5, 'async_get_tasks_by_date': 4, 'async_filter_tasks': 4, 'get_tags': 8,
+        'async_get_tags': 3, 'sync': 6, 'login': 1, 'create_task': 2, 'update_task': 2,
+        'register': 0.2, 'bulk_register': 0.05, 'delete_user': 0.1, 'bulk_create_task': 0.2,
+        'bulk_update_task': 0.2, 'delete_task': 0.5, 'create_tag': 0.3, 'delete_tags': 0.1,
+        'job_status': 0.2, 'sql_stats': 0.1, 'metrics': 0.5, 'export_tasks': 0.2, 'import_tasks': 0.05,
+    },
+    # Imports, edits and completions
+    'write': {
+        'create_task': 25, 'bulk_create_task': 3, 'update_task': 25, 'bulk_update_task': 4, 'delete_task': 8,
+        'create_tag': 3, 'delete_tags': 1, 'get_tasks': 5, 'get_tasks_by_date': 3, 'filter_tasks': 3,
+        'search_tasks': 1, 'task_stats': 2, 'async_get_tasks': 1, 'async_get_tasks_by_date': 1,
+        'async_filter_tasks': 1, 'get_tags': 2, 'async_get_tags': 1, 'sync': 4, 'login': 1, 'register': 1,
+        'bulk_register': 0.1, 'delete_user': 0.5, 'job_status': 1, 'sql_stats': 0.1, 'metrics': 0.5,
+        'export_tasks': 0.2, 'import_tasks': 0.5,
+    },
+    'mixed': {
+        'get_tasks': 12, 'get_tasks_by_date': 10, 'filter_tasks': 10, 'search_tasks': 3, 'task_stats': 5,
+        'async_get_tasks': 3, 'async_get_tasks_by_date': 2, 'async_filter_tasks': 2, 'get_tags': 5,
+        'async_get_tags': 2, 'sync': 5, 'create_task': 10, 'update_task': 10, 'delete_task': 3,
+        'bulk_create_task': 1, 'bulk_update_task': 1, 'create_tag': 1, 'delete_tags': 0.5, 'login': 2,
+        'register': 0.5, 'bulk_register': 0.05, 'delete_user': 0.2, 'job_status': 0.5, 'sql_stats': 0.1,
+        'metrics': 0.5, 'export_tasks': 0.2, 'import_tasks': 0.1,
+    },
+}
+
+POSTGRES_ONLY = {'search_tasks', 'async_get_tasks', 'async_get_tasks_by_date', 'async_filter_tasks', 'async_get_tags'}
+
+# Task ids per user kept for updates
+KNOWN_TASKS_PER_USER = 200
+BULK_CREATE_SIZE = 50
+BULK_UPDATE_SIZE = 20
+BULK_REGISTER_SIZE = 10
+IMPORT_SIZE = 100
+
+_SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries')
+
+
+class AsyncLoop:
+    """
+    One event loop thread for the async endpoints: the psycopg pool behind
+    them binds to the loop it was opened on.
+    """
+
+    def __init__(self):
+        from django.test import AsyncClient
+
+        self.client = AsyncClient(raise_request_exception=False)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def request(self, **kwargs):
+        return asyncio.run_coroutine_threadsafe(self.client.generic(**kwargs), self.loop).result()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+class UserState:
+    def __init__(self, user_id, token, username):
+        self.user_id = user_id
+        self.token = token
+        self.username = username
+        self.tag_ids = None
+        self.task_ids = None
+        self.filter_bodies = None
+        self.seq = 1
+
+
+class Session:
+    """
+    One driver thread: its client, random source, per-user state and the
+    samples it collected, by URL name.
+    """
+
+    def __init__(self, users, staff_token, async_loop, seed):
+        from django.test import Client
+
+        self.client = Client(raise_request_exception=False)
+        self.async_loop = async_loop
+        self.rng = random.Random(seed)
+        self.users = users
+        self.staff_token = staff_token
+        self.state = {}
+        # Tokens of users this session registered, tags and tasks it created, jobs it started
+        self.registered = []
+        self.created_tags = []
+        self.created_tasks = []
+        self.jobs = []
+        self.samples = {}
+
+    def call(self, name, method, path, data=None, token=None, use_async=False, content_type='application/json'):
+        kwargs = {'method': method, 'path': path}
+        if data is not None:
+            kwargs.update(data=data if isinstance(data, bytes) else json.dumps(data), content_type=content_type)
+        if token:
+            kwargs['HTTP_AUTHORIZATION'] = token
+
+        started = time.perf_counter()
+        if use_async:
+            response = self.async_loop.request(**kwargs)
+        else:
+            response = self.client.generic(**kwargs)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        elapsed = time.perf_counter() - started
+
+        match = _SERVER_TIMING_QUERIES.search(response.get('Server-Timing', ''))
+        self.samples.setdefault(name, []).append((response.status_code, elapsed, int(match.group(1)) if match else None))
+        return response
+
+    def user(self):
+        from tags.models import Tag
+        from tasks.models import Task
+
+        user_id, token, username = self.rng.choice(self.users)
+        state = self.state.get(user_id)
+        if state is None:
+            state = self.state[user_id] = UserState(user_id, token, username)
+            # Loaded outside the timed requests
+            state.tag_ids = list(Tag.objects.filter(user_id=user_id).values_list('id', flat=True))
+            state.task_ids = list(Task.objects.filter(user_id=user_id).values_list('id', flat=True)[:KNOWN_TASKS_PER_USER])
+            state.filter_bodies = make_filter_bodies(state.tag_ids, 50, seed=user_id)
+        return state
+
+    def _date(self, low=0, high=364):
+        return (START_DATE + datetime.timedelta(days=self.rng.randint(low, high))).isoformat()
+
+    def _words(self, low, high):
+        return ' '.join(self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high)))
+
+    def _new_task(self, state):
+        task = {
+            'title': self._words(1, 4)[:50],
+            'description': self._words(0, 20),
+            'priority': self.rng.choice((1, 2, 2, 3)),
+            'date_created': self._date(),
+        }
+        if state.tag_ids and self.rng.random() < 0.7:
+            task['tag_id'] = self.rng.choice(state.tag_ids)
+        return task
+
+    def _patch(self, state, task_id=None):
+        patch = {'task_id': task_id or self.rng.choice(state.task_ids)}
+        if self.rng.random() < 0.7:
+            patch['is_completed'] = self.rng.random() < 0.5
+        else:
+            patch['title'] = self._words(1, 4)[:50]
+            patch['priority'] = self.rng.choice((1, 2, 3))
+        return patch
+
+    def _date_range(self, days):
+        start = START_DATE + datetime.timedelta(days=self.rng.randint(0, 364 - days))
+        return {'start_date': start.isoformat(), 'end_date': (start + datetime.timedelta(days=days)).isoformat()}
+
+    def _register_body(self):
+        username = f'{USERNAME_PREFIX}l{uuid.uuid4().hex[:12]}'
+        return {'username': username, 'email': f'{username}@example.com', 'name': 'Load User', 'password': PASSWORD}
+
+    # Users
+
+    def op_register(self):
+        response = self.call('register', 'POST', '/api/users/register/', self._register_body())
+        if response.status_code == 201:
+            self.registered.append(response.json()['token'])
+
+    def op_bulk_register(self):
+        body = {'users': [self._register_body() for _ in range(BULK_REGISTER_SIZE)]}
+        response = self.call('bulk_register', 'POST', '/api/users/bulk-register/', body)
+        if response.status_code == 201:
+            self.registered.extend(row['token'] for row in response.json()['results'] if 'token' in row)
+
+    def op_login(self):
+        state = self.user()
+        self.call('login', 'POST', '/api/users/login/', {'username': state.username, 'password': PASSWORD})
+
+    def op_delete_user(self):
+        if not self.registered:
+            self.op_register()
+        if self.registered:
+            response = self.call('delete_user', 'DELETE', '/api/users/delete/', token=self.registered.pop())
+            if response.status_code == 202:
+                # The account's token is gone, so only staff can follow the job
+                self.jobs.append((response.json()['job_id'], self.staff_token))
+
+    # Tasks
+
+    def op_create_task(self):
+        state = self.user()
+        response = self.call('create_task', 'POST', '/api/tasks/create/', self._new_task(state), state.token)
+        if response.status_code == 201:
+            task_id = response.json()['task_id']
+            state.task_ids.append(task_id)
+            self.created_tasks.append((state, task_id))
+
+    def op_bulk_create_task(self):
+        state = self.user()
+        body = {'tasks': [self._new_task(state) for _ in range(BULK_CREATE_SIZE)]}
+        response = self.call('bulk_create_task', 'POST', '/api/tasks/bulk-create/', body, state.token)
+        if response.status_code == 201:
+            task_ids = response.json()['task_ids']
+            state.task_ids.extend(task_ids)
+            self.created_tasks.extend((state, task_id) for task_id in task_ids)
+
+    def op_update_task(self):
+        state = self.user()
+        if not state.task_ids:
+            return self.op_create_task()
+        self.call('update_task', 'POST', '/api/tasks/update/', self._patch(state), state.token)
+
+    def op_bulk_update_task(self):
+        state = self.user()
+        if not state.task_ids:
+            return self.op_bulk_create_task()
+        task_ids = self.rng.sample(state.task_ids, min(BULK_UPDATE_SIZE, len(state.task_ids)))
+        body = {'tasks': [self._patch(state, task_id) for task_id in task_ids]}
+        self.call('bulk_update_task', 'POST', '/api/tasks/bulk-update/', body, state.token)
+
+    def op_delete_task(self):
+        if not self.created_tasks:
+            self.op_create_task()
+        if self.created_tasks:
+            state, task_id = self.created_tasks.pop(self.rng.randrange(len(self.created_tasks)))
+            if task_id in state.task_ids:
+                state.task_ids.remove(task_id)
+            self.call('delete_task', 'DELETE', '/api/tasks/delete/', {'task_id': task_id}, state.token)
+
+    def _get_tasks_path(self, prefix):
+        # Most clients page; some still fetch everything
+        return f'{prefix}/get/?limit=100' if self.rng.random() < 0.8 else f'{prefix}/get/'
+
+    def op_get_tasks(self):
+        state = self.user()
+        self.call('get_tasks', 'GET', self._get_tasks_path('/api/tasks'), token=state.token)
+
+    def op_async_get_tasks(self):
+        state = self.user()
+        self.call('async_get_tasks', 'GET', self._get_tasks_path('/api/tasks/async'), token=state.token, use_async=True)
+
+    def op_get_tasks_by_date(self):
+        state = self.user()
+        self.call('get_tasks_by_date', 'POST', '/api/tasks/get-by-date/', self._date_range(30), state.token)
+
+    def op_async_get_tasks_by_date(self):
+        state = self.user()
+        self.call('async_get_tasks_by_date', 'POST', '/api/tasks/async/get-by-date/', self._date_range(30), state.token, use_async=True)
+
+    def op_filter_tasks(self):
+        state = self.user()
+        self.call('filter_tasks', 'POST', '/api/tasks/filter/', self.rng.choice(state.filter_bodies), state.token)
+
+    def op_async_filter_tasks(self):
+        state = self.user()
+        self.call('async_filter_tasks', 'POST', '/api/tasks/async/filter/', self.rng.choice(state.filter_bodies), state.token, use_async=True)
+
+    def op_search_tasks(self):
+        state = self.user()
+        body = {'query': self._words(1, 2), 'completed': self.rng.choice(['true', 'false', 'all']), 'limit': 20}
+        self.call('search_tasks', 'POST', '/api/tasks/search/', body, state.token)
+
+    def op_task_stats(self):
+        state = self.user()
+        dates = self._date_range(90)
+        self.call('task_stats', 'GET', f"/api/tasks/stats/?start_date={dates['start_date']}&end_date={dates['end_date']}", token=state.token)
+
+    def op_export_tasks(self):
+        state = self.user()
+        fmt = self.rng.choice(('ndjson', 'csv'))
+        self.call('export_tasks', 'GET', f'/api/tasks/export/?format={fmt}', token=state.token)
+
+    def op_import_tasks(self):
+        state = self.user()
+        tasks = []
+        for _ in range(IMPORT_SIZE):
+            task = self._new_task(state)
+            # Imports name their tags; each user ends up with a handful of import- tags
+            if task.pop('tag_id', None) is not None:
+                task['tag'] = f'import-{self.rng.randint(0, 4)}'
+            tasks.append(task)
+        body = b''.join(json.dumps(task).encode() + b'\n' for task in tasks)
+        self.call('import_tasks', 'POST', '/api/tasks/import/', body, state.token, content_type='application/x-ndjson')
+
+    # Tags
+
+    def op_create_tag(self):
+        state = self.user()
+        response = self.call('create_tag', 'POST', '/api/tags/create/', {'name': f'load-{uuid.uuid4().hex[:8]}'}, state.token)
+        if response.status_code == 201:
+            self.created_tags.append((state, response.json()['tag_id']))
+
+    def op_get_tags(self):
+        state = self.user()
+        self.call('get_tags', 'GET', '/api/tags/get/', token=state.token)
+
+    def op_async_get_tags(self):
+        state = self.user()
+        self.call('async_get_tags', 'GET', '/api/tags/async/get/', token=state.token, use_async=True)
+
+    def op_delete_tags(self):
+        if not self.created_tags:
+            self.op_create_tag()
+        if self.created_tags:
+            state, tag_id = self.created_tags.pop()
+            response = self.call('delete_tags', 'DELETE', '/api/tags/delete/', {'tag_id': tag_id}, state.token)
+            if response.status_code == 202:
+                self.jobs.append((response.json()['job_id'], state.token))
+
+    # Jobs, sync, diagnostics
+
+    def op_job_status(self):
+        if not self.jobs:
+            self.op_delete_tags()
+        if self.jobs:
+            job_id, token = self.rng.choice(self.jobs)
+            self.call('job_status', 'GET', f'/api/jobs/{job_id}/', token=token)
+
+    def op_sync(self):
+        state = self.user()
+        response = self.call('sync', 'GET', f'/api/sync/?since={state.seq}', token=state.token)
+        if response.status_code == 200:
+            state.seq = response.json()['seq']
+
+    def op_sql_stats(self):
+        self.call('sql_stats', 'GET', '/api/diagnostics/sql/?limit=5', token=self.staff_token)
+
+    def op_metrics(self):
+        self.call('metrics', 'GET', '/metrics', token=self.staff_token)
+
+
+def load_users(limit):
+    """
+    (user_id, token, username) of the generated bench_<n> users, and the
+    staff token.
+    """
+    from rest_framework.authtoken.models import Token
+
+    rows = Token.objects.filter(user__username__startswith=USERNAME_PREFIX).values_list(
+        'user_id', 'key', 'user__username', 'user__is_staff'
+    )
+    users, staff_token = [], None
+    for user_id, key, username, is_staff in rows:
+        # Skip the users benchmarks.load registered itself
+        if not username[len(USERNAME_PREFIX):].isdigit():
+            continue
+        users.append((user_id, key, username))
+        if is_staff:
+            staff_token = key
+    users.sort()
+    return users[:limit] if limit else users, staff_token
+
+
+def run(args):
+    from django.conf import settings
+    from django.db import connection
+
+    users, staff_token = load_users(args.users)
+    if not users:
+        raise SystemExit('No bench_ users found; run python -m benchmarks.datagen first.')
+
+    mix = dict(MIXES[args.mix])
+    skipped = []
+    if connection.vendor != 'postgresql':
+        skipped = sorted(name for name in mix if name in POSTGRES_ONLY)
+        for name in skipped:
+            del mix[name]
+    names = sorted(mix)
+    weights = [mix[name] for name in names]
+
+    async_loop = AsyncLoop()
+    sessions = [Session(users, staff_token, async_loop, args.seed + index) for index in range(args.concurrency)]
+
+    per_thread = [args.requests // args.concurrency + (1 if index < args.requests % args.concurrency else 0) for index in range(args.concurrency)]
+
+    def work(session, count):
+        from django.db import connections
+        ops = session.rng.choices(names, weights, k=count)
+        try:
+            for name in ops:
+                getattr(session, f'op_{name}')()
+        finally:
+            connections.close_all()
+
+    # Warm up connections, prepared statements and caches without recording
+    warmup = Session(users, staff_token, async_loop, args.seed - 1)
+    for name in names:
+        if name not in ('register', 'bulk_register', 'delete_user', 'login'):
+            getattr(warmup, f'op_{name}')()
+
+    threads = [threading.Thread(target=work, args=(session, count)) for session, count in zip(sessions, per_thread)]
+    started_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+    async_loop.close()
+
+    samples = {}
+    for session in sessions:
+        for name, rows in session.samples.items():
+            samples.setdefault(name, []).extend(rows)
+
+    return {
+        'config': {
+            'mix': args.mix,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'users': len(users),
+            'seed': args.seed,
+            'vendor': connection.vendor,
+            'sql_instrumentation': settings.SQL_INSTRUMENTATION,
+        },
+        'environment': {'python': platform.python_version(), 'machine': platform.machine(), 'cpus': os.cpu_count()},
+        'skipped': skipped,
+        'started_at': started_at,
+        'duration_s': round(duration, 3),
+        'total': summarize([row for rows in samples.values() for row in rows], duration),
+        'endpoints': {name: summarize(rows, duration) for name, rows in sorted(samples.items())},
+    }
+
+
+def main(args):
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mybackend.settings')
+    django.setup()
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mix', choices=sorted(MIXES), default='mixed')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=0, help='only use the first N bench users (0: all)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='also save the report to this JSON file')
+    main(parser.parse_args())
@@ -0,0 +1,111 @@
+"""
+Measures password-check throughput (logins per second, and per core) for the
+configured hasher and work factor.
+
+By default it runs verify_password() on the hashing pool with 1..N workers:
+
+    python -m benchmarks.login_throughput --workers 1 2 4 --logins 200
+
+With --url it instead drives POST /api/users/login/ on a running server and
+counts successful logins and 429 rejections:
+
+    python -m benchmarks.login_throughput --url http://127.0.0.1:8000 \\
+        --username bench --password secret --concurrency 64 --logins 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+
+def bench_pool(worker_counts, logins, password):
+    from django.conf import settings
+    from django.contrib.auth.hashers import make_password
+    from users import hashing
+
+    encoded = make_password(password)
+    results = {'hasher': settings.PASSWORD_HASHERS[0], 'work_factor': settings.PASSWORD_HASH_WORK_FACTOR or 'default'}
+    for workers in worker_counts:
+        settings.PASSWORD_HASH_WORKERS = workers
+        settings.PASSWORD_HASH_MAX_QUEUE = logins
+        hashing.shutdown()
+        # Warm up so process start-up isn't measured
+        with ThreadPoolExecutor(max_workers=workers) as threads:
+            list(threads.map(lambda _: hashing.verify_password(password, encoded), range(workers)))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers * 2) as threads:
+            outcomes = list(threads.map(lambda _: hashing.verify_password(password, encoded)[0], range(logins)))
+        duration = time.perf_counter() - started
+
+        rate = sum(outcomes) / duration
+        results[f'{workers}_workers'] = {
+            'logins_per_s': round(rate, 1),
+            'logins_per_s_per_core': round(rate / min(workers, os.cpu_count() or 1), 1),
+        }
+    hashing.shutdown()
+    return results
+
+
+async def _login(host, port, body, timeout):
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        writer.write(
+            f"POST /api/users/login/ HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    return int(status_line.split()[1])
+
+
+async def bench_http(base_url, username, password, concurrency, logins, timeout):
+    parts = urlsplit(base_url)
+    body = json.dumps({'username': username, 'password': password}).encode()
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = {}
+
+    async def one():
+        async with semaphore:
+            try:
+                status = await _login(parts.hostname, parts.port or 80, body, timeout)
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                status = 'error'
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    duration = time.perf_counter() - started
+    return {
+        'duration_s': round(duration, 3),
+        'statuses': {str(key): value for key, value in statuses.items()},
+        'logins_per_s': round(statuses.get(200, 0) / duration, 1),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--url')
+    parser.add_argument('--username', default='bench')
+    parser.add_argument('--password', default='benchmark-password')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--timeout', type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.url:
+        report = asyncio.run(bench_http(args.url, args.username, args.password, args.concurrency, args.logins, args.timeout))
+    else:
+        import django
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mybackend.settings')
+        django.setup()
+        report = bench_pool(args.workers, args.logins, args.password)
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,203 @@
+"""
+Benchmark of tasks_task as one table against the same table hash-partitioned
+on user_id (see tasks/partitioning.py). PostgreSQL only.
+
+It copies the rows in tasks_task into two scratch tables built the way
+`manage.py partition_tasks` builds its table: bench_task_plain, and
+bench_task_hash with --partitions partitions. Both get tasks_task's primary
+key, indexes and foreign keys, and autovacuum off so it doesn't run in the
+middle of a measurement. Each is then measured in turn:
+
+- list latency: p50/p95/p99 of GetTasksView's query, first page and whole
+  list, for --queries randomly chosen bench_ users;
+- insert throughput: --inserts single-row INSERTs, each its own transaction
+  like CreateTaskView, as random bench_ users;
+- vacuum: after --churn of the rows are updated the way task updates do it,
+  the time to VACUUM the whole table and, partitioned, the slowest single
+  partition, which is what autovacuum works through at once.
+
+Run benchmarks.datagen first; 100M rows is e.g. --users 500000 --tasks 200.
+The scratch tables take about twice the disk space of tasks_task and are
+dropped at the end unless --keep is given.
+
+    python -m benchmarks.partitioning --partitions 16 --output partitioning.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import time
+
+from benchmarks.datagen import START_DATE, USERNAME_PREFIX
+from benchmarks.report import percentile
+
+PLAIN_TABLE = 'bench_task_plain'
+HASH_TABLE = 'bench_task_hash'
+
+
+def _timed(cursor, sql, params=None):
+    started = time.perf_counter()
+    cursor.execute(sql, params)
+    return time.perf_counter() - started
+
+
+def _latencies(values):
+    values = sorted(values)
+    return {
+        'p50_ms': round(percentile(values, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(values, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(values, 0.99) * 1000, 2),
+    }
+
+
+def build(cursor, table, partition_count):
+    """
+    Creates table from tasks_task and returns the load and index build times.
+    """
+    from tasks.partitioning import TASK_COLUMNS, add_foreign_keys, create_indexes, create_table, partitions
+
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    cursor.execute(f"DROP SEQUENCE IF EXISTS {table}_id_seq")
+    create_table(cursor, table, partition_count)
+    for target in partitions(cursor, table) or [table]:
+        cursor.execute(f"ALTER TABLE {target} SET (autovacuum_enabled = false)")
+
+    columns = ', '.join(TASK_COLUMNS)
+    load_s = _timed(cursor, f"INSERT INTO {table} ({columns}) SELECT {columns} FROM tasks_task")
+    started = time.perf_counter()
+    create_indexes(cursor, table)
+    add_foreign_keys(cursor, table)
+    index_s = time.perf_counter() - started
+
+    cursor.execute(f"SELECT setval('{table}_id_seq', (SELECT COALESCE(MAX(id), 1) FROM {table}))")
+    # Start from a vacuumed, analyzed table, as autovacuum would leave it
+    cursor.execute(f"VACUUM (ANALYZE) {table}")
+    return {'load_s': round(load_s, 2), 'index_and_fk_s': round(index_s, 2)}
+
+
+def total_size_mb(cursor, table):
+    cursor.execute("SELECT SUM(pg_total_relation_size(relid)) FROM pg_partition_tree(%s)", [table])
+    return round(cursor.fetchone()[0] / 1024 / 1024, 1)
+
+
+def measure_lists(cursor, table, user_ids, queries, seed):
+    from tasks.pagination import DEFAULT_PAGE_SIZE, Page, paginate_query
+    from tasks.queries import TASK_LIST_SELECT
+
+    select = TASK_LIST_SELECT.replace('FROM tasks_task t', f'FROM {table} t') + " WHERE t.user_id = %s"
+    rng = random.Random(seed)
+    results = {}
+    for name, page in (('list_page', Page(DEFAULT_PAGE_SIZE, None)), ('list_all', Page(None, None))):
+        samples = []
+        for user_id in [rng.choice(user_ids) for _ in range(queries)]:
+            query, params = paginate_query(select, [user_id], page)
+            started = time.perf_counter()
+            cursor.execute(query, params)
+            cursor.fetchall()
+            samples.append(time.perf_counter() - started)
+        results[name] = _latencies(samples)
+    return results
+
+
+def measure_inserts(cursor, table, user_ids, inserts, seed):
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    for n in range(inserts):
+        # Autocommit: one transaction per insert
+        cursor.execute(f"""
+            INSERT INTO {table} (title, user_id, description, priority, tag_id, date_created, is_completed, change_seq)
+            VALUES (%s, %s, %s, %s, NULL, %s, false, 1)
+        """, [f'Inserted {n}', rng.choice(user_ids), '', rng.choice((1, 2, 3)),
+              START_DATE + datetime.timedelta(days=rng.randrange(365))])
+    duration = time.perf_counter() - started
+    return {'inserts': inserts, 'inserts_per_s': round(inserts / duration, 1)}
+
+
+def measure_vacuum(cursor, table, churn):
+    from tasks.partitioning import partitions
+
+    # Flipping an indexed column rules out HOT updates, like a task being completed
+    updated_s = _timed(cursor, f"""
+        UPDATE {table} SET is_completed = NOT is_completed, change_seq = change_seq + 1
+        WHERE id %% %s = 0
+    """, [max(1, round(1 / churn))])
+    updated = cursor.rowcount
+    times = [_timed(cursor, f"VACUUM {target}") for target in partitions(cursor, table) or [table]]
+    return {
+        'rows_updated': updated,
+        'update_s': round(updated_s, 2),
+        'vacuum_s': round(sum(times), 2),
+        'vacuum_max_partition_s': round(max(times), 2),
+    }
+
+
+def run(partition_count, queries, inserts, churn, seed, keep):
+    from django.db import connection
+    from users.models import CustomUser
+
+    user_ids = list(CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).order_by('id').values_list('id', flat=True))
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM tasks_task")
+        rows = cursor.fetchone()[0]
+    if not user_ids:
+        raise SystemExit('No bench_ users; run benchmarks.datagen first.')
+
+    layouts = {}
+    for name, table, count in (('plain', PLAIN_TABLE, None), ('hash', HASH_TABLE, partition_count)):
+        # Autocommit throughout: VACUUM can't run in a transaction
+        with connection.cursor() as cursor:
+            result = build(cursor, table, count)
+            result['size_mb'] = total_size_mb(cursor, table)
+            # Warm the cache the same way for both before measuring
+            measure_lists(cursor, table, user_ids, min(queries, 200), seed + 1)
+            result.update(measure_lists(cursor, table, user_ids, queries, seed))
+            result.update(measure_inserts(cursor, table, user_ids, inserts, seed))
+            result.update(measure_vacuum(cursor, table, churn))
+            if not keep:
+                cursor.execute(f"DROP TABLE {table}")
+        layouts[name] = result
+
+    return {
+        'config': {
+            'rows': rows,
+            'users': len(user_ids),
+            'partitions': partition_count,
+            'queries': queries,
+            'inserts': inserts,
+            'churn': churn,
+            'seed': seed,
+            'server_version': connection.pg_version,
+        },
+        'layouts': layouts,
+    }
+
+
+def main(args):
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mybackend.settings')
+    django.setup()
+
+    from django.db import connection
+
+    if connection.vendor != 'postgresql':
+        raise SystemExit('The partitioning benchmark needs PostgreSQL.')
+
+    report = run(args.partitions, args.queries, args.inserts, args.churn, args.seed, args.keep)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--partitions', type=int, default=16)
+    parser.add_argument('--queries', type=int, default=2000, help='list queries per layout and shape')
+    parser.add_argument('--inserts', type=int, default=20000, help='single-row inserts per layout')
+    parser.add_argument('--churn', type=float, default=0.05, help='fraction of rows updated before vacuuming')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keep', action='store_true', help='keep the scratch tables')
+    parser.add_argument('--output', help='also save the report to this file')
+    main(parser.parse_args())
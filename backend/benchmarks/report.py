@@ -0,0 +1,116 @@
+"""
+Summaries for the load benchmark, and comparison of two saved reports.
+
+benchmarks.load saves a JSON report with p50/p95/p99 latency, throughput and
+queries per request for each endpoint and overall. To check a run against a
+baseline:
+
+    python -m benchmarks.report baseline.json current.json --threshold 0.10
+
+This lists every endpoint whose p95/p99 latency or queries per request grew,
+or whose throughput fell, by more than the threshold. It exits with status 1
+if there are any, so it can gate CI. Runs are only comparable on the same
+data: regenerate it with benchmarks.datagen --reset and the same --seed, and
+keep the load options, before each run.
+"""
+
+import argparse
+import json
+import sys
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(samples, duration):
+    """
+    samples are (status, seconds, queries) tuples; queries is None when the
+    response didn't report it.
+    """
+    latencies = sorted(seconds for _, seconds, _ in samples)
+    statuses = {}
+    for status, _, _ in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(1 for status, _, _ in samples if status >= 500)
+    queries = [count for _, _, count in samples if count is not None]
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'statuses': statuses,
+        'throughput_rps': round(len(samples) / duration, 1) if duration else None,
+        'mean_ms': ms(sum(latencies) / len(latencies)) if latencies else None,
+        'p50_ms': ms(percentile(latencies, 0.50)),
+        'p95_ms': ms(percentile(latencies, 0.95)),
+        'p99_ms': ms(percentile(latencies, 0.99)),
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+# (field, True if higher is worse)
+COMPARED_FIELDS = (
+    ('p95_ms', True),
+    ('p99_ms', True),
+    ('queries_per_request', True),
+    ('throughput_rps', False),
+)
+
+
+def compare(baseline, current, threshold, min_requests=100):
+    """
+    Returns the regressions of current against baseline, one dict per endpoint
+    and field whose relative change exceeds threshold in the bad direction.
+    Endpoints with fewer than min_requests samples in either run are too noisy
+    to compare and are left out.
+    """
+    regressions = []
+    names = ['total'] + sorted(set(baseline['endpoints']) & set(current['endpoints']))
+    for name in names:
+        before = baseline['total'] if name == 'total' else baseline['endpoints'][name]
+        after = current['total'] if name == 'total' else current['endpoints'][name]
+        if min(before['requests'], after['requests']) < min_requests:
+            continue
+        for field, higher_is_worse in COMPARED_FIELDS:
+            # Throughput per endpoint only follows the mix, so it's compared overall
+            if field == 'throughput_rps' and name != 'total':
+                continue
+            old, new = before.get(field), after.get(field)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append({'endpoint': name, 'field': field, 'baseline': old, 'current': new, 'change': round(change, 3)})
+    return regressions
+
+
+def main(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    if baseline.get('config') != current.get('config'):
+        print('warning: the runs used different settings', file=sys.stderr)
+
+    regressions = compare(baseline, current, args.threshold, args.min_requests)
+    print(json.dumps({'threshold': args.threshold, 'regressions': regressions}, indent=2))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative change counted as a regression')
+    parser.add_argument('--min-requests', type=int, default=100, help='skip endpoints with fewer samples than this')
+    sys.exit(main(parser.parse_args()))
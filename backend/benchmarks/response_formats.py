@@ -0,0 +1,45 @@
+"""
+Compares the task list response formats: payload size (raw and gzipped) and
+server encode time for the row-of-objects JSON, columnar JSON and MessagePack.
+
+    python -m benchmarks.response_formats --rows 10000 --repeat 20
+"""
+
+import argparse
+import gzip
+import json
+import os
+
+from benchmarks.row_encoding import best_time, make_rows
+
+
+def main(args):
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mybackend.settings')
+    django.setup()
+
+    from tasks.renderers import TASK_LIST_RENDERERS
+    from tasks.serializers import serialize_task
+
+    rows = make_rows(args.rows)
+    report = {'rows': args.rows}
+    for renderer_class in TASK_LIST_RENDERERS:
+        if renderer_class.format == 'api':
+            continue
+        renderer = renderer_class()
+        encode = lambda: renderer.render({'tasks': [serialize_task(row) for row in rows]}, renderer.media_type)
+        payload = encode()
+        seconds = best_time(encode, args.repeat)
+        report[renderer.media_type] = {
+            'bytes': len(payload),
+            'gzip_bytes': len(gzip.compress(payload)),
+            'encode_ms': round(seconds * 1000, 2),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,106 @@
+"""
+Microbenchmark for task row encoding: cursor tuples -> JSON response bytes.
+
+"before" is the previous path: a per-row dict with strftime dates (and, for
+the filter view, dict(Task.PRIORITY_CHOICES) rebuilt per row), encoded by DRF's
+JSONRenderer. "after" is tasks.serializers plus ORJSONRenderer.
+
+    python -m benchmarks.row_encoding --rows 10000 --repeat 20
+"""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import time
+
+
+def make_rows(count):
+    rng = random.Random(0)
+    start = datetime.date(2025, 1, 1)
+    tags = [(None, None)] + [(index, f'tag-{index}') for index in range(1, 9)]
+    rows = []
+    for task_id in range(1, count + 1):
+        tag_id, tag_name = rng.choice(tags)
+        rows.append((
+            task_id,
+            f'Task {task_id}',
+            'Some description of the task ' * rng.randint(0, 3),
+            rng.randint(1, 3),
+            tag_id,
+            tag_name,
+            start + datetime.timedelta(days=rng.randint(0, 364)),
+            rng.random() < 0.4,
+        ))
+    return rows
+
+
+def legacy_serialize_task(task):
+    return {
+        'id': task[0],
+        'title': task[1],
+        'description': task[2],
+        'priority': task[3],
+        'tag_id': task[4],
+        'tag_name': task[5] or "No Tag",
+        'date_created': task[6].strftime("%Y-%m-%d"),
+        'is_completed': task[7]
+    }
+
+
+def legacy_serialize_filtered_task(task):
+    from tasks.models import Task
+
+    row = legacy_serialize_task(task)
+    row['priority'] = dict(Task.PRIORITY_CHOICES).get(task[3], 'Unknown')
+    return row
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(args):
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mybackend.settings')
+    django.setup()
+
+    from rest_framework.renderers import JSONRenderer
+    from mybackend.renderers import ORJSONRenderer
+    from tasks.serializers import serialize_filtered_task, serialize_task
+
+    rows = make_rows(args.rows)
+    before_renderer, after_renderer = JSONRenderer(), ORJSONRenderer()
+
+    cases = {
+        'get': (legacy_serialize_task, serialize_task),
+        'filter': (legacy_serialize_filtered_task, serialize_filtered_task),
+    }
+    report = {'rows': args.rows}
+    for name, (before_row, after_row) in cases.items():
+        before = lambda: before_renderer.render({'tasks': [before_row(row) for row in rows]})
+        after = lambda: after_renderer.render({'tasks': [after_row(row) for row in rows]})
+        # Both paths must produce the same document
+        assert json.loads(before()) == json.loads(after())
+
+        before_s, after_s = best_time(before, args.repeat), best_time(after, args.repeat)
+        report[name] = {
+            'before_rows_per_s': round(args.rows / before_s),
+            'after_rows_per_s': round(args.rows / after_s),
+            'speedup': round(before_s / after_s, 2),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    main(parser.parse_args())
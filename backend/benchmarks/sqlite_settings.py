@@ -0,0 +1,32 @@
+"""
+Settings for running the benchmarks against a local SQLite file instead of
+PostgreSQL:
+
+    export DJANGO_SETTINGS_MODULE=benchmarks.sqlite_settings
+    python manage.py migrate
+    python -m benchmarks.datagen --users 100 --reset
+    python -m benchmarks.load --mix mixed --requests 2000
+
+The PostgreSQL-only endpoints (search, async reads) are skipped. SQLite locks
+the whole file on write, so keep --concurrency low for write-heavy mixes.
+"""
+
+import os
+
+# mybackend.settings requires the PostgreSQL connection variables
+for name in ('DB_NAME', 'DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_PORT'):
+    os.environ.setdefault(name, '')
+
+from mybackend.settings import *  # noqa: E402,F401,F403
+from mybackend.settings import BASE_DIR  # noqa: E402
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('BENCH_SQLITE_PATH', str(BASE_DIR / 'bench.sqlite3')),
+        # Writers wait for the file lock instead of failing after 5 seconds
+        'OPTIONS': {'timeout': 60},
+    }
+}
+DATABASE_REPLICAS = []
+PUSH_BACKEND = ''
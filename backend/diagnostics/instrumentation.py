@@ -0,0 +1,215 @@
+"""
+Per-request SQL instrumentation.
+
+SQLInstrumentationMiddleware installs a connection.execute_wrapper on every
+database alias for the duration of a request, so raw cursor SQL and ORM calls
+are measured alike. For each request it counts queries, database time and rows
+returned, adds them to per-view totals for the process and reports them in a
+`Server-Timing: db;dur=...` response header.
+
+A query slower than SLOW_QUERY_MS is saved to the SlowQuery ring buffer when
+the view returns. On PostgreSQL, a read that ran outside a transaction is first
+run again under EXPLAIN (ANALYZE, BUFFERS) and its plan saved with it. That doubles the cost of
+an already slow query, so at most one EXPLAIN runs per
+SLOW_QUERY_EXPLAIN_INTERVAL seconds per process.
+
+Only requests served over WSGI are measured. Under ASGI, sync views run in
+worker threads the middleware can't wrap, and the async views query through
+the psycopg pool, not Django's connections. Rows fetched while a streaming
+response is being sent aren't counted either.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+
+# Statements safe to run again under EXPLAIN ANALYZE. Prepared statements from
+# mybackend.prepared are all reads.
+_EXPLAINABLE_PREFIXES = ('SELECT', 'EXECUTE SMARTPLANNER_Q')
+
+# Slow queries kept per request; the rest are only counted
+MAX_SLOW_QUERIES_PER_REQUEST = 10
+
+_view_totals = defaultdict(lambda: [0, 0, 0.0, 0])
+_totals_lock = threading.Lock()
+_last_explain = 0.0
+_explain_lock = threading.Lock()
+
+
+class QueryRecorder:
+    """
+    execute_wrapper callable collecting one request's query count, time and
+    rows, and its slow queries. Those are explained and saved by
+    save_slow_queries() once the request is done, not while the statement that
+    ran them may still be open on the connection.
+    """
+
+    def __init__(self, view):
+        self.view = view
+        self.queries = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            result = execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.seconds += elapsed
+
+        # Only statements returning rows; rowcount is -1 when the driver doesn't
+        # know yet (sqlite SELECTs, named cursors)
+        cursor = context['cursor']
+        if cursor.description is not None and cursor.rowcount > 0:
+            self.rows += cursor.rowcount
+
+        if elapsed * 1000 >= settings.SLOW_QUERY_MS and not many and len(self.slow_queries) < MAX_SLOW_QUERIES_PER_REQUEST:
+            db = context['connection']
+            self.slow_queries.append((db.alias, sql, params, elapsed, _explain_note(db, sql)))
+        return result
+
+
+def _explain_note(db, sql):
+    """
+    Returns why a query can't be run again under EXPLAIN ANALYZE, or '' if it can.
+    """
+    if db.vendor != 'postgresql':
+        return 'EXPLAIN needs PostgreSQL'
+    if not sql.lstrip().upper().startswith(_EXPLAINABLE_PREFIXES):
+        return 'not a read'
+    if db.in_atomic_block:
+        # Its transaction may have written or locked what it read
+        return 'inside a transaction'
+    return ''
+
+
+def _explain(db, sql, params):
+    """
+    Returns (plan, note).
+    """
+    global _last_explain
+
+    with _explain_lock:
+        now = time.monotonic()
+        if now - _last_explain < settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+            return None, 'rate limited'
+        _last_explain = now
+
+    try:
+        with db.cursor() as cursor:
+            cursor.execute('EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+    except DatabaseError as e:
+        return None, f'EXPLAIN failed: {e}'[:200]
+    return plan, ''
+
+
+def save_slow_queries(recorder):
+    """
+    Explains (where possible) and saves a finished request's slow queries, then
+    drops the entries that fell out of the ring buffer.
+    """
+    from diagnostics.models import SlowQuery
+
+    for alias, sql, params, seconds, note in recorder.slow_queries:
+        plan = None
+        if not note:
+            plan, note = _explain(connections[alias], sql, params)
+        try:
+            entry = SlowQuery.objects.create(
+                view=recorder.view[:100], alias=alias, duration_ms=round(seconds * 1000, 3),
+                sql=sql, plan=plan, plan_note=note,
+            )
+            SlowQuery.objects.filter(id__lte=entry.id - settings.SLOW_QUERY_BUFFER_SIZE).delete()
+        except DatabaseError:
+            # Never fail the request over diagnostics
+            pass
+
+
+def record_view(view, recorder):
+    with _totals_lock:
+        totals = _view_totals[view]
+        totals[0] += 1
+        totals[1] += recorder.queries
+        totals[2] += recorder.seconds
+        totals[3] += recorder.rows
+
+
+def view_stats():
+    """
+    Per-view totals for this process, slowest total database time first.
+    """
+    with _totals_lock:
+        items = [(view, list(totals)) for view, totals in _view_totals.items()]
+    stats = []
+    for view, (requests, queries, seconds, rows) in sorted(items, key=lambda item: -item[1][2]):
+        stats.append({
+            'view': view,
+            'requests': requests,
+            'queries': queries,
+            'db_ms': round(seconds * 1000, 3),
+            'rows': rows,
+            'queries_per_request': round(queries / requests, 2),
+            'db_ms_per_request': round(seconds * 1000 / requests, 3),
+        })
+    return stats
+
+
+def reset_view_stats():
+    with _totals_lock:
+        _view_totals.clear()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is not None:
+        return match.view_name or match.route
+    return 'unresolved'
+
+
+class SQLInstrumentationMiddleware:
+    """
+    Measures the SQL each request runs. In an async (ASGI) stack it passes
+    requests straight through.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SQL_INSTRUMENTATION:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.get_response(request)
+
+        recorder = request.sql_recorder = QueryRecorder('unresolved')
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        record_view(recorder.view, recorder)
+        if recorder.slow_queries:
+            save_slow_queries(recorder)
+        response['Server-Timing'] = f'db;dur={recorder.seconds * 1000:.2f};desc="{recorder.queries} queries, {recorder.rows} rows"'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        recorder = getattr(request, 'sql_recorder', None)
+        if recorder is not None:
+            recorder.view = _view_name(request)
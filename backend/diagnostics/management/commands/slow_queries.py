@@ -0,0 +1,39 @@
+import json
+
+from django.core.management.base import BaseCommand
+from diagnostics.models import SlowQuery
+
+
+class Command(BaseCommand):
+    help = "Lists the slow queries captured by the SQL instrumentation, newest first."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help="Number of queries to show.")
+        parser.add_argument('--view', help="Only show queries from this view (URL name).")
+        parser.add_argument('--plans', action='store_true', help="Print each query's EXPLAIN plan.")
+        parser.add_argument('--clear', action='store_true', help="Empty the buffer instead.")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Removed {deleted} slow queries."))
+            return
+
+        queries = SlowQuery.objects.order_by('-id')
+        if options['view']:
+            queries = queries.filter(view=options['view'])
+
+        for query in queries[:options['limit']]:
+            self.stdout.write(
+                f"{query.captured_at:%Y-%m-%d %H:%M:%S} {query.view} ({query.alias}) {query.duration_ms:.1f} ms"
+            )
+            self.stdout.write("    " + " ".join(query.sql.split()))
+            if query.plan is not None:
+                plan = query.plan[0]
+                self.stdout.write(
+                    f"    planning {plan.get('Planning Time', 0):.2f} ms, execution {plan.get('Execution Time', 0):.2f} ms"
+                )
+                if options['plans']:
+                    self.stdout.write(json.dumps(query.plan, indent=2))
+            else:
+                self.stdout.write(f"    no plan: {query.plan_note}")
@@ -0,0 +1,191 @@
+"""
+Prometheus metrics for the API, served in the text exposition format at /metrics.
+
+MetricsMiddleware observes every request, labelled by URL name:
+
+- smartplanner_http_request_duration_seconds: latency histogram (view, method)
+- smartplanner_http_responses_total: responses by status code (view, method, status)
+- smartplanner_http_response_size_bytes: body size histogram (view), not for streams
+- smartplanner_db_time_seconds / smartplanner_db_queries: database time and query
+  count per request (view), from the SQL instrumentation middleware
+- smartplanner_rows_serialized: tasks or tags returned per list call (view)
+
+Under gunicorn each worker is its own process. gunicorn.conf.py points
+PROMETHEUS_MULTIPROC_DIR at a shared directory; every process then writes its
+values to memory-mapped files there, and /metrics sums them across processes.
+Without that variable, /metrics reports the serving process only.
+
+/metrics is limited to METRICS_ALLOWED_NETWORKS (loopback by default, for a
+scraper on the same host) and to requests with a staff token, the same check
+as the diagnostics endpoints.
+
+prometheus_client is optional: without it the middleware is skipped and
+/metrics answers 501.
+"""
+
+import ipaddress
+import os
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from rest_framework.exceptions import AuthenticationFailed
+from users.authentication import CachedTokenAuthentication
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Histogram, multiprocess
+except ImportError:
+    prometheus_client = None
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+if prometheus_client is not None:
+    REQUEST_DURATION = Histogram(
+        'smartplanner_http_request_duration_seconds', 'Request latency.', ['view', 'method']
+    )
+    RESPONSES = Counter(
+        'smartplanner_http_responses', 'Responses by status code.', ['view', 'method', 'status']
+    )
+    RESPONSE_SIZE = Histogram(
+        'smartplanner_http_response_size_bytes', 'Response body size.', ['view'], buckets=SIZE_BUCKETS
+    )
+    DB_TIME = Histogram(
+        'smartplanner_db_time_seconds', 'Database time per request.', ['view']
+    )
+    DB_QUERIES = Histogram(
+        'smartplanner_db_queries', 'Queries per request.', ['view'], buckets=QUERY_BUCKETS
+    )
+    ROWS_SERIALIZED = Histogram(
+        'smartplanner_rows_serialized', 'Tasks or tags returned per list call.', ['view'], buckets=ROW_BUCKETS
+    )
+
+
+class _Children(dict):
+    """
+    Label values -> metric child. .labels() takes the metric's lock on every
+    call; a hit here is a plain dict lookup, so each observation only takes
+    the lock of the value it updates.
+    """
+
+    def __init__(self, metric):
+        super().__init__()
+        self.metric = metric
+
+    def __missing__(self, labels):
+        child = self[labels] = self.metric.labels(*labels)
+        return child
+
+
+if prometheus_client is not None:
+    _request_duration = _Children(REQUEST_DURATION)
+    _responses = _Children(RESPONSES)
+    _response_size = _Children(RESPONSE_SIZE)
+    _db_time = _Children(DB_TIME)
+    _db_queries = _Children(DB_QUERIES)
+    _rows_serialized = _Children(ROWS_SERIALIZED)
+
+
+def _view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    # Unmatched paths share one label, so 404 probes can't add series
+    return (match.url_name or match.route) if match is not None else 'unresolved'
+
+
+def _rows(response):
+    data = getattr(response, 'data', None)
+    if isinstance(data, dict):
+        for key in ('tasks', 'tags'):
+            if isinstance(data.get(key), list):
+                return len(data[key])
+    return None
+
+
+def observe(request, response, seconds):
+    view = _view_label(request)
+    method = request.method
+
+    _request_duration[view, method].observe(seconds)
+    _responses[view, method, str(response.status_code)].inc()
+    if not response.streaming:
+        _response_size[(view,)].observe(len(response.content))
+
+    recorder = getattr(request, 'sql_recorder', None)
+    if recorder is not None:
+        _db_time[(view,)].observe(recorder.seconds)
+        _db_queries[(view,)].observe(recorder.queries)
+
+    rows = _rows(response)
+    if rows is not None:
+        _rows_serialized[(view,)].observe(rows)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status, size, DB time and rows for each request. Goes first
+    in MIDDLEWARE, so the latency covers the rest of the stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if prometheus_client is None or not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self._acall(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        observe(request, response, time.perf_counter() - started)
+        return response
+
+    async def _acall(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        observe(request, response, time.perf_counter() - started)
+        return response
+
+
+def _allowed_address(request):
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWED_NETWORKS)
+
+
+def metrics_view(request):
+    """
+    Serves the metrics of every worker process in the Prometheus text format,
+    to allowed addresses and staff users.
+    """
+    if not _allowed_address(request):
+        try:
+            authenticated = CachedTokenAuthentication().authenticate(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({'error': str(e.detail)}, status=401)
+        if authenticated is None:
+            return JsonResponse({'error': 'Authorization token is required'}, status=400)
+        if not authenticated[0].is_staff:
+            return JsonResponse({'error': 'Staff access required'}, status=403)
+
+    if prometheus_client is None:
+        return JsonResponse({'error': 'Metrics require the prometheus_client package'}, status=501)
+
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return HttpResponse(prometheus_client.generate_latest(registry), content_type=prometheus_client.CONTENT_TYPE_LATEST)
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.18 on 2026-10-18 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('captured_at', models.DateTimeField(auto_now_add=True)),
+                ('view', models.CharField(max_length=100)),
+                ('alias', models.CharField(max_length=50)),
+                ('duration_ms', models.FloatField()),
+                ('sql', models.TextField()),
+                ('plan', models.JSONField(blank=True, null=True)),
+                ('plan_note', models.CharField(blank=True, default='', max_length=200)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import models
+
+class SlowQuery(models.Model):
+    """
+    A query that took longer than SLOW_QUERY_MS, kept in a ring buffer of the
+    SLOW_QUERY_BUFFER_SIZE most recent ones (see diagnostics/instrumentation.py).
+    """
+    captured_at = models.DateTimeField(auto_now_add=True)
+    # URL name of the view that ran it
+    view = models.CharField(max_length=100)
+    alias = models.CharField(max_length=50)
+    duration_ms = models.FloatField()
+    sql = models.TextField()
+    # EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) output; null when the query wasn't explained
+    plan = models.JSONField(null=True, blank=True)
+    # Why there is no plan (a write, inside a transaction, rate limited, ...)
+    plan_note = models.CharField(max_length=200, blank=True, default='')
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import SQLStatsView
+
+urlpatterns = [
+    path('sql/', SQLStatsView.as_view(), name='sql_stats'),
+]
@@ -0,0 +1,49 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from diagnostics.instrumentation import view_stats
+from diagnostics.models import SlowQuery
+from mybackend.prepared import prepared_queries
+from tasks.cache import task_result_cache
+from users.authentication import token_cache
+
+MAX_SLOW_QUERIES = 100
+
+class SQLStatsView(APIView):
+    def get(self, request):
+        """
+        Handles GET requests from staff users for this process's per-view SQL
+        totals and cache counters, and the most recent slow queries with their plans.
+        """
+        if request.auth is None:
+            return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not request.user.is_staff:
+            return Response({'error': 'Staff access required'}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), MAX_SLOW_QUERIES)
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            return Response({'error': 'Limit must be a positive integer.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        slow_queries = [{
+            'captured_at': query.captured_at,
+            'view': query.view,
+            'alias': query.alias,
+            'duration_ms': query.duration_ms,
+            'sql': query.sql,
+            'plan': query.plan,
+            'plan_note': query.plan_note,
+        } for query in SlowQuery.objects.order_by('-id')[:limit]]
+
+        return Response({
+            'views': view_stats(),
+            'caches': {
+                'tokens': token_cache.stats(),
+                'task_results': task_result_cache.stats(),
+                'prepared_queries': prepared_queries.stats(),
+            },
+            'slow_queries': slow_queries,
+        }, status=status.HTTP_200_OK)
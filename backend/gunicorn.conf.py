@@ -0,0 +1,28 @@
+"""
+gunicorn settings, loaded automatically from the working directory.
+
+Workers are separate processes, so each keeps its own Prometheus metrics.
+PROMETHEUS_MULTIPROC_DIR makes prometheus_client write them to files in a
+shared directory, which /metrics sums (see diagnostics/metrics.py). It must be
+set before any worker imports prometheus_client.
+"""
+
+import os
+import shutil
+
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/smartplanner-metrics')
+
+
+def on_starting(server):
+    # Files left by a previous run would be added to this run's counters
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
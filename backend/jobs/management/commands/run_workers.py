@@ -0,0 +1,44 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from jobs.queue import work
+
+
+class Command(BaseCommand):
+    help = "Runs background job workers until interrupted, or until the queue is empty with --once."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help="Number of worker threads.")
+        parser.add_argument('--poll-interval', type=float, help="Seconds to wait when no job is runnable.")
+        parser.add_argument('--chunk-size', type=int, help="Rows each job handles per transaction.")
+        parser.add_argument('--once', action='store_true', help="Exit once no job is runnable.")
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+        counts = []
+
+        def stop(signum, frame):
+            self.stdout.write("Stopping after the current jobs...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+
+        def run():
+            try:
+                counts.append(work(stop_event, options['poll_interval'], options['once'], options['chunk_size']))
+            finally:
+                # Each thread has its own database connection
+                connection.close()
+
+        threads = [threading.Thread(target=run, name=f'job-worker-{index}') for index in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        # join() with a timeout so the main thread keeps handling signals
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+
+        self.stdout.write(self.style.SUCCESS(f"Workers stopped after running {sum(counts)} jobs."))
@@ -0,0 +1,43 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+from users.models import CustomUser
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    # Random ids, so a job id can't be guessed from another one
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    # Owner allowed to read the job's status; null when the job outlives its user
+    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    # Rows processed so far, summed over chunks
+    progress = models.BigIntegerField(default=0)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    run_after = models.DateTimeField(default=timezone.now)
+    # A running job whose lease expired belongs to a dead worker and may be reclaimed
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Claim query: next queued job by run_after, or an expired running one
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.id} ({self.status})"
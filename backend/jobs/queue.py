@@ -0,0 +1,117 @@
+"""
+A small job queue stored in the jobs_job table.
+
+Workers (`manage.py run_workers`) claim jobs with SELECT ... FOR UPDATE SKIP
+LOCKED, so any number of them can poll the table without blocking each other
+or taking the same job. A handler does one chunk of work per call, and each
+chunk commits in its own transaction. Row locks are therefore held for one
+chunk at a time instead of the whole job.
+
+Handlers are listed in settings.JOB_HANDLERS as {kind: dotted path}. They are
+called as handler(payload, chunk_size) and return (rows_processed, done).
+"""
+
+import datetime
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(kind, payload, user_id=None):
+    """
+    Queues a job and returns it. Call inside the request's transaction so the
+    job only becomes visible if the request commits.
+    """
+    if kind not in settings.JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(kind=kind, payload=payload, user_id=user_id)
+
+
+def claim_job():
+    """
+    Claims the next runnable job for this worker, or returns None.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            Job.objects
+            .select_for_update(skip_locked=True)
+            .filter(Q(status=Job.QUEUED, run_after__lte=now) | Q(status=Job.RUNNING, locked_until__lt=now))
+            .order_by('run_after')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.locked_until = now + datetime.timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        job.save(update_fields=['status', 'attempts', 'locked_until'])
+    return job
+
+
+def run_job(job, chunk_size=None):
+    """
+    Runs a claimed job chunk by chunk until its handler reports it is done.
+    Failures are retried with exponential backoff up to JOB_MAX_ATTEMPTS.
+    """
+    chunk_size = chunk_size or settings.JOB_CHUNK_SIZE
+    try:
+        handler = import_string(settings.JOB_HANDLERS[job.kind])
+        done = False
+        while not done:
+            with transaction.atomic():
+                processed, done = handler(job.payload, chunk_size)
+            # Record progress and extend the lease after every chunk
+            Job.objects.filter(pk=job.pk).update(
+                progress=F('progress') + processed,
+                locked_until=timezone.now() + datetime.timedelta(seconds=settings.JOB_LEASE_SECONDS),
+            )
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        if job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, error=str(exc), locked_until=None, finished_at=timezone.now()
+            )
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED, error=str(exc), locked_until=None,
+                run_after=timezone.now() + datetime.timedelta(seconds=2 ** job.attempts),
+            )
+        return False
+
+    Job.objects.filter(pk=job.pk).update(status=Job.DONE, error='', locked_until=None, finished_at=timezone.now())
+    return True
+
+
+def work(stop_event, poll_interval=None, once=False, chunk_size=None):
+    """
+    Claims and runs jobs until stop_event is set. With once=True, returns as
+    soon as no job is runnable. Returns the number of jobs run.
+    """
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    count = 0
+    while not stop_event.is_set():
+        try:
+            job = claim_job()
+        except DatabaseError:
+            # Lost connection or lock timeout; reconnect on the next poll
+            logger.exception("Could not claim a job")
+            close_old_connections()
+            stop_event.wait(poll_interval)
+            continue
+        if job is None:
+            if once:
+                break
+            stop_event.wait(poll_interval)
+            continue
+        run_job(job, chunk_size)
+        count += 1
+    return count
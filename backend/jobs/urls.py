@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import JobStatusView
+
+urlpatterns = [
+    path('<uuid:job_id>/', JobStatusView.as_view(), name='job_status'),
+]
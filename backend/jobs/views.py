@@ -0,0 +1,31 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from jobs.models import Job
+
+class JobStatusView(APIView):
+    def get(self, request, job_id):
+        """
+        Handles GET requests for the status of a background job.
+        """
+        try:
+            job = Job.objects.get(id=job_id)
+        except Job.DoesNotExist:
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        # Only the job's owner and staff can see it. An account deletion job
+        # loses its owner with the account, after which only staff can.
+        is_owner = request.auth is not None and job.user_id is not None and request.user.id == job.user_id
+        if not (is_owner or request.user.is_staff):
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            'job_id': str(job.id),
+            'kind': job.kind,
+            'status': job.status,
+            'progress': job.progress,
+            'attempts': job.attempts,
+            'error': job.error,
+            'created_at': job.created_at,
+            'finished_at': job.finished_at,
+        }, status=status.HTTP_200_OK)
@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mybackend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup; they use the ORM and settings
+from django.conf import settings  # noqa: E402
+from sync.asgi import push_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # Change push (SSE and WebSocket) is served outside Django's request cycle
+    if scope['type'] in ('http', 'websocket') and scope['path'] == settings.PUSH_PATH and settings.PUSH_BACKEND:
+        return await push_application(scope, receive, send)
+    return await django_application(scope, receive, send)
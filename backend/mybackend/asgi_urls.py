@@ -0,0 +1,16 @@
+"""
+URLconf for requests served over ASGI: every WSGI route plus the async read
+endpoints. ASGIRoutesMiddleware selects it for ASGI requests.
+
+The async endpoints read through the psycopg pool in mybackend/async_db.py,
+which belongs to the event loop it was opened on. Under WSGI, Django runs an
+async view on a new event loop per request and closes it afterwards, which
+would break the pool, so those routes don't exist there.
+"""
+from django.urls import path, include
+from mybackend.urls import urlpatterns as wsgi_urlpatterns
+
+urlpatterns = [
+    path('api/tasks/', include('tasks.async_urls')),
+    path('api/tags/', include('tags.async_urls')),
+] + wsgi_urlpatterns
@@ -0,0 +1,83 @@
+import json
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from rest_framework import exceptions
+from users.authentication import aauthenticate
+from users.versioning import aget_data_version, etag_matches, make_etag
+
+
+def error_response(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+class ASGIRoutesMiddleware:
+    """
+    Resolves ASGI requests against mybackend.asgi_urls, which adds the async
+    endpoints to the regular routes. WSGI requests keep ROOT_URLCONF.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if isinstance(request, ASGIRequest):
+            request.urlconf = 'mybackend.asgi_urls'
+        # In async mode this is the coroutine the handler awaits
+        return self.get_response(request)
+
+
+class AsyncAPIView(View):
+    """
+    Base for the async (ASGI) read endpoints.
+
+    Mirrors what the sync APIViews get from DRF and conditional_on_data_version:
+    token authentication, a parsed JSON body and ETag / 304 handling. Handlers
+    read `request.user_id`, `request.json` and `request.data_version`.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Token-authenticated JSON API, same as the DRF views
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.user_id = await aauthenticate(request)
+        except exceptions.AuthenticationFailed as e:
+            return error_response(str(e.detail), 401)
+
+        if request.user_id is None:
+            return error_response('Authorization token is required', 400)
+
+        request.json = {}
+        if request.method == 'POST' and request.body:
+            try:
+                request.json = json.loads(request.body)
+            except ValueError:
+                return error_response('Request body must be valid JSON', 400)
+            if not isinstance(request.json, dict):
+                return error_response('Request body must be a JSON object', 400)
+
+        request.data_version = await aget_data_version(request.user_id)
+        etag = make_etag(request.data_version, request.path, request.GET, request.json)
+        if etag_matches(request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response = await super().dispatch(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            patch_vary_headers(response, ['Authorization'])
+        return response
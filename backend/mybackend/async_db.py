@@ -0,0 +1,76 @@
+"""
+Async PostgreSQL connection pool for the ASGI read endpoints.
+
+The sync views keep using Django's connection; the async views run their
+queries through this psycopg 3 pool so a request waiting on the database
+does not hold a thread.
+"""
+
+import asyncio
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+_pool = None
+# Created on first use so it binds to the server's event loop, not the importer's
+_pool_lock = None
+
+
+def connection_kwargs():
+    db = settings.DATABASES['default']
+    return {
+        'dbname': db['NAME'],
+        'user': db['USER'],
+        'password': db['PASSWORD'],
+        'host': db['HOST'],
+        'port': db['PORT'],
+    }
+
+
+async def get_pool():
+    """
+    Returns the process-wide AsyncConnectionPool, opening it on first use.
+    """
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            try:
+                from psycopg_pool import AsyncConnectionPool
+            except ImportError:
+                raise ImproperlyConfigured("The async read endpoints require psycopg[binary] and psycopg-pool.")
+
+            pool = AsyncConnectionPool(
+                kwargs=connection_kwargs(),
+                min_size=settings.ASYNC_DB_POOL_MIN_SIZE,
+                max_size=settings.ASYNC_DB_POOL_MAX_SIZE,
+                open=False,
+            )
+            await pool.open()
+            _pool = pool
+    return _pool
+
+
+async def fetchall(query, params, prepare=None):
+    """
+    prepare=True runs the query as a server-side prepared statement on the
+    pooled connection (psycopg keeps them per connection); None leaves it to
+    psycopg's prepare_threshold.
+    """
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params, prepare=prepare)
+            return await cursor.fetchall()
+
+
+async def fetchone(query, params):
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        async with conn.cursor() as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchone()
@@ -0,0 +1,136 @@
+"""
+Read-replica routing with read-your-writes stickiness.
+
+Reads are only sent to a replica inside `read_replica_for(user_id)` (or a view
+decorated with `routes_reads_to_replica`); everything else stays on `default`.
+A user who wrote within READ_YOUR_WRITES_WINDOW seconds keeps reading from the
+primary, and replicas lagging more than REPLICA_MAX_LAG seconds are skipped.
+The database is picked once per scope, so every read in it, the data version
+behind ETags and cache keys included, comes from the same one.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+
+_read_alias = contextvars.ContextVar('read_replica_alias', default='default')
+
+# alias -> (checked_at, healthy); refreshed at most every REPLICA_LAG_CHECK_INTERVAL seconds
+_replica_health = {}
+_health_lock = threading.Lock()
+
+
+def _sticky_key(user_id):
+    return f"replica-sticky:{user_id}"
+
+
+def mark_user_wrote(user_id):
+    """
+    Pins the user's reads to the primary for READ_YOUR_WRITES_WINDOW seconds.
+    """
+    if settings.DATABASE_REPLICAS:
+        caches[settings.REPLICA_STICKY_CACHE].set(_sticky_key(user_id), True, settings.READ_YOUR_WRITES_WINDOW)
+
+
+def is_sticky(user_id):
+    return bool(caches[settings.REPLICA_STICKY_CACHE].get(_sticky_key(user_id)))
+
+
+def measure_lag(alias):
+    """
+    Returns the replica's replay lag in seconds, 0 for non-PostgreSQL aliases,
+    or None when the replica cannot be queried.
+    """
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT CASE
+                    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                END
+            """)
+            return float(cursor.fetchone()[0])
+    except DatabaseError:
+        return None
+
+
+def replica_is_healthy(alias):
+    now = time.monotonic()
+    with _health_lock:
+        checked = _replica_health.get(alias)
+        if checked is not None and now - checked[0] < settings.REPLICA_LAG_CHECK_INTERVAL:
+            return checked[1]
+
+    lag = measure_lag(alias)
+    healthy = lag is not None and lag <= settings.REPLICA_MAX_LAG
+    with _health_lock:
+        _replica_health[alias] = (now, healthy)
+    return healthy
+
+
+def read_alias_for(user_id):
+    """
+    Picks the database alias a user's reads should go to.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    if user_id is None or not replicas or is_sticky(user_id):
+        return 'default'
+
+    healthy = [alias for alias in replicas if replica_is_healthy(alias)]
+    if not healthy:
+        return 'default'
+    # Keep each user on one replica so consecutive reads are monotonic
+    return healthy[user_id % len(healthy)]
+
+
+def get_read_connection():
+    """
+    Connection for raw SQL reads in the current read_replica_for() scope.
+    """
+    return connections[_read_alias.get()]
+
+
+@contextmanager
+def read_replica_for(user_id):
+    token = _read_alias.set(read_alias_for(user_id))
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def routes_reads_to_replica(handler):
+    """
+    Decorates a read-only view handler so its ORM and get_read_connection()
+    reads may be served by a replica.
+    """
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        user_id = request.user.id if request.auth is not None else None
+        with read_replica_for(user_id):
+            return handler(self, request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,12 @@
+from rest_framework import exceptions
+from rest_framework.views import exception_handler
+
+
+def api_exception_handler(exc, context):
+    """
+    Reports authentication failures in the same {'error': ...} shape the views use.
+    """
+    response = exception_handler(exc, context)
+    if response is not None and isinstance(exc, (exceptions.AuthenticationFailed, exceptions.NotAuthenticated)):
+        response.data = {'error': response.data.get('detail', 'Invalid or expired token')}
+    return response
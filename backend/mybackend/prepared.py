@@ -0,0 +1,139 @@
+"""
+Server-side prepared statements for read queries with a bounded set of shapes.
+
+Django binds parameters on the client (psycopg2, and psycopg 3 in Django's
+default ClientCursor mode), so every execution is parsed and planned from
+scratch. execute_prepared() instead sends `PREPARE <name> AS <sql>` the first
+time a connection sees a query text and `EXECUTE <name>(...)` afterwards, so
+PostgreSQL parses it once per connection and, after a few runs, can reuse a
+generic plan.
+
+Statement names are assigned per query text, process-wide. Only pass SQL whose
+text comes from a fixed set of shapes (parameters as %s, never inlined);
+anything beyond PREPARED_STATEMENTS_MAX distinct texts runs unprepared. Session
+state doesn't survive transaction-mode PgBouncer; set PREPARED_STATEMENTS=False
+behind one. Connections closed after every request (CONN_MAX_AGE = 0) would
+pay a PREPARE on every call and never reuse a plan, so they run unprepared.
+"""
+
+import re
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_PLACEHOLDER = re.compile(r'%([s%])')
+
+
+class PreparedQueries:
+    """
+    Per-process registry of prepared query texts, with counters:
+
+    - prepares: PREPAREs sent (once per statement per connection)
+    - executions: EXECUTEs of a prepared statement
+    - unprepared: executions that fell back to a plain query
+    """
+
+    def __init__(self, max_statements):
+        self.max_statements = max_statements
+        self._statements = {}
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    def _compile(self, sql):
+        """
+        Returns (name, prepare_sql, param_count) for a query text, or None when
+        the registry is full.
+        """
+        statement = self._statements.get(sql)
+        if statement is not None:
+            return statement
+
+        with self._lock:
+            statement = self._statements.get(sql)
+            if statement is None:
+                if len(self._statements) >= self.max_statements:
+                    return None
+                numbers = iter(range(1, sql.count('%s') + 1))
+                body = _PLACEHOLDER.sub(lambda match: '%' if match.group(1) == '%' else f'${next(numbers)}', sql)
+                name = f'smartplanner_q{len(self._statements) + 1}'
+                statement = (name, f'PREPARE {name} AS {body}', sql.count('%s'))
+                self._statements[sql] = statement
+            return statement
+
+    def execute(self, cursor, sql, params):
+        """
+        Runs sql with params on a Django cursor through a prepared statement,
+        preparing it on the cursor's connection first if needed.
+        """
+        statement = None
+        persistent = cursor.db.settings_dict['CONN_MAX_AGE'] != 0
+        if settings.PREPARED_STATEMENTS and cursor.db.vendor == 'postgresql' and persistent:
+            statement = self._compile(sql)
+        if statement is None:
+            self._count('unprepared')
+            return cursor.execute(sql, params)
+
+        name, prepare_sql, param_count = statement
+        prepared = _prepared_names(cursor.db)
+        if name not in prepared:
+            cursor.execute(prepare_sql)
+            prepared.add(name)
+            self._count('prepares')
+
+        self._count('executions')
+        if not param_count:
+            return cursor.execute(f'EXECUTE {name}')
+        return cursor.execute(f"EXECUTE {name}({', '.join(['%s'] * param_count)})", params)
+
+    def _count(self, key):
+        with self._lock:
+            self._counters[key] += 1
+
+    def stats(self):
+        with self._lock:
+            executions = self._counters['executions']
+            prepares = self._counters['prepares']
+            return {
+                'statements': len(self._statements),
+                'max_statements': self.max_statements,
+                'prepares': prepares,
+                'executions': executions,
+                'unprepared': self._counters['unprepared'],
+                # Share of prepared executions that skipped parse and analysis
+                'reuse_rate': (executions - prepares) / executions if executions else 0.0,
+            }
+
+
+def _prepared_names(db):
+    names = getattr(db, 'prepared_statement_names', None)
+    if names is None:
+        names = db.prepared_statement_names = set()
+    return names
+
+
+@receiver(connection_created)
+def _reset_prepared_names(sender, connection, **kwargs):
+    # Prepared statements belong to the server session; a new one has none
+    connection.prepared_statement_names = set()
+
+
+def server_statement_stats(cursor):
+    """
+    Reads pg_prepared_statements (PostgreSQL 14+) for the cursor's session:
+    [(name, generic_plans, custom_plans), ...].
+    """
+    cursor.execute(
+        "SELECT name, generic_plans, custom_plans FROM pg_prepared_statements WHERE name LIKE %s ORDER BY name",
+        ['smartplanner_q%']
+    )
+    return cursor.fetchall()
+
+
+prepared_queries = PreparedQueries(settings.PREPARED_STATEMENTS_MAX)
+
+
+def execute_prepared(cursor, sql, params):
+    return prepared_queries.execute(cursor, sql, params)
@@ -12,7 +12,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 import os
-from decouple import config
+from decouple import config, Csv
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -45,10 +46,17 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     'corsheaders',
     'tags',
+    'jobs',
+    'sync',
+    'diagnostics',
 
 ]
 
 MIDDLEWARE = [
+    'diagnostics.metrics.MetricsMiddleware',
+    'diagnostics.instrumentation.SQLInstrumentationMiddleware',
+    # Adds the async read endpoints for ASGI requests (before CommonMiddleware's slash redirects)
+    'mybackend.async_api.ASGIRoutesMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,6 +93,26 @@ CORS_ALLOWED_ORIGINS = [
 ]
 CORS_ALLOW_ALL_ORIGINS = True
 
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'users.authentication.CachedTokenAuthentication',
+    ],
+    'EXCEPTION_HANDLER': 'mybackend.exceptions.api_exception_handler',
+    'DEFAULT_RENDERER_CLASSES': [
+        'mybackend.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Token -> user id cache used by CachedTokenAuthentication (the 'tokens' alias in CACHES).
+# Set TOKEN_CACHE_URL (a redis:// URL, or 'db' for the token_cache table) to share it, so
+# a revoked token stops working in every worker at once. Without it each process caches
+# on its own and a token revoked through another worker keeps working here until its
+# entry expires, hence the short default TTL.
+TOKEN_CACHE_URL = config('TOKEN_CACHE_URL', default='')
+TOKEN_CACHE_TTL = config('TOKEN_CACHE_TTL', default=300 if TOKEN_CACHE_URL else 10, cast=int)
+TOKEN_CACHE_MAX_SIZE = config('TOKEN_CACHE_MAX_SIZE', default=10000, cast=int)
+
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
@@ -96,13 +124,167 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT'),
+        # Keep connections (and the statements prepared on them) across requests;
+        # 0 closes them after every request, which also turns prepared statements off
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Read replicas, as comma separated host[:port] entries. They become the
+# replica_1, replica_2, ... aliases used by mybackend.db_router.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), start=1):
+    host, _, port = replica.partition(':')
+    alias = f'replica_{index}'
+    DATABASES[alias] = dict(DATABASES['default'], HOST=host, PORT=port or DATABASES['default']['PORT'], TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['mybackend.db_router.ReadReplicaRouter']
+
+# Seconds a user's reads stay on the primary after they write; keep it above REPLICA_MAX_LAG
+READ_YOUR_WRITES_WINDOW = config('READ_YOUR_WRITES_WINDOW', default=5.0, cast=float)
+# Replicas lagging more than this many seconds are skipped
+REPLICA_MAX_LAG = config('REPLICA_MAX_LAG', default=2.0, cast=float)
+REPLICA_LAG_CHECK_INTERVAL = config('REPLICA_LAG_CHECK_INTERVAL', default=1.0, cast=float)
+# Cache holding the per-user stickiness markers; set up with CACHES below
+REPLICA_STICKY_CACHE = 'replica_sticky'
+
+
+# psycopg 3 pool used by the async (ASGI) read endpoints, see mybackend/async_db.py
+ASYNC_DB_POOL_MIN_SIZE = config('ASYNC_DB_POOL_MIN_SIZE', default=2, cast=int)
+ASYNC_DB_POOL_MAX_SIZE = config('ASYNC_DB_POOL_MAX_SIZE', default=20, cast=int)
+
+# Run FilterTasksView's queries as server-side prepared statements (mybackend/prepared.py).
+# Only used on persistent connections (DB_CONN_MAX_AGE > 0). Turn off behind a
+# transaction-pooling PgBouncer, which doesn't keep session state.
+PREPARED_STATEMENTS = config('PREPARED_STATEMENTS', default=True, cast=bool)
+PREPARED_STATEMENTS_MAX = config('PREPARED_STATEMENTS_MAX', default=256, cast=int)
+
+# Per-request query count / DB time / rows and slow-query capture, see diagnostics/instrumentation.py
+SQL_INSTRUMENTATION = config('SQL_INSTRUMENTATION', default=True, cast=bool)
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=200.0, cast=float)
+# Slow queries kept in diagnostics_slowquery; older ones are deleted
+SLOW_QUERY_BUFFER_SIZE = config('SLOW_QUERY_BUFFER_SIZE', default=200, cast=int)
+# EXPLAIN ANALYZE runs the query again, so at most one per this many seconds per process
+SLOW_QUERY_EXPLAIN_INTERVAL = config('SLOW_QUERY_EXPLAIN_INTERVAL', default=10.0, cast=float)
+
+# Prometheus metrics at /metrics, see diagnostics/metrics.py (needs prometheus_client)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+# Addresses (CIDR) that may scrape /metrics without a token; anyone else needs a staff token
+METRICS_ALLOWED_NETWORKS = config('METRICS_ALLOWED_NETWORKS', default='127.0.0.1/32,::1/128', cast=Csv())
+
+# Change push over ASGI (SSE / WebSocket at PUSH_PATH), see sync/push.py.
+# 'postgres' fans out with LISTEN/NOTIFY, 'memory' only reaches this process, '' turns it off.
+PUSH_BACKEND = config('PUSH_BACKEND', default='postgres')
+PUSH_CHANNEL = 'smartplanner_changes'
+PUSH_PATH = '/api/events/'
+# Seconds between SSE keep-alive comments on an idle stream
+PUSH_HEARTBEAT = config('PUSH_HEARTBEAT', default=25.0, cast=float)
 
 
 AUTH_USER_MODEL = 'users.CustomUser'
 
+# Maintain Tag.task_count/completed_count with PostgreSQL triggers instead of in
+# the task views. Install them with `manage.py rebuild_tag_counters --install-triggers`.
+TAG_COUNTER_TRIGGERS = config('TAG_COUNTER_TRIGGERS', default=False, cast=bool)
+
+
+# Background jobs (see jobs/queue.py), run by `manage.py run_workers`
+JOB_HANDLERS = {
+    'delete_user': 'users.jobs.delete_user',
+    'delete_tag': 'tags.jobs.delete_tag',
+    'prune_tombstones': 'sync.jobs.prune_tombstones',
+}
+# Rows a job handles per transaction
+JOB_CHUNK_SIZE = config('JOB_CHUNK_SIZE', default=1000, cast=int)
+# Seconds a worker owns a running job before another worker may reclaim it
+JOB_LEASE_SECONDS = config('JOB_LEASE_SECONDS', default=60, cast=int)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=5, cast=int)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=1.0, cast=float)
+
+# Days a deletion stays in sync_tombstone; `manage.py prune_tombstones` drops
+# older ones, and clients that last synced before them get a full sync
+TOMBSTONE_RETENTION_DAYS = config('TOMBSTONE_RETENTION_DAYS', default=30, cast=int)
+
+
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Task list results, keyed per user and data version (see tasks/cache.py)
+    'task_results': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-results',
+        'TIMEOUT': config('TASK_CACHE_TIMEOUT', default=300, cast=int),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('TASK_CACHE_MAX_ENTRIES', default=1000, cast=int),
+        },
+    },
+}
+# Responses with more tasks than this are not cached; with MAX_ENTRIES it bounds
+# the in-process cache at TASK_CACHE_MAX_ENTRIES * TASK_CACHE_MAX_ROWS rows per worker
+TASK_CACHE_MAX_ROWS = config('TASK_CACHE_MAX_ROWS', default=1000, cast=int)
+
+# Point task_results at Redis (bounded by the server's maxmemory-policy) to share it across workers
+TASK_CACHE_URL = config('TASK_CACHE_URL', default='')
+if TASK_CACHE_URL:
+    CACHES['task_results'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': TASK_CACHE_URL,
+        'TIMEOUT': config('TASK_CACHE_TIMEOUT', default=300, cast=int),
+    }
+
+if TOKEN_CACHE_URL == 'db':
+    CACHES['tokens'] = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'token_cache',
+        'TIMEOUT': TOKEN_CACHE_TTL,
+    }
+elif TOKEN_CACHE_URL:
+    CACHES['tokens'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': TOKEN_CACHE_URL,
+        'TIMEOUT': TOKEN_CACHE_TTL,
+    }
+else:
+    CACHES['tokens'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tokens',
+        'TIMEOUT': TOKEN_CACHE_TTL,
+        'OPTIONS': {'MAX_ENTRIES': TOKEN_CACHE_MAX_SIZE},
+    }
+
+
+# Every worker must see a user's "just wrote" marker, so with replicas it needs a
+# shared cache: a redis:// URL, or 'db' for the replica_sticky_cache table
+# (create it with `manage.py createcachetable`).
+REPLICA_STICKY_CACHE_URL = config('REPLICA_STICKY_CACHE_URL', default='')
+if REPLICA_STICKY_CACHE_URL == 'db':
+    CACHES[REPLICA_STICKY_CACHE] = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'replica_sticky_cache',
+    }
+elif REPLICA_STICKY_CACHE_URL:
+    CACHES[REPLICA_STICKY_CACHE] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REPLICA_STICKY_CACHE_URL,
+    }
+elif DATABASE_REPLICAS:
+    raise ImproperlyConfigured(
+        "DB_REPLICA_HOSTS needs REPLICA_STICKY_CACHE_URL (a redis:// URL or 'db'): an "
+        "in-process cache would send a user's reads to a replica right after they wrote through another worker."
+    )
+else:
+    # Never read without replicas
+    CACHES[REPLICA_STICKY_CACHE] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'replica-sticky',
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -123,6 +305,37 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# New passwords use PASSWORD_HASHER; hashes made with another hasher or work
+# factor are upgraded when the user next logs in (see users/hashing.py).
+_PASSWORD_HASHERS = {
+    'pbkdf2_sha256': 'users.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'users.hashers.ScryptPasswordHasher',
+    'argon2': 'users.hashers.Argon2PasswordHasher',
+    'bcrypt_sha256': 'users.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='pbkdf2_sha256')
+# Iterations, N, time cost or log2 rounds depending on the hasher; 0 keeps Django's default
+PASSWORD_HASH_WORK_FACTOR = config('PASSWORD_HASH_WORK_FACTOR', default=0, cast=int)
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Process pool that runs hashing off the request thread. 0 workers hashes inline.
+# Every gunicorn worker starts its own pool, so by default the cores are split
+# between the WEB_CONCURRENCY workers (gunicorn's own default for --workers)
+# rather than each of them starting one hashing process per core.
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+PASSWORD_HASH_WORKERS = config(
+    'PASSWORD_HASH_WORKERS', default=max(1, (os.cpu_count() or 1) // max(1, WEB_CONCURRENCY)), cast=int
+)
+# Hash jobs allowed to be running or waiting, per gunicorn worker, before logins/registrations get a 429
+PASSWORD_HASH_MAX_QUEUE = config('PASSWORD_HASH_MAX_QUEUE', default=4 * max(1, PASSWORD_HASH_WORKERS), cast=int)
+# Seconds of hashing a bulk registration may take; keep it well under gunicorn's
+# worker timeout (30s by default) so a large batch is refused instead of killed
+BULK_REGISTER_HASH_SECONDS = config('BULK_REGISTER_HASH_SECONDS', default=10, cast=float)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
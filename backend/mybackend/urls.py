@@ -16,10 +16,15 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from diagnostics.metrics import metrics_view
 
 urlpatterns = [
     path('api/users/', include('users.urls')),
     path('api/tasks/', include('tasks.urls')),
-    path('api/tags/', include('tags.urls'))
+    path('api/tags/', include('tags.urls')),
+    path('api/jobs/', include('jobs.urls')),
+    path('api/sync/', include('sync.urls')),
+    path('api/diagnostics/', include('diagnostics.urls')),
+    path('metrics', metrics_view, name='metrics')
 ]
 
@@ -0,0 +1,173 @@
+"""
+Push endpoint for task and tag changes, mounted at PUSH_PATH by mybackend/asgi.py.
+
+Plain ASGI instead of a Django view, so an idle connection costs one coroutine,
+one task waiting on the client and a Subscriber, not a request object and the
+middleware stack. Served two ways on the same path:
+
+- Server-sent events (GET with `Accept: text/event-stream`, or EventSource):
+  `id: <seq>`, `event: change`, `data: {"seq": <seq>}`, plus a `: ping` comment
+  every PUSH_HEARTBEAT seconds. A reconnecting EventSource sends Last-Event-ID
+  and only hears about newer changes.
+- WebSocket: one `{"seq": <seq>}` text frame per change.
+
+The first event carries the user's current seq. On each event the client pulls
+/api/sync/?since=<its last seq>. Browsers can't set headers on either
+transport, so the token may also be passed as ?token=<key>.
+"""
+
+import asyncio
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework import exceptions
+from mybackend.renderers import encode_json
+from sync.push import bus
+from users.authentication import aauthenticate_key
+from users.versioning import get_data_version
+
+
+def _get_data_version(user_id):
+    # Outside Django's request cycle nothing else closes expired or broken
+    # connections, so do it around each query as request_started/finished would
+    close_old_connections()
+    try:
+        return get_data_version(user_id)
+    finally:
+        close_old_connections()
+
+
+def _header(scope, name):
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def _token(scope):
+    key = _header(scope, b'authorization').strip()
+    if not key:
+        key = parse_qs(scope['query_string'].decode('latin-1')).get('token', [''])[0].strip()
+    return key
+
+
+async def _authenticate(scope):
+    """
+    Returns (user_id, None), or (None, (message, status)) when the token is missing or invalid.
+    """
+    # A token cache miss queries the database on sync_to_async's thread;
+    # clean up that thread's connections around it, as in _get_data_version
+    await sync_to_async(close_old_connections)()
+    try:
+        user_id = await aauthenticate_key(_token(scope))
+    except exceptions.AuthenticationFailed as e:
+        return None, (str(e.detail), 401)
+    finally:
+        await sync_to_async(close_old_connections)()
+    if user_id is None:
+        return None, ('Authorization token is required', 400)
+    return user_id, None
+
+
+async def _send_error(send, message, status):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': encode_json({'error': message})})
+
+
+async def _watch_disconnect(receive, subscriber):
+    while (await receive())['type'] not in ('http.disconnect', 'websocket.disconnect'):
+        pass
+    subscriber.close()
+
+
+async def _stream_changes(user_id, receive, last_seq, emit, ping):
+    """
+    Calls emit(seq) whenever the user's seq moves past the last one sent, and
+    ping() after PUSH_HEARTBEAT quiet seconds, until the client disconnects.
+    """
+    subscriber = bus.subscribe(user_id)
+    watcher = asyncio.ensure_future(_watch_disconnect(receive, subscriber))
+    try:
+        # Subscribed first, so a write landing between here and the read isn't lost
+        subscriber.notify(await sync_to_async(_get_data_version)(user_id))
+        sent = last_seq
+        while not subscriber.closed:
+            if sent is None or subscriber.seq > sent:
+                sent = subscriber.seq
+                await emit(sent)
+            elif not await subscriber.wait(settings.PUSH_HEARTBEAT) and ping is not None:
+                await ping()
+    except OSError:
+        # Sending to a client that has gone away
+        pass
+    finally:
+        watcher.cancel()
+        bus.unsubscribe(user_id, subscriber)
+
+
+async def _serve_sse(scope, receive, send):
+    if scope['method'] != 'GET':
+        return await _send_error(send, 'Method not allowed', 405)
+
+    user_id, error = await _authenticate(scope)
+    if error is not None:
+        return await _send_error(send, *error)
+
+    try:
+        last_seq = int(_header(scope, b'last-event-id'))
+    except ValueError:
+        last_seq = None
+
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            # Stops nginx from buffering the stream
+            (b'x-accel-buffering', b'no'),
+        ],
+    })
+
+    async def emit(seq):
+        body = b'id: %d\nevent: change\ndata: %s\n\n' % (seq, encode_json({'seq': seq}))
+        await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+    async def ping():
+        await send({'type': 'http.response.body', 'body': b': ping\n\n', 'more_body': True})
+
+    await _stream_changes(user_id, receive, last_seq, emit, ping)
+
+
+async def _serve_websocket(scope, receive, send):
+    if (await receive())['type'] != 'websocket.connect':
+        return
+
+    user_id, error = await _authenticate(scope)
+    if error is not None:
+        # 4400 / 4401: the HTTP status, in the application close code range
+        return await send({'type': 'websocket.close', 'code': 4000 + error[1]})
+
+    await send({'type': 'websocket.accept'})
+
+    async def emit(seq):
+        await send({'type': 'websocket.send', 'text': encode_json({'seq': seq}).decode()})
+
+    # The server sends protocol-level pings on WebSockets
+    await _stream_changes(user_id, receive, None, emit, None)
+
+
+async def push_application(scope, receive, send):
+    """
+    ASGI application for PUSH_PATH.
+    """
+    if scope['type'] == 'websocket':
+        await _serve_websocket(scope, receive, send)
+    else:
+        await _serve_sse(scope, receive, send)
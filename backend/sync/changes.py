@@ -0,0 +1,17 @@
+from django.db import connection
+from django.utils import timezone
+
+
+def record_tombstones(user_id, kind, object_ids, change_seq):
+    """
+    Records deleted tasks or tags so /api/sync/ can report them. Call inside
+    the deleting transaction with the change_seq returned by bump_data_version().
+    """
+    if not object_ids:
+        return
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO sync_tombstone (user_id, kind, object_id, change_seq, created_at)
+            VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(object_ids))}
+        """, [value for object_id in object_ids for value in (user_id, kind, object_id, change_seq, now)])
@@ -0,0 +1,36 @@
+import datetime
+
+from django.db import connection
+
+
+def prune_tombstones(payload, chunk_size):
+    """
+    Job handler for `manage.py prune_tombstones`: deletes tombstones created
+    before payload['before'] one chunk at a time. Each user's sync_floor is
+    raised past their pruned tombstones first, so a client whose `since` is
+    older than that gets a full sync instead of missing the deletes.
+    """
+    before = datetime.datetime.fromisoformat(payload['before'])
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT id, user_id, change_seq FROM sync_tombstone
+            WHERE created_at < %s
+            ORDER BY created_at
+            LIMIT %s
+        """, [before, chunk_size])
+        rows = cursor.fetchall()
+        if not rows:
+            return 0, True
+
+        floors = {}
+        for _, user_id, change_seq in rows:
+            floors[user_id] = max(floors.get(user_id, 0), change_seq)
+        cursor.executemany(
+            "UPDATE users_customuser SET sync_floor = %s WHERE id = %s AND sync_floor < %s",
+            [(floor, user_id, floor) for user_id, floor in floors.items()]
+        )
+        cursor.execute(
+            f"DELETE FROM sync_tombstone WHERE id IN ({', '.join(['%s'] * len(rows))})",
+            [row[0] for row in rows]
+        )
+    return len(rows), len(rows) < chunk_size
@@ -0,0 +1,28 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = (
+        "Queues a job that deletes sync tombstones older than --days. Clients that last "
+        "synced before the pruned deletes get a full sync. Run it daily, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.TOMBSTONE_RETENTION_DAYS,
+            help="Keep tombstones this many days (default TOMBSTONE_RETENTION_DAYS)."
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError("--days must be at least 1.")
+        before = timezone.now() - datetime.timedelta(days=options['days'])
+        job = enqueue('prune_tombstones', {'before': before.isoformat()})
+        self.stdout.write(self.style.SUCCESS(
+            f"Queued job {job.id} to prune tombstones from before {before:%Y-%m-%d %H:%M}."
+        ))
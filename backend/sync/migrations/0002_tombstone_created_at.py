@@ -0,0 +1,23 @@
+# Generated by Django 4.2.18 on 2026-10-18 19:09
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tombstone',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['created_at'], name='tombstone_created_at_idx'),
+        ),
+    ]
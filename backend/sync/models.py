@@ -0,0 +1,28 @@
+from django.db import models
+from django.utils import timezone
+from users.models import CustomUser
+
+class Tombstone(models.Model):
+    TASK = 'task'
+    TAG = 'tag'
+    KIND_CHOICES = [
+        (TASK, 'Task'),
+        (TAG, 'Tag'),
+    ]
+
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    # The user's data version of the delete
+    change_seq = models.BigIntegerField()
+    # Tombstones are pruned by age (see sync/jobs.py)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'change_seq'], name='tombstone_user_seq_idx'),
+            models.Index(fields=['created_at'], name='tombstone_created_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted at {self.change_seq}"
@@ -0,0 +1,158 @@
+"""
+Fan-out of per-user change notifications to the push endpoint (sync/asgi.py).
+
+Every task or tag write bumps the user's data version (users.versioning), and
+the new version is published here as (user_id, seq). Subscribers only keep the
+latest seq they have been told about: clients fetch the actual changes from
+/api/sync/?since=<seq>, so bursts of writes coalesce into one event and an idle
+connection holds a few small objects, not a queue.
+
+PUSH_BACKEND picks how a publish reaches the ASGI processes:
+
+- 'postgres': pg_notify() inside the write transaction, delivered on commit to
+  every process LISTENing on PUSH_CHANNEL.
+- 'memory': handed to this process's bus once the transaction commits. Only
+  for single-process deployments.
+- '': publishing is off.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+
+def publish_change(cursor, user_id, seq):
+    """
+    Publishes a user's new change sequence when the current transaction commits.
+    Called by bump_data_version with its cursor.
+    """
+    if settings.PUSH_BACKEND == 'postgres' and connection.vendor == 'postgresql':
+        cursor.execute("SELECT pg_notify(%s, %s)", [settings.PUSH_CHANNEL, f'{user_id}:{seq}'])
+    elif settings.PUSH_BACKEND == 'memory':
+        transaction.on_commit(lambda: bus.publish_threadsafe(user_id, seq))
+
+
+class Subscriber:
+    """
+    One open push connection: the latest seq it was told about, and a future
+    resolved when that moves or the connection goes away. The future only
+    exists while the connection is waiting.
+    """
+
+    __slots__ = ('seq', 'closed', '_waiter')
+
+    def __init__(self):
+        self.seq = 0
+        self.closed = False
+        self._waiter = None
+
+    def notify(self, seq):
+        if seq > self.seq:
+            self.seq = seq
+            self._wake(True)
+
+    def close(self):
+        self.closed = True
+        self._wake(True)
+
+    def _wake(self, changed):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(changed)
+
+    async def wait(self, timeout):
+        """
+        Waits up to `timeout` seconds for a change. Returns False on timeout.
+        """
+        loop = asyncio.get_running_loop()
+        self._waiter = loop.create_future()
+        # A timer handle instead of asyncio.wait_for, which starts a task per wait
+        timer = loop.call_later(timeout, self._wake, False)
+        try:
+            return await self._waiter
+        finally:
+            timer.cancel()
+            self._waiter = None
+
+
+class ChangeBus:
+    """
+    Per-process registry of subscribers by user id. Lives on the server's event
+    loop; publish_threadsafe() is the entry point for sync (thread) code.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._loop = None
+        self._listener = None
+
+    def subscribe(self, user_id):
+        self._loop = asyncio.get_running_loop()
+        if settings.PUSH_BACKEND == 'postgres' and (self._listener is None or self._listener.done()):
+            try:
+                import psycopg
+            except ImportError:
+                raise ImproperlyConfigured("PUSH_BACKEND = 'postgres' requires psycopg[binary].")
+            self._listener = self._loop.create_task(self._listen(psycopg))
+        subscriber = Subscriber()
+        self._subscribers[user_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, user_id, subscriber):
+        subscribers = self._subscribers.get(user_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def dispatch(self, user_id, seq):
+        for subscriber in self._subscribers.get(user_id, ()):
+            subscriber.notify(seq)
+
+    def publish_threadsafe(self, user_id, seq):
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.dispatch, user_id, seq)
+
+    def connection_count(self):
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    async def _listen(self, psycopg):
+        """
+        Holds one LISTEN connection for the process and dispatches notifications
+        to local subscribers, reconnecting with backoff.
+        """
+        from mybackend.async_db import connection_kwargs
+
+        delay = 1
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(**connection_kwargs(), autocommit=True)
+                async with conn:
+                    await conn.execute(f'LISTEN "{settings.PUSH_CHANNEL}"')
+                    # Anything published while we weren't listening was missed
+                    cursor = await conn.execute(
+                        "SELECT id, data_version FROM users_customuser WHERE id = ANY(%s)",
+                        [list(self._subscribers)]
+                    )
+                    for user_id, seq in await cursor.fetchall():
+                        self.dispatch(user_id, seq)
+                    delay = 1
+
+                    async for notify in conn.notifies():
+                        user_id, _, seq = notify.payload.partition(':')
+                        self.dispatch(int(user_id), int(seq))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Push listener lost its connection; retrying in %ss", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+bus = ChangeBus()
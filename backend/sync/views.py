@@ -0,0 +1,80 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from mybackend.db_router import get_read_connection, routes_reads_to_replica
+from sync.models import Tombstone
+from tasks.queries import TASK_LIST_SELECT
+from tasks.serializers import serialize_task
+
+class SyncView(APIView):
+    @routes_reads_to_replica
+    def get(self, request):
+        """
+        Handles GET requests for the tasks and tags changed or deleted since a
+        change sequence (?since=<seq>). Without `since`, or with one older than
+        the user's pruned tombstones, returns everything.
+        """
+        if request.auth is None:
+            return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.id
+
+        try:
+            since = int(request.query_params.get('since', 0))
+            if since < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            return Response({'error': 'since must be a non-negative integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with get_read_connection().cursor() as cursor:
+            # Read the version first: every row stamped at or below it was
+            # committed before it, so nothing up to `seq` can be missed
+            cursor.execute("SELECT data_version, sync_floor FROM users_customuser WHERE id = %s", [user_id])
+            seq, floor = cursor.fetchone()
+            if since < floor:
+                # The tombstones after `since` may have been pruned
+                since = 0
+            if since >= seq:
+                # Up to date, or this replica hasn't caught up with the client yet
+                return Response({
+                    'seq': max(since, seq), 'full': False, 'tasks': [], 'tags': [],
+                    'deleted': {'tasks': [], 'tags': []},
+                }, status=status.HTTP_200_OK)
+
+            deleted = {'tasks': [], 'tags': []}
+            if since:
+                cursor.execute(
+                    "SELECT kind, object_id FROM sync_tombstone WHERE user_id = %s AND change_seq > %s AND change_seq <= %s",
+                    [user_id, since, seq]
+                )
+                for kind, object_id in cursor.fetchall():
+                    deleted['tasks' if kind == Tombstone.TASK else 'tags'].append(object_id)
+                # A prune that committed before the tombstones were read may
+                # have taken some of them
+                cursor.execute("SELECT sync_floor FROM users_customuser WHERE id = %s", [user_id])
+                if since < cursor.fetchone()[0]:
+                    since = 0
+                    deleted = {'tasks': [], 'tags': []}
+
+            # A full sync starts below the rows that predate change tracking (seq 0)
+            lower = since if since else -1
+
+            cursor.execute(
+                TASK_LIST_SELECT + " WHERE t.user_id = %s AND t.change_seq > %s AND t.change_seq <= %s ORDER BY t.id",
+                [user_id, lower, seq]
+            )
+            tasks = [serialize_task(task) for task in cursor.fetchall()]
+
+            cursor.execute(
+                "SELECT id, name FROM tags_tag WHERE user_id = %s AND change_seq > %s AND change_seq <= %s ORDER BY id",
+                [user_id, lower, seq]
+            )
+            tags = [{'id': tag[0], 'name': tag[1]} for tag in cursor.fetchall()]
+
+        return Response({
+            'seq': seq,
+            'full': not since,
+            'tasks': tasks,
+            'tags': tags,
+            'deleted': deleted,
+        }, status=status.HTTP_200_OK)
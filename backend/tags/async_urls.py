@@ -0,0 +1,7 @@
+from django.urls import path
+from .async_views import AsyncGetTagsView
+
+# Served over ASGI only, see mybackend/asgi_urls.py
+urlpatterns = [
+    path('async/get/', AsyncGetTagsView.as_view(), name='async_get_tags'),
+]
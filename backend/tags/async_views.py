@@ -0,0 +1,20 @@
+# tags/async_views.py
+
+from django.http import JsonResponse
+from mybackend.async_api import AsyncAPIView
+from mybackend.async_db import fetchall
+
+
+class AsyncGetTagsView(AsyncAPIView):
+    async def get(self, request):
+        """
+        Async version of GetTagsView.
+        """
+        tags = await fetchall(
+            "SELECT id, name, task_count, completed_count FROM tags_tag WHERE user_id = %s", [request.user_id]
+        )
+
+        return JsonResponse({'tags': [
+            {'id': tag[0], 'name': tag[1], 'task_count': tag[2], 'completed_count': tag[3], 'open_count': tag[2] - tag[3]}
+            for tag in tags
+        ]})
@@ -0,0 +1,127 @@
+"""
+Denormalized per-tag task counters (Tag.task_count / Tag.completed_count).
+
+By default they are kept up to date by apply_rollup_deltas(), which every task
+write path already calls inside its transaction. With TAG_COUNTER_TRIGGERS
+set, row-level PostgreSQL triggers on tasks_task maintain them instead, and
+the application-side update is skipped.
+"""
+
+from django.conf import settings
+from django.db import connection
+
+TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION tags_tag_count_task() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.tag_id IS NOT NULL THEN
+        UPDATE tags_tag
+        SET task_count = task_count - 1, completed_count = completed_count - OLD.is_completed::int
+        WHERE id = OLD.tag_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.tag_id IS NOT NULL THEN
+        UPDATE tags_tag
+        SET task_count = task_count + 1, completed_count = completed_count + NEW.is_completed::int
+        WHERE id = NEW.tag_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS tasks_task_tag_count_insert_delete ON tasks_task;
+CREATE TRIGGER tasks_task_tag_count_insert_delete
+    AFTER INSERT OR DELETE ON tasks_task
+    FOR EACH ROW EXECUTE FUNCTION tags_tag_count_task();
+
+DROP TRIGGER IF EXISTS tasks_task_tag_count_update ON tasks_task;
+CREATE TRIGGER tasks_task_tag_count_update
+    AFTER UPDATE OF tag_id, is_completed ON tasks_task
+    FOR EACH ROW
+    WHEN (OLD.tag_id IS DISTINCT FROM NEW.tag_id OR OLD.is_completed IS DISTINCT FROM NEW.is_completed)
+    EXECUTE FUNCTION tags_tag_count_task();
+"""
+
+DROP_TRIGGER_SQL = """
+DROP TRIGGER IF EXISTS tasks_task_tag_count_insert_delete ON tasks_task;
+DROP TRIGGER IF EXISTS tasks_task_tag_count_update ON tasks_task;
+DROP FUNCTION IF EXISTS tags_tag_count_task();
+"""
+
+
+def apply_tag_count_deltas(cursor, items):
+    """
+    Applies rollup (key, delta) pairs to the counters of the tags they name,
+    with one UPDATE. No-op when the triggers maintain the counters.
+    """
+    if settings.TAG_COUNTER_TRIGGERS:
+        return
+
+    tag_deltas = {}
+    for (_, tag_id, _, is_completed), delta in items:
+        if tag_id is None:
+            continue
+        total, completed = tag_deltas.get(tag_id, (0, 0))
+        tag_deltas[tag_id] = (total + delta, completed + (delta if is_completed else 0))
+    tag_deltas = {tag_id: counts for tag_id, counts in tag_deltas.items() if counts != (0, 0)}
+    if not tag_deltas:
+        return
+
+    rows = ', '.join(['(CAST(%s AS bigint), CAST(%s AS integer), CAST(%s AS integer))'] * len(tag_deltas))
+    cursor.execute(f"""
+        WITH v (tag_id, total, completed) AS (VALUES {rows})
+        UPDATE tags_tag AS g
+        SET task_count = g.task_count + v.total, completed_count = g.completed_count + v.completed
+        FROM v
+        WHERE g.id = v.tag_id
+    """, [value for tag_id, counts in tag_deltas.items() for value in (tag_id,) + counts])
+
+
+def rebuild_tag_counters(user_id=None):
+    """
+    Recomputes the counters from tasks_task, for one user's tags or all tags.
+    """
+    user_filter = "WHERE user_id = %s" if user_id is not None else ""
+    params = [True] + ([user_id] if user_id is not None else [])
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE tags_tag SET
+                task_count = (SELECT COUNT(*) FROM tasks_task WHERE tasks_task.tag_id = tags_tag.id),
+                completed_count = (
+                    SELECT COUNT(*) FROM tasks_task
+                    WHERE tasks_task.tag_id = tags_tag.id AND tasks_task.is_completed = %s
+                )
+            {user_filter}
+        """, params)
+
+
+def diff_tag_counters(user_id=None):
+    """
+    Compares the counters with tasks_task. Returns a list of
+    (tag_id, (expected_total, expected_completed), (total, completed)).
+    """
+    user_filter = "WHERE g.user_id = %s" if user_id is not None else ""
+    params = [True] + ([user_id] if user_id is not None else [])
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT g.id, g.task_count, g.completed_count,
+                   COUNT(t.id), COUNT(CASE WHEN t.is_completed = %s THEN 1 END)
+            FROM tags_tag AS g
+            LEFT JOIN tasks_task AS t ON t.tag_id = g.id
+            {user_filter}
+            GROUP BY g.id, g.task_count, g.completed_count
+            ORDER BY g.id
+        """, params)
+        return [
+            (tag_id, (expected_total, expected_completed), (total, completed))
+            for tag_id, total, completed, expected_total, expected_completed in cursor.fetchall()
+            if (total, completed) != (expected_total, expected_completed)
+        ]
+
+
+def install_triggers():
+    with connection.cursor() as cursor:
+        cursor.execute(TRIGGER_SQL)
+
+
+def drop_triggers():
+    with connection.cursor() as cursor:
+        cursor.execute(DROP_TRIGGER_SQL)
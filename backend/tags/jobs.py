@@ -0,0 +1,52 @@
+from collections import Counter
+
+from django.db import connection, transaction
+from sync.changes import record_tombstones
+from sync.models import Tombstone
+from tags.models import Tag
+from tasks.rollups import apply_rollup_deltas, rollup_key
+from users.versioning import bump_data_version
+
+
+def delete_tag(payload, chunk_size):
+    """
+    Job handler for DeleteTagView: untags the tag's tasks one chunk at a time,
+    moving their rollup counts to the untagged rows and restamping them for
+    sync, then deletes the tag and records its tombstone. Each chunk locks the
+    tag row, and the last one deletes the tag in the same transaction.
+    """
+    user_id, tag_id = payload['user_id'], payload['tag_id']
+    change_seq = bump_data_version(user_id)
+    with connection.cursor() as cursor:
+        # Inserting or updating a task with this tag takes a key-share lock on
+        # the tag row, so while this chunk holds it no task can be tagged, and
+        # the final chunk's untag pass and delete below see every tagged task
+        query = "SELECT id FROM tags_tag WHERE id = %s AND user_id = %s"
+        if connection.features.has_select_for_update:
+            query += " FOR UPDATE"
+        cursor.execute(query, [tag_id, user_id])
+        if cursor.fetchone() is None:
+            # Deleted by an earlier attempt
+            transaction.set_rollback(True)
+            return 0, True
+
+        cursor.execute("""
+            UPDATE tasks_task SET tag_id = NULL, change_seq = %s
+            WHERE id IN (SELECT id FROM tasks_task WHERE user_id = %s AND tag_id = %s LIMIT %s)
+            RETURNING date_created, priority, is_completed
+        """, [change_seq, user_id, tag_id, chunk_size])
+        rows = cursor.fetchall()
+
+    deltas = Counter()
+    for date_created, priority, is_completed in rows:
+        deltas[rollup_key(date_created, tag_id, priority, is_completed)] -= 1
+        deltas[rollup_key(date_created, None, priority, is_completed)] += 1
+    apply_rollup_deltas(user_id, deltas)
+
+    done = len(rows) < chunk_size
+    if done:
+        # Still under the tag lock, so no task has the tag and SET_NULL has
+        # nothing left to do behind the rollups' and counters' backs
+        Tag.objects.filter(id=tag_id, user_id=user_id).delete()
+        record_tombstones(user_id, Tombstone.TAG, [tag_id], change_seq)
+    return len(rows), done
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from tags.counters import diff_tag_counters, drop_triggers, install_triggers, rebuild_tag_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes Tag.task_count and Tag.completed_count from tasks_task, or verifies "
+        "them with --verify. Also installs or drops the PostgreSQL counter triggers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help="Only rebuild or verify this user's tags.")
+        parser.add_argument('--verify', action='store_true', help="Report mismatches instead of rebuilding.")
+        triggers = parser.add_mutually_exclusive_group()
+        triggers.add_argument('--install-triggers', action='store_true', help="Install the triggers, then rebuild.")
+        triggers.add_argument('--drop-triggers', action='store_true', help="Drop the triggers, then rebuild.")
+
+    def handle(self, *args, **options):
+        user_id = options['user']
+
+        if options['verify']:
+            mismatches = diff_tag_counters(user_id)
+            for tag_id, expected, actual in mismatches:
+                self.stdout.write(
+                    f"tag={tag_id}: expected {expected[0]} tasks ({expected[1]} completed), "
+                    f"found {actual[0]} ({actual[1]} completed)"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} tags have wrong counters; run without --verify to rebuild.")
+            self.stdout.write(self.style.SUCCESS("Tag counters match tasks_task."))
+            return
+
+        if options['install_triggers'] or options['drop_triggers']:
+            if connection.vendor != 'postgresql':
+                raise CommandError("Tag counter triggers require PostgreSQL.")
+            # Exactly one of the two must maintain the counters
+            if options['install_triggers'] and not settings.TAG_COUNTER_TRIGGERS:
+                raise CommandError("Set TAG_COUNTER_TRIGGERS=True before installing the triggers.")
+            if options['drop_triggers'] and settings.TAG_COUNTER_TRIGGERS:
+                raise CommandError("Set TAG_COUNTER_TRIGGERS=False before dropping the triggers.")
+
+        with transaction.atomic():
+            if options['install_triggers']:
+                install_triggers()
+            elif options['drop_triggers']:
+                drop_triggers()
+            rebuild_tag_counters(user_id)
+        self.stdout.write(self.style.SUCCESS("Tag counters rebuilt."))
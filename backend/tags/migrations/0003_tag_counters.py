@@ -0,0 +1,36 @@
+# Generated by Django 4.2.18 on 2026-10-18 18:22
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    schema_editor.execute("""
+        UPDATE tags_tag SET
+            task_count = (SELECT COUNT(*) FROM tasks_task WHERE tasks_task.tag_id = tags_tag.id),
+            completed_count = (
+                SELECT COUNT(*) FROM tasks_task
+                WHERE tasks_task.tag_id = tags_tag.id AND tasks_task.is_completed = %s
+            )
+    """, [True])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0002_alter_tag_name_alter_tag_user_and_more'),
+        ('tasks', '0004_taskdailyrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='completed_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='task_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
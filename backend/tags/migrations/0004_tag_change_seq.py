@@ -0,0 +1,22 @@
+# Generated by Django 4.2.18 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0003_tag_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='change_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'change_seq'], name='tag_user_change_seq_idx'),
+        ),
+    ]
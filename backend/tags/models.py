@@ -4,11 +4,17 @@ from users.models import CustomUser
 class Tag(models.Model):
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='tags')
     name = models.CharField(max_length=50)
+    # Tasks carrying this tag, kept in step by every task write (see tags/counters.py)
+    task_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    # The user's data version of the last write to this tag (see sync/)
+    change_seq = models.BigIntegerField(default=0)
 
     class Meta:
         unique_together = ('user', 'name')
         indexes = [
             models.Index(fields=['user', 'name']),
+            models.Index(fields=['user', 'change_seq'], name='tag_user_change_seq_idx'),
         ]
 
     def __str__(self):
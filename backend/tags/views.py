@@ -1,60 +1,58 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.authtoken.models import Token
+from django.db import transaction
+from jobs.queue import enqueue
+from mybackend.db_router import routes_reads_to_replica
 from tags.models import Tag  # Import Tag model
+from users.versioning import bump_data_version, conditional_on_data_version
 
 class CreateTagView(APIView):
     def post(self, request):
         """
         Handles POST requests to create a new tag for the authenticated user using Django ORM.
         """
-        authorization_token = request.headers.get("Authorization")
         data = request.data
 
-        if not authorization_token:
+        if request.auth is None:
             return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            token = Token.objects.get(key=authorization_token)
-            user = token.user
-        except Token.DoesNotExist:
-            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_401_UNAUTHORIZED)
+        user_id = request.user.id
 
         tag_name = data.get('name')
         if not tag_name:
             return Response({'error': 'Tag name is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Check if tag already exists using ORM
-        if Tag.objects.filter(user=user, name=tag_name).exists():
+        if Tag.objects.filter(user_id=user_id, name=tag_name).exists():
             return Response({'error': 'Tag already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Create tag using ORM
-        tag = Tag.objects.create(user=user, name=tag_name)
+        with transaction.atomic():
+            change_seq = bump_data_version(user_id)
+            tag = Tag.objects.create(user_id=user_id, name=tag_name, change_seq=change_seq)
 
         return Response({'message': 'Tag created successfully', 'tag_id': tag.id}, status=status.HTTP_201_CREATED)
 
 
 class GetTagsView(APIView):
+    @routes_reads_to_replica
+    @conditional_on_data_version
     def get(self, request):
         """
         Handles GET requests to retrieve all tags for the authenticated user using Django ORM.
         """
-        authorization_token = request.headers.get("Authorization")
-
-        if not authorization_token:
+        if request.auth is None:
             return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            token = Token.objects.get(key=authorization_token)
-            user = token.user
-        except Token.DoesNotExist:
-            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_401_UNAUTHORIZED)
+        user_id = request.user.id
 
-        # Fetch tags using ORM
-        tags = Tag.objects.filter(user=user).values('id', 'name')
+        # Fetch tags using ORM; the counts are stored on the tag rows
+        tags = list(Tag.objects.filter(user_id=user_id).values('id', 'name', 'task_count', 'completed_count'))
+        for tag in tags:
+            tag['open_count'] = tag['task_count'] - tag['completed_count']
 
-        return Response({'tags': list(tags)}, status=status.HTTP_200_OK)
+        return Response({'tags': tags}, status=status.HTTP_200_OK)
 
 
 class DeleteTagView(APIView):
@@ -62,27 +60,20 @@ class DeleteTagView(APIView):
         """
         Handles DELETE requests to delete a tag for the authenticated user using Django ORM.
         """
-        authorization_token = request.headers.get("Authorization")
         tag_id = request.data.get('tag_id')
 
-        if not authorization_token or not tag_id:
+        if request.auth is None or not tag_id:
             return Response({'error': 'Authorization token and tag ID are required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            token = Token.objects.get(key=authorization_token)
-            user = token.user
-        except Token.DoesNotExist:
-            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_401_UNAUTHORIZED)
+        user_id = request.user.id
 
         try:
-            tag = Tag.objects.get(id=tag_id, user=user)
+            tag = Tag.objects.get(id=tag_id, user_id=user_id)
         except Tag.DoesNotExist:
             return Response({'error': 'Tag not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        # Remove tag association in tasks before deleting the tag
-        tag.task_set.update(tag=None)
-
-        # Delete the tag using ORM
-        tag.delete()
+        # Untagging every task can take a while on big accounts, so it runs
+        # in chunks on a background worker (see tags/jobs.py)
+        job = enqueue('delete_tag', {'user_id': user_id, 'tag_id': tag.id}, user_id=user_id)
 
-        return Response({'message': 'Tag deleted successfully'}, status=status.HTTP_200_OK)
+        return Response({'message': 'Tag deletion scheduled', 'job_id': str(job.id)}, status=status.HTTP_202_ACCEPTED)
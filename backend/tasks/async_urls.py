@@ -0,0 +1,9 @@
+from django.urls import path
+from .async_views import AsyncGetTasksView, AsyncGetTasksByDateView, AsyncFilterTasksView
+
+# Served over ASGI only, see mybackend/asgi_urls.py
+urlpatterns = [
+    path('async/get/', AsyncGetTasksView.as_view(), name='async_get_tasks'),
+    path('async/get-by-date/', AsyncGetTasksByDateView.as_view(), name='async_get_tasks_by_date'),
+    path('async/filter/', AsyncFilterTasksView.as_view(), name='async_filter_tasks'),
+]
@@ -0,0 +1,93 @@
+# tasks/async_views.py
+
+from django.http import HttpResponse
+from mybackend.renderers import encode_json
+from mybackend.async_api import AsyncAPIView, error_response
+from mybackend.async_db import fetchall
+from .cache import task_result_cache
+from .filters import build_task_filters
+from .pagination import parse_page_params, paginate_query, split_page
+from .queries import TASK_LIST_SELECT
+from .serializers import serialize_filtered_task, serialize_task
+
+
+async def _cached_task_page(request, view_name, cache_params, query, params, page, serialize, prepare=None):
+    cache_key = task_result_cache.make_key(request.user_id, request.data_version, view_name, dict(cache_params, page=page))
+    cached = await task_result_cache.aget(cache_key)
+    if cached is not None:
+        return HttpResponse(encode_json(cached), content_type='application/json')
+
+    tasks = await fetchall(query, params, prepare=prepare)
+    tasks, next_cursor = split_page(tasks, page)
+
+    response_data = {'tasks': [serialize(task) for task in tasks]}
+    if page.limit is not None:
+        response_data['next_cursor'] = next_cursor
+
+    await task_result_cache.aset(cache_key, response_data)
+
+    return HttpResponse(encode_json(response_data), content_type='application/json')
+
+
+class AsyncGetTasksView(AsyncAPIView):
+    async def get(self, request):
+        """
+        Async version of GetTasksView.
+        """
+        try:
+            page = parse_page_params(request.GET)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        query, params = paginate_query(TASK_LIST_SELECT + """
+            WHERE t.user_id = %s
+        """, [request.user_id], page)
+
+        return await _cached_task_page(request, 'get', {}, query, params, page, serialize_task)
+
+
+class AsyncGetTasksByDateView(AsyncAPIView):
+    async def post(self, request):
+        """
+        Async version of GetTasksByDateView.
+        """
+        start_date = request.json.get('start_date')
+        end_date = request.json.get('end_date')
+
+        if not start_date or not end_date:
+            return error_response('Start date and end date are required', 400)
+
+        try:
+            page = parse_page_params(request.json)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        query, params = paginate_query(TASK_LIST_SELECT + """
+            WHERE t.user_id = %s AND t.date_created BETWEEN %s AND %s
+        """, [request.user_id, start_date, end_date], page)
+
+        return await _cached_task_page(request, 'get-by-date', {
+            'start_date': start_date,
+            'end_date': end_date,
+        }, query, params, page, serialize_task)
+
+
+class AsyncFilterTasksView(AsyncAPIView):
+    async def post(self, request):
+        """
+        Async version of FilterTasksView.
+        """
+        try:
+            filter_sql, filter_params, filters = build_task_filters(request.json)
+            page = parse_page_params(request.json)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        query, params = paginate_query(
+            TASK_LIST_SELECT + " WHERE t.user_id = %s" + filter_sql,
+            [request.user_id] + filter_params,
+            page
+        )
+
+        # The query text is one of a fixed set of filter and page shapes
+        return await _cached_task_page(request, 'filter', filters, query, params, page, serialize_filtered_task, prepare=True)
@@ -0,0 +1,100 @@
+import io
+
+from django.db import connection
+
+TASK_INSERT_COLUMNS = ('title', 'user_id', 'description', 'priority', 'tag_id', 'date_created', 'is_completed', 'change_seq')
+
+# Rows per multi-row INSERT statement (keeps parameter counts well under driver limits)
+INSERT_BATCH_SIZE = 1000
+
+# Above this many rows PostgreSQL loads through COPY instead of INSERT
+COPY_THRESHOLD = 1000
+
+
+def _copy_text(value):
+    """
+    Escapes a value for COPY ... FROM STDIN in the default text format.
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def copy_rows(cursor, table, columns, rows):
+    """
+    Loads row tuples with COPY ... FROM STDIN. Django runs on psycopg 3 when
+    both drivers are installed, and only psycopg2 has copy_expert.
+    """
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_text(value) for value in row))
+        buffer.write('\n')
+
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    if is_psycopg3:
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+    else:
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+
+
+def _insert_rows(cursor, rows):
+    ids = []
+    placeholders = '(' + ', '.join(['%s'] * len(TASK_INSERT_COLUMNS)) + ')'
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        batch = rows[start:start + INSERT_BATCH_SIZE]
+        cursor.execute(f"""
+            INSERT INTO tasks_task ({', '.join(TASK_INSERT_COLUMNS)})
+            VALUES {', '.join([placeholders] * len(batch))}
+            RETURNING id
+        """, [value for row in batch for value in row])
+        ids.extend(row[0] for row in cursor.fetchall())
+    return ids
+
+
+def _copy_rows(cursor, rows):
+    # COPY cannot return generated keys, so reserve ids from the sequence first
+    cursor.execute(
+        "SELECT nextval(pg_get_serial_sequence('tasks_task', 'id')) FROM generate_series(1, %s)",
+        [len(rows)]
+    )
+    ids = [row[0] for row in cursor.fetchall()]
+
+    copy_rows(cursor, 'tasks_task', ('id',) + TASK_INSERT_COLUMNS, ((task_id,) + tuple(row) for task_id, row in zip(ids, rows)))
+    return ids
+
+
+def insert_tasks(rows):
+    """
+    Inserts task rows ordered as TASK_INSERT_COLUMNS and returns their ids in
+    input order. Must be called inside a transaction.
+    """
+    if not rows:
+        return []
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql' and len(rows) > COPY_THRESHOLD:
+            return _copy_rows(cursor, rows)
+        return _insert_rows(cursor, rows)
+
+
+def load_tasks(cursor, rows):
+    """
+    Inserts task rows ordered as TASK_INSERT_COLUMNS without returning their
+    ids: through COPY on PostgreSQL at any size, so large imports skip the id
+    reservation insert_tasks() needs.
+    """
+    if connection.vendor == 'postgresql':
+        copy_rows(cursor, 'tasks_task', TASK_INSERT_COLUMNS, rows)
+    else:
+        _insert_rows(cursor, rows)
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from users.versioning import get_data_version
+
+# Alias in settings.CACHES; LocMemCache by default, RedisCache when TASK_CACHE_URL is set
+TASK_CACHE_ALIAS = 'task_results'
+
+
+class TaskResultCache:
+    """
+    Per-user cache of task list responses.
+
+    Keys embed the user's data version as a generation number. Every task/tag
+    write bumps that version, so stale entries simply stop being addressed and
+    age out through the backend's eviction policy instead of being scanned for.
+
+    The backend bounds the number of entries, not their size, so responses
+    with more than TASK_CACHE_MAX_ROWS tasks are not cached at all.
+    """
+
+    def __init__(self, alias=TASK_CACHE_ALIAS):
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def make_key(self, user_id, version, view_name, params):
+        if version is None:
+            version = get_data_version(user_id)
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f"tasks:{user_id}:{version}:{view_name}:{digest}"
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def _too_large(self, value):
+        if len(value['tasks']) <= settings.TASK_CACHE_MAX_ROWS:
+            return False
+        with self._lock:
+            self.skipped += 1
+        return True
+
+    def set(self, key, value):
+        if not self._too_large(value):
+            self.backend.set(key, value)
+
+    async def aget(self, key):
+        value = await self.backend.aget(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    async def aset(self, key, value):
+        if not self._too_large(value):
+            await self.backend.aset(key, value)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'skipped': self.skipped,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+task_result_cache = TaskResultCache()
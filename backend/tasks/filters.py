@@ -0,0 +1,109 @@
+import functools
+
+PRIORITY_MAPPING = {
+    'low': 1,
+    'medium': 2,
+    'high': 3
+}
+
+
+def build_task_filters(data, vendor='postgresql'):
+    """
+    Translates the filter fields of a request body (tags, start_date, end_date,
+    completed, priority) into SQL predicates on a task table aliased as `t`.
+
+    Returns (sql, params, normalized) where `normalized` is a canonical form of
+    the filters suitable for cache keys. Raises ValueError for invalid input.
+
+    On PostgreSQL the SQL only depends on which filters are present (see
+    compile_task_filters), never on their values or the number of tags.
+    """
+    tags = data.get('tags', [])  # Expecting list of tag IDs
+    start_date = data.get('start_date')  # Start date for range
+    end_date = data.get('end_date')      # End date for range
+    completed = data.get('completed', 'all')  # 'true', 'false', 'all'
+    priority = data.get('priority')  # 'low', 'medium', 'high'
+
+    params = []
+    tag_ids = []
+
+    if tags:
+        if not isinstance(tags, list):
+            raise ValueError('Tags must be a list of tag IDs.')
+        try:
+            tag_ids = [int(tag_id) for tag_id in tags]
+        except (TypeError, ValueError):
+            raise ValueError('Invalid tag IDs provided.')
+        if vendor == 'postgresql':
+            # One array parameter, however many tags
+            params.append(tag_ids)
+        else:
+            params.extend(tag_ids)
+
+    if start_date and end_date:
+        date_range = 'between'
+        params.extend([start_date, end_date])
+    elif start_date:
+        date_range = 'from'
+        params.append(start_date)
+    elif end_date:
+        date_range = 'until'
+        params.append(end_date)
+    else:
+        date_range = None
+
+    completed = str(completed).lower()
+    if completed not in ('true', 'false'):
+        completed = 'all'
+
+    priority_value = None
+    if priority:
+        if str(priority).lower() not in PRIORITY_MAPPING:
+            raise ValueError('Invalid priority value.')
+        priority_value = PRIORITY_MAPPING[str(priority).lower()]
+        params.append(priority_value)
+
+    if tag_ids and vendor != 'postgresql':
+        sql = compile_task_filters(False, date_range, completed, priority_value is not None)
+        placeholders = ','.join(['%s'] * len(tag_ids))
+        sql = f" AND t.tag_id IN ({placeholders})" + sql
+    else:
+        sql = compile_task_filters(bool(tag_ids), date_range, completed, priority_value is not None)
+
+    normalized = {
+        'tags': sorted(set(tag_ids)),
+        'start_date': start_date,
+        'end_date': end_date,
+        'completed': completed,
+        'priority': priority_value,
+    }
+    return sql, params, normalized
+
+
+@functools.lru_cache(maxsize=None)
+def compile_task_filters(tags, date_range, completed, priority):
+    """
+    Builds the predicates for one filter shape: whether tags and priority are
+    filtered, the date_range kind (None, 'from', 'until', 'between') and the
+    completed flag ('true', 'false' or 'all'). There are 48
+    shapes, each compiled once per process.
+    """
+    sql = ""
+    if tags:
+        sql += " AND t.tag_id = ANY(%s)"
+
+    if date_range == 'between':
+        sql += " AND t.date_created BETWEEN %s AND %s"
+    elif date_range == 'from':
+        sql += " AND t.date_created >= %s"
+    elif date_range == 'until':
+        sql += " AND t.date_created <= %s"
+
+    if completed == 'true':
+        sql += " AND t.is_completed = TRUE"
+    elif completed == 'false':
+        sql += " AND t.is_completed = FALSE"
+
+    if priority:
+        sql += " AND t.priority = %s"
+    return sql
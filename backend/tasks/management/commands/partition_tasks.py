@@ -0,0 +1,151 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+from tasks import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Converts tasks_task to a table hash-partitioned on user_id, one step at a time "
+        "while the app keeps serving: prepare, copy, swap, then drop-old. See tasks/partitioning.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('step', choices=['status', 'prepare', 'copy', 'swap', 'drop-old'])
+        parser.add_argument('--partitions', type=int, default=16, help="Number of partitions (prepare).")
+        parser.add_argument(
+            '--batch-size', type=int, default=partitioning.COPY_BATCH_SIZE,
+            help="Ids copied per transaction (copy)."
+        )
+        parser.add_argument(
+            '--lock-timeout', type=int, default=5,
+            help="Seconds to wait for the lock on tasks_task before giving up (swap)."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            partitioning.check_server(connection)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        step = options['step'].replace('-', '_')
+        getattr(self, step)(options)
+
+    def status(self, options):
+        with connection.cursor() as cursor:
+            if partitioning.is_partitioned(cursor, 'tasks_task'):
+                count = len(partitioning.partitions(cursor, 'tasks_task'))
+                self.stdout.write(f"tasks_task is hash-partitioned into {count} partitions.")
+                if partitioning.table_exists(cursor, partitioning.UNPARTITIONED_TABLE):
+                    self.stdout.write(f"{partitioning.UNPARTITIONED_TABLE} is still there; run drop-old.")
+                pending = partitioning.unvalidated_foreign_keys(cursor)
+                if pending:
+                    self.stdout.write(f"{len(pending)} foreign keys are not validated yet; run swap again.")
+            elif partitioning.table_exists(cursor, partitioning.PARTITIONED_TABLE):
+                copied_through, indexed = partitioning.copy_state(cursor)
+                cursor.execute("SELECT COALESCE(MAX(id), 0) FROM tasks_task")
+                max_id = cursor.fetchone()[0]
+                self.stdout.write(
+                    f"Copied ids up to {min(copied_through, max_id)} of {max_id}; "
+                    f"indexes {'built' if indexed else 'not built'}."
+                )
+            else:
+                self.stdout.write("tasks_task is not partitioned.")
+
+    def prepare(self, options):
+        if options['partitions'] < 2:
+            raise CommandError("--partitions must be at least 2.")
+        with transaction.atomic(), connection.cursor() as cursor:
+            if partitioning.is_partitioned(cursor, 'tasks_task'):
+                raise CommandError("tasks_task is already partitioned.")
+            if partitioning.table_exists(cursor, partitioning.PARTITIONED_TABLE):
+                raise CommandError(f"{partitioning.PARTITIONED_TABLE} already exists; run copy.")
+            partitioning.prepare(cursor, options['partitions'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {partitioning.PARTITIONED_TABLE} with {options['partitions']} partitions."
+        ))
+
+    def _require_prepared(self, cursor):
+        if not partitioning.table_exists(cursor, partitioning.PARTITIONED_TABLE):
+            raise CommandError("Run prepare first.")
+
+    def copy(self, options):
+        with connection.cursor() as cursor:
+            self._require_prepared(cursor)
+            copied_through, indexed = partitioning.copy_state(cursor)
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM tasks_task")
+            # Rows added after this are picked up by catching up
+            max_id = cursor.fetchone()[0]
+
+        started = time.perf_counter()
+        rows = 0
+        while copied_through < max_id:
+            with transaction.atomic(), connection.cursor() as cursor:
+                rows += partitioning.copy_batch(cursor, copied_through, options['batch_size'])
+            copied_through += options['batch_size']
+            self.stdout.write(f"Copied ids up to {min(copied_through, max_id)} of {max_id} ({rows} rows).")
+        self.stdout.write(f"Copied {rows} rows in {time.perf_counter() - started:.1f}s.")
+
+        if not indexed:
+            started = time.perf_counter()
+            with transaction.atomic(), connection.cursor() as cursor:
+                partitioning.finish_copy(cursor)
+            self.stdout.write(f"Built the indexes in {time.perf_counter() - started:.1f}s.")
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {partitioning.PARTITIONED_TABLE}")
+
+        self._catch_up()
+        self.stdout.write(self.style.SUCCESS("Copy done; run swap."))
+
+    def _catch_up(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            users, removed, copied = partitioning.catch_up(cursor)
+        self.stdout.write(f"Caught up {users} users: removed {removed} rows, copied {copied}.")
+
+    def swap(self, options):
+        with connection.cursor() as cursor:
+            swapped = partitioning.is_partitioned(cursor, 'tasks_task')
+            if not swapped:
+                self._require_prepared(cursor)
+                if not partitioning.copy_state(cursor)[1]:
+                    raise CommandError("Run copy first.")
+
+        if not swapped:
+            # Most of the changes since the copy, without holding the lock
+            self._catch_up()
+            started = time.perf_counter()
+            try:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute("SELECT set_config('lock_timeout', %s, true)", [f"{options['lock_timeout']}s"])
+                    cursor.execute("LOCK TABLE tasks_task IN ACCESS EXCLUSIVE MODE")
+                    users, removed, copied = partitioning.catch_up(cursor)
+                    partitioning.swap(cursor)
+            except OperationalError as e:
+                if 'lock timeout' in str(e):
+                    raise CommandError("Timed out waiting for the lock on tasks_task; run swap again.")
+                raise
+            self.stdout.write(
+                f"Swapped after catching up {users} users ({removed} rows removed, {copied} copied); "
+                f"tasks_task was locked for {time.perf_counter() - started:.2f}s."
+            )
+
+        with connection.cursor() as cursor:
+            pending = partitioning.unvalidated_foreign_keys(cursor)
+        for table, name in pending:
+            with connection.cursor() as cursor:
+                partitioning.validate_foreign_key(cursor, table, name)
+            self.stdout.write(f"Validated {name} on {table}.")
+        self.stdout.write(self.style.SUCCESS(
+            f"tasks_task is partitioned; run drop-old once you no longer need {partitioning.UNPARTITIONED_TABLE}."
+        ))
+
+    def drop_old(self, options):
+        with connection.cursor() as cursor:
+            if not partitioning.table_exists(cursor, partitioning.UNPARTITIONED_TABLE):
+                raise CommandError(f"{partitioning.UNPARTITIONED_TABLE} does not exist.")
+            if not partitioning.is_partitioned(cursor, 'tasks_task'):
+                raise CommandError("tasks_task is not partitioned; refusing to drop the old table.")
+            cursor.execute(f"DROP TABLE {partitioning.UNPARTITIONED_TABLE}")
+        self.stdout.write(self.style.SUCCESS(f"Dropped {partitioning.UNPARTITIONED_TABLE}."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from tasks.rollups import diff_rollups, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuilds TaskDailyRollup from tasks_task, or verifies it with --verify."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help="Only rebuild or verify this user's rollups.")
+        parser.add_argument('--verify', action='store_true', help="Report mismatches instead of rebuilding.")
+
+    def handle(self, *args, **options):
+        user_id = options['user']
+
+        if options['verify']:
+            mismatches = diff_rollups(user_id)
+            for mismatch_user, key, expected, actual in mismatches:
+                date, tag_id, priority, is_completed = key
+                self.stdout.write(
+                    f"user={mismatch_user} date={date} tag={tag_id} priority={priority} "
+                    f"completed={is_completed}: expected {expected}, found {actual}"
+                )
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} rollup rows are out of date; run without --verify to rebuild.")
+            self.stdout.write(self.style.SUCCESS("Rollups match tasks_task."))
+            return
+
+        with transaction.atomic():
+            rebuild_rollups(user_id)
+        self.stdout.write(self.style.SUCCESS("Rollups rebuilt."))
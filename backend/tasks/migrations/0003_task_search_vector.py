@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# Full-text search column maintained by PostgreSQL itself, so no view has to
+# keep it in sync. It is not declared on the model: Django never writes it.
+ADD_SEARCH_VECTOR = """
+    ALTER TABLE tasks_task ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED;
+    CREATE INDEX task_search_vector_idx ON tasks_task USING GIN (search_vector);
+"""
+
+DROP_SEARCH_VECTOR = """
+    DROP INDEX IF EXISTS task_search_vector_idx;
+    ALTER TABLE tasks_task DROP COLUMN IF EXISTS search_vector;
+"""
+
+
+def add_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(ADD_SEARCH_VECTOR)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH_VECTOR)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_alter_task_date_created_alter_task_is_completed_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, drop_search_vector),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.18 on 2026-10-18 18:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_rollups(apps, schema_editor):
+    schema_editor.execute("""
+        INSERT INTO tasks_taskdailyrollup (user_id, date, tag_id, priority, is_completed, task_count)
+        SELECT user_id, date_created, tag_id, priority, is_completed, COUNT(*)
+        FROM tasks_task
+        GROUP BY user_id, date_created, tag_id, priority, is_completed
+    """)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0002_alter_tag_name_alter_tag_user_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0003_task_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('priority', models.IntegerField(choices=[(1, 'Low'), (2, 'Medium'), (3, 'High')])),
+                ('is_completed', models.BooleanField()),
+                ('task_count', models.IntegerField(default=0)),
+                ('tag', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='tags.tag')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='taskdailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('tag__isnull', False)), fields=('user', 'date', 'tag', 'priority', 'is_completed'), name='rollup_user_date_tag_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('tag__isnull', True)), fields=('user', 'date', 'priority', 'is_completed'), name='rollup_user_date_untagged_uniq'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
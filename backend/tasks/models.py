@@ -16,6 +16,8 @@ class Task(models.Model):
     description = models.TextField()
     priority = models.IntegerField(choices=PRIORITY_CHOICES, default=2, db_index=True)
     tag = models.ForeignKey(Tag, on_delete=models.SET_NULL, null=True, blank=True)
+    # The user's data version of the last write to this task (see sync/)
+    change_seq = models.BigIntegerField(default=0)
 
     class Meta:
         indexes = [
@@ -27,7 +29,40 @@ class Task(models.Model):
             models.Index(fields=['user', 'is_completed'], name='task_user_completed_idx'),
             # Composite index for filtering by user and priority
             models.Index(fields=['user', 'priority'], name='task_user_priority_idx'),
+            # Delta sync: tasks changed since a given version
+            models.Index(fields=['user', 'change_seq'], name='task_user_change_seq_idx'),
         ]
 
     def __str__(self):
         return f"{self.title} - {self.user.username}"
+
+
+class TaskDailyRollup(models.Model):
+    """
+    Number of tasks per (user, date, tag, priority, completion state), kept up to
+    date incrementally by the task write paths (see tasks/rollups.py).
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+    date = models.DateField()
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, null=True, blank=True)
+    priority = models.IntegerField(choices=Task.PRIORITY_CHOICES)
+    is_completed = models.BooleanField()
+    task_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # NULL tags never collide in a plain unique index, so untagged rows get their own
+            models.UniqueConstraint(
+                fields=['user', 'date', 'tag', 'priority', 'is_completed'],
+                condition=models.Q(tag__isnull=False),
+                name='rollup_user_date_tag_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'date', 'priority', 'is_completed'],
+                condition=models.Q(tag__isnull=True),
+                name='rollup_user_date_untagged_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.user.username}: {self.task_count}"
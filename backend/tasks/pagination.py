@@ -0,0 +1,104 @@
+import base64
+import datetime
+from collections import namedtuple
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# limit is None when the client did not ask for pagination
+Page = namedtuple('Page', ['limit', 'after'])
+
+
+def encode_cursor(date_created, task_id):
+    """
+    Encodes the (date_created, id) of the last row on a page as an opaque token.
+    """
+    raw = f"{date_created.isoformat()}|{task_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Reverses encode_cursor, raising ValueError for anything it did not produce.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_part, id_part = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.date.fromisoformat(date_part), int(id_part)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor.')
+
+
+def encode_rank_cursor(rank, task_id):
+    """
+    Encodes the (rank, id) of the last row on a ranked search page.
+    """
+    raw = f"{rank!r}|{task_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_rank_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        rank_part, id_part = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return float(rank_part), int(id_part)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Invalid cursor.')
+
+
+def parse_page_params(params):
+    """
+    Reads `limit` and `cursor` from query params or a request body.
+    """
+    limit = params.get('limit')
+    cursor = params.get('cursor')
+
+    if limit is None and not cursor:
+        return Page(None, None)
+
+    return Page(parse_limit(limit), decode_cursor(cursor) if cursor else None)
+
+
+def parse_limit(limit):
+    """
+    Validates a page size, defaulting to DEFAULT_PAGE_SIZE and capping at MAX_PAGE_SIZE.
+    """
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError('Limit must be an integer.')
+    if limit < 1:
+        raise ValueError('Limit must be a positive integer.')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def paginate_query(query, params, page):
+    """
+    Appends the keyset predicate, ordering and limit for a task query aliased as `t`.
+
+    Rows are ordered by (date_created, id) so pages walk task_user_date_idx
+    and a deep page costs the same as the first one.
+    """
+    params = list(params)
+    if page.after is not None:
+        query += " AND (t.date_created, t.id) > (%s, %s)"
+        params.extend(page.after)
+    query += " ORDER BY t.date_created ASC, t.id ASC"
+    if page.limit is not None:
+        # Fetch one extra row to learn whether another page exists
+        query += " LIMIT %s"
+        params.append(page.limit + 1)
+    return query, params
+
+
+def split_page(rows, page, date_index=6):
+    """
+    Trims the look-ahead row and returns (rows, next_cursor).
+    """
+    if page.limit is None or len(rows) <= page.limit:
+        return rows, None
+    rows = rows[:page.limit]
+    last = rows[-1]
+    return rows, encode_cursor(last[date_index], last[0])
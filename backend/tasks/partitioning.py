@@ -0,0 +1,332 @@
+"""
+Conversion of tasks_task to a table hash-partitioned on user_id.
+
+Every task query is scoped to one user, so under PARTITION BY HASH (user_id)
+each one reads a single partition, and vacuum and index maintenance work on
+partitions a fraction of the table's size. Converting a large table is an
+operation rather than a migration; `manage.py partition_tasks` does it in
+steps while the app keeps serving:
+
+1. prepare: creates tasks_task_partitioned with the columns, defaults,
+   generated columns and CHECK constraints of tasks_task, and its partitions,
+   and records every user's data version in the snapshot table.
+2. copy: copies the rows across by id range, one transaction per batch, then
+   builds the primary key and the secondary indexes (PostgreSQL creates each
+   one on every partition) and catches up.
+3. swap: catches up, then locks tasks_task, catches up again and renames the
+   tables, moving the foreign keys and triggers across. The old table is kept
+   as tasks_task_unpartitioned.
+4. drop-old: drops tasks_task_unpartitioned.
+
+Catching up relies on every task write bumping the user's data version and
+stamping it on the rows it writes (see sync/): for each user whose version
+moved past the snapshot, the rows deleted or changed since are replaced from
+tasks_task, and the snapshot moves forward.
+
+A partitioned table's unique indexes must contain the partition key, so the
+primary key becomes (id, user_id); ids still come from a single sequence.
+PostgreSQL can't add a NOT VALID foreign key to a partitioned table, so the
+foreign keys go on each partition: NOT VALID during the swap, validated right
+after it without blocking writes. Django's schema editor doesn't see them
+there, so a later migration altering Task.user or Task.tag has to recreate
+them by hand.
+"""
+
+import re
+
+from .models import Task
+
+PARTITIONED_TABLE = 'tasks_task_partitioned'
+UNPARTITIONED_TABLE = 'tasks_task_unpartitioned'
+# Each user's data version as of the last catch-up
+SNAPSHOT_TABLE = 'tasks_task_partition_snapshot'
+# Copy progress: the last id range copied, and whether the indexes are built
+STATE_TABLE = 'tasks_task_partition_state'
+
+# Ids per copy transaction
+COPY_BATCH_SIZE = 500000
+# Declarative hash partitioning needs 11, generated columns on a partitioned table 12
+MIN_SERVER_VERSION = 120000
+# PostgreSQL truncates identifiers beyond this many bytes
+MAX_NAME_LENGTH = 63
+
+# Columns Django writes; the generated search_vector is left to PostgreSQL
+TASK_COLUMNS = tuple(field.column for field in Task._meta.concrete_fields)
+
+_INDEX_TARGET = re.compile(r'^CREATE INDEX \S+ ON (ONLY )?\S+ ')
+
+
+def check_server(connection):
+    if connection.vendor != 'postgresql':
+        raise ValueError('Partitioning tasks_task requires PostgreSQL.')
+    if connection.pg_version < MIN_SERVER_VERSION:
+        raise ValueError('Partitioning tasks_task requires PostgreSQL 12 or later.')
+
+
+def _prefixed(prefix, name):
+    prefixed = f'{prefix}_{name}'
+    if len(prefixed) > MAX_NAME_LENGTH:
+        raise ValueError(f'{prefixed} is longer than {MAX_NAME_LENGTH} characters.')
+    return prefixed
+
+
+def table_exists(cursor, table):
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [table])
+    return cursor.fetchone()[0]
+
+
+def is_partitioned(cursor, table):
+    cursor.execute("SELECT relkind = 'p' FROM pg_class WHERE oid = %s::regclass", [table])
+    return cursor.fetchone()[0]
+
+
+def partitions(cursor, table):
+    """
+    Names of table's partitions, in creation order.
+    """
+    cursor.execute("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = %s::regclass
+        ORDER BY c.oid
+    """, [table])
+    return [name for name, in cursor.fetchall()]
+
+
+def _indexes(cursor, table):
+    """
+    (name, definition, unique) of table's indexes other than the primary key.
+    """
+    cursor.execute("""
+        SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisunique
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE i.indrelid = %s::regclass AND NOT i.indisprimary
+        ORDER BY c.relname
+    """, [table])
+    return cursor.fetchall()
+
+
+def _constraints(cursor, table, kind):
+    """
+    (name, definition) of table's constraints of one pg_constraint.contype.
+    """
+    cursor.execute("""
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = %s
+        ORDER BY conname
+    """, [table, kind])
+    return cursor.fetchall()
+
+
+def create_table(cursor, table, partition_count=None, source='tasks_task'):
+    """
+    Creates an empty table with the columns, defaults, generated columns and
+    CHECK constraints of source, an id sequence of its own and no indexes.
+    With partition_count it is hash-partitioned on user_id into that many
+    partitions, named <table>_p<n>.
+    """
+    partition_by = ' PARTITION BY HASH (user_id)' if partition_count else ''
+    cursor.execute(f"CREATE SEQUENCE {table}_id_seq")
+    cursor.execute(f"""
+        CREATE TABLE {table} (
+            LIKE {source} INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS INCLUDING STORAGE
+        ){partition_by}
+    """)
+    # Identity columns can't be partitioned before PostgreSQL 17, so it's a plain sequence default
+    cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{table}_id_seq')")
+    cursor.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    for remainder in range(partition_count or 0):
+        cursor.execute(f"""
+            CREATE TABLE {table}_p{remainder} PARTITION OF {table}
+            FOR VALUES WITH (MODULUS {partition_count}, REMAINDER {remainder})
+        """)
+
+
+def create_indexes(cursor, table, source='tasks_task'):
+    """
+    Adds the primary key, and source's secondary indexes as <table>_<name>.
+    On a partitioned table every index is built on each partition.
+    """
+    key = '(id, user_id)' if is_partitioned(cursor, table) else '(id)'
+    cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY {key}")
+    for name, definition, unique in _indexes(cursor, source):
+        if unique:
+            raise ValueError(f'{name} is unique, which a partitioned table only allows with user_id in it.')
+        cursor.execute(_INDEX_TARGET.sub(f'CREATE INDEX {_prefixed(table, name)} ON {table} ', definition))
+
+
+def add_foreign_keys(cursor, table, source='tasks_task', not_valid=False):
+    """
+    Adds source's foreign keys to table, or to each of its partitions.
+    """
+    targets = partitions(cursor, table) or [table]
+    for name, definition in _constraints(cursor, source, 'f'):
+        for target in targets:
+            cursor.execute(f"ALTER TABLE {target} ADD CONSTRAINT {name} {definition}{' NOT VALID' if not_valid else ''}")
+
+
+def prepare(cursor, partition_count):
+    create_table(cursor, PARTITIONED_TABLE, partition_count)
+    cursor.execute(f"CREATE TABLE {SNAPSHOT_TABLE} (user_id bigint PRIMARY KEY, data_version bigint NOT NULL)")
+    # Taken before any row is copied: a row written after this carries a newer version
+    cursor.execute(f"INSERT INTO {SNAPSHOT_TABLE} SELECT id, data_version FROM users_customuser")
+    cursor.execute(f"CREATE TABLE {STATE_TABLE} (copied_through bigint NOT NULL, indexed boolean NOT NULL)")
+    cursor.execute(f"INSERT INTO {STATE_TABLE} VALUES (0, false)")
+
+
+def copy_state(cursor):
+    """
+    (last id copied, whether the indexes are built).
+    """
+    cursor.execute(f"SELECT copied_through, indexed FROM {STATE_TABLE}")
+    return cursor.fetchone()
+
+
+def copy_batch(cursor, after, batch_size):
+    """
+    Copies tasks with ids in (after, after + batch_size] and records the
+    progress. Returns the number of rows copied.
+    """
+    columns = ', '.join(TASK_COLUMNS)
+    cursor.execute(f"""
+        INSERT INTO {PARTITIONED_TABLE} ({columns})
+        SELECT {columns} FROM tasks_task WHERE id > %s AND id <= %s
+    """, [after, after + batch_size])
+    copied = cursor.rowcount
+    cursor.execute(f"UPDATE {STATE_TABLE} SET copied_through = %s", [after + batch_size])
+    return copied
+
+
+def finish_copy(cursor):
+    create_indexes(cursor, PARTITIONED_TABLE)
+    cursor.execute(f"UPDATE {STATE_TABLE} SET indexed = true")
+
+
+def catch_up(cursor):
+    """
+    Replaces the rows of every user whose data version moved past the
+    snapshot, or who was created or deleted since, then moves the snapshot
+    forward. Returns (users, rows removed, rows copied).
+
+    Run it in a REPEATABLE READ transaction, or with tasks_task locked, so
+    the versions and the rows it reads agree.
+    """
+    columns = ', '.join(TASK_COLUMNS)
+    cursor.execute(f"SELECT COALESCE(MAX(user_id), 0) FROM {SNAPSHOT_TABLE}")
+    newest_user = cursor.fetchone()[0]
+    cursor.execute(f"""
+        CREATE TEMPORARY TABLE partition_changed ON COMMIT DROP AS
+        SELECT u.id AS user_id, COALESCE(s.data_version, -1) AS since
+        FROM users_customuser u
+        LEFT JOIN {SNAPSHOT_TABLE} s ON s.user_id = u.id
+        WHERE s.user_id IS NULL OR u.data_version > s.data_version
+        UNION ALL
+        SELECT s.user_id, s.data_version FROM {SNAPSHOT_TABLE} s
+        WHERE NOT EXISTS (SELECT 1 FROM users_customuser u WHERE u.id = s.user_id)
+    """)
+    users = cursor.rowcount
+
+    # Keep only the rows still in tasks_task and unchanged since the snapshot
+    cursor.execute(f"""
+        DELETE FROM {PARTITIONED_TABLE} n USING partition_changed c
+        WHERE n.user_id = c.user_id
+          AND NOT EXISTS (SELECT 1 FROM tasks_task o WHERE o.id = n.id AND o.change_seq <= c.since)
+    """)
+    removed = cursor.rowcount
+    # Users created and deleted since the snapshot, whose rows a batch may have copied
+    cursor.execute(f"""
+        DELETE FROM {PARTITIONED_TABLE} n
+        WHERE n.user_id > %s AND NOT EXISTS (SELECT 1 FROM users_customuser u WHERE u.id = n.user_id)
+    """, [newest_user])
+    removed += cursor.rowcount
+
+    cursor.execute(f"""
+        INSERT INTO {PARTITIONED_TABLE} ({columns})
+        SELECT {', '.join(f'o.{column}' for column in TASK_COLUMNS)}
+        FROM partition_changed c
+        JOIN tasks_task o ON o.user_id = c.user_id AND o.change_seq > c.since
+    """)
+    copied = cursor.rowcount
+
+    cursor.execute(f"DELETE FROM {SNAPSHOT_TABLE} s USING partition_changed c WHERE s.user_id = c.user_id")
+    cursor.execute(f"""
+        INSERT INTO {SNAPSHOT_TABLE}
+        SELECT u.id, u.data_version FROM users_customuser u
+        JOIN partition_changed c ON c.user_id = u.id
+    """)
+    return users, removed, copied
+
+
+def swap(cursor):
+    """
+    Puts the partitioned table in place of tasks_task, which must be locked
+    and caught up. The foreign keys are left to validate_foreign_key().
+    """
+    foreign_keys = _constraints(cursor, 'tasks_task', 'f')
+    cursor.execute("""
+        SELECT tgname, pg_get_triggerdef(oid) FROM pg_trigger
+        WHERE tgrelid = 'tasks_task'::regclass AND NOT tgisinternal
+    """)
+    triggers = cursor.fetchall()
+    (old_key, _), = _constraints(cursor, 'tasks_task', 'p')
+    old_indexes = [name for name, _, _ in _indexes(cursor, 'tasks_task')]
+    new_indexes = [name for name, _, _ in _indexes(cursor, PARTITIONED_TABLE)]
+
+    # Ids handed out (or reserved, see tasks/bulk.py) so far must not come round again
+    cursor.execute(f"""
+        SELECT setval('{PARTITIONED_TABLE}_id_seq', GREATEST(
+            (SELECT last_value FROM {_serial_sequence(cursor, 'tasks_task')}),
+            (SELECT COALESCE(MAX(id), 1) FROM tasks_task)
+        ))
+    """)
+
+    add_foreign_keys(cursor, PARTITIONED_TABLE, not_valid=True)
+    # The old table must not hold up deleting users or tags, or count tasks twice
+    for name, _ in foreign_keys:
+        cursor.execute(f"ALTER TABLE tasks_task DROP CONSTRAINT {name}")
+    for name, _ in triggers:
+        cursor.execute(f"DROP TRIGGER {name} ON tasks_task")
+
+    cursor.execute(f"ALTER TABLE tasks_task RENAME TO {UNPARTITIONED_TABLE}")
+    cursor.execute(f"ALTER TABLE {UNPARTITIONED_TABLE} RENAME CONSTRAINT {old_key} TO {UNPARTITIONED_TABLE}_pkey")
+    for name in old_indexes:
+        cursor.execute(f"ALTER INDEX {name} RENAME TO {_prefixed(UNPARTITIONED_TABLE, name)}")
+
+    cursor.execute(f"ALTER TABLE {PARTITIONED_TABLE} RENAME TO tasks_task")
+    cursor.execute(f"ALTER TABLE tasks_task RENAME CONSTRAINT {PARTITIONED_TABLE}_pkey TO {old_key}")
+    for name in new_indexes:
+        cursor.execute(f"ALTER INDEX {name} RENAME TO {name[len(PARTITIONED_TABLE) + 1:]}")
+    for name in partitions(cursor, 'tasks_task'):
+        cursor.execute(f"ALTER TABLE {name} RENAME TO tasks_task{name[len(PARTITIONED_TABLE):]}")
+
+    # The definitions name tasks_task, which is now the partitioned table
+    for _, definition in triggers:
+        cursor.execute(definition)
+
+    cursor.execute(f"DROP TABLE {SNAPSHOT_TABLE}, {STATE_TABLE}")
+
+
+def _serial_sequence(cursor, table):
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [table])
+    return cursor.fetchone()[0]
+
+
+def validate_foreign_key(cursor, table, name):
+    # Takes SHARE UPDATE EXCLUSIVE, so reads and writes carry on meanwhile
+    cursor.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+
+
+def unvalidated_foreign_keys(cursor, table='tasks_task'):
+    """
+    (partition, constraint) foreign keys on table's partitions still NOT VALID,
+    e.g. after a swap whose validation was interrupted.
+    """
+    cursor.execute("""
+        SELECT c.relname, k.conname FROM pg_constraint k
+        JOIN pg_class c ON c.oid = k.conrelid
+        JOIN pg_inherits i ON i.inhrelid = c.oid
+        WHERE i.inhparent = %s::regclass AND k.contype = 'f' AND NOT k.convalidated
+        ORDER BY c.oid, k.conname
+    """, [table])
+    return cursor.fetchall()
@@ -0,0 +1,8 @@
+# Column list shared by every task list endpoint; rows are formatted by tasks/serializers.py
+TASK_LIST_SELECT = """
+    SELECT t.id, t.title, t.description, t.priority, 
+           tg.id AS tag_id, tg.name AS tag_name, 
+           t.date_created, t.is_completed 
+    FROM tasks_task t
+    LEFT JOIN tags_tag tg ON t.tag_id = tg.id
+"""
@@ -0,0 +1,84 @@
+"""
+Alternative encodings for the task list endpoints, picked by content
+negotiation (the Accept header, or ?format=columnar / ?format=msgpack).
+
+Columnar JSON sends one array per field instead of repeating every key on every
+row, and stores each distinct (tag_id, tag_name) pair once in a tag table that
+rows point into. MessagePack sends the regular document as binary.
+"""
+
+import datetime
+
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer
+from mybackend.renderers import ORJSONRenderer, encode_json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+# Columns of every task list, whether or not it has rows; tag_id/tag_name go
+# through the tag table as `tag`
+TASK_COLUMNS = ('id', 'title', 'description', 'priority', 'date_created', 'is_completed')
+
+
+def to_columnar(data, extra_fields=()):
+    """
+    Rewrites {'tasks': [row, ...], ...} into the columnar layout. Other keys
+    (next_cursor, ...) are kept as they are. extra_fields are columns beyond
+    TASK_COLUMNS that the endpoint adds to each row (search's rank).
+    """
+    tasks = data['tasks']
+    columns = {field: [task[field] for task in tasks] for field in TASK_COLUMNS + tuple(extra_fields)}
+
+    tag_table = {}
+    codes = []
+    for task in tasks:
+        codes.append(tag_table.setdefault((task['tag_id'], task['tag_name']), len(tag_table)))
+    columns['tag'] = codes
+
+    result = {key: value for key, value in data.items() if key != 'tasks'}
+    result['count'] = len(tasks)
+    result['columns'] = columns
+    result['tags'] = {
+        'tag_id': [tag_id for tag_id, _ in tag_table],
+        'tag_name': [tag_name for _, tag_name in tag_table],
+    }
+    return result
+
+
+class ColumnarJSONRenderer(ORJSONRenderer):
+    media_type = 'application/vnd.smartplanner.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and isinstance(data.get('tasks'), list):
+            view = (renderer_context or {}).get('view')
+            data = to_columnar(data, getattr(view, 'columnar_extra_fields', ()))
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+def _msgpack_default(value):
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return str(value)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+
+
+# JSON stays first, so clients sending no Accept header (or */*) get it
+TASK_LIST_RENDERERS = [ORJSONRenderer, ColumnarJSONRenderer]
+if msgpack is not None:
+    TASK_LIST_RENDERERS.append(MessagePackRenderer)
+TASK_LIST_RENDERERS.append(BrowsableAPIRenderer)
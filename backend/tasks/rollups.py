@@ -0,0 +1,142 @@
+import datetime
+from collections import Counter
+
+from django.db import connection
+from tags.counters import apply_tag_count_deltas
+
+# Task columns that determine which TaskDailyRollup row a task is counted in
+ROLLUP_FIELDS = ('tag_id', 'priority', 'is_completed')
+
+
+def rollup_key(date_created, tag_id, priority, is_completed):
+    """
+    Normalizes a task's (date, tag, priority, completion) into a rollup key.
+    """
+    if not isinstance(date_created, datetime.date):
+        date_created = datetime.date.fromisoformat(str(date_created))
+    return date_created, tag_id, int(priority), bool(is_completed)
+
+
+def lock_rollup_keys(cursor, user_id, task_ids):
+    """
+    Reads (and on databases that support it, row-locks) the current rollup keys
+    of the given tasks. Returns {task_id: key}. Must run inside a transaction.
+    """
+    if not task_ids:
+        return {}
+    placeholders = ','.join(['%s'] * len(task_ids))
+    query = f"""
+        SELECT id, date_created, tag_id, priority, is_completed
+        FROM tasks_task
+        WHERE user_id = %s AND id IN ({placeholders})
+    """
+    if connection.features.has_select_for_update:
+        query += " FOR UPDATE"
+    cursor.execute(query, [user_id] + list(task_ids))
+    return {row[0]: rollup_key(*row[1:]) for row in cursor.fetchall()}
+
+
+def _upsert(cursor, user_id, items, with_tag):
+    if with_tag:
+        columns = "user_id, date, tag_id, priority, is_completed, task_count"
+        target = "(user_id, date, tag_id, priority, is_completed) WHERE tag_id IS NOT NULL"
+        rows = [(user_id, key[0], key[1], key[2], key[3], delta) for key, delta in items]
+    else:
+        columns = "user_id, date, priority, is_completed, task_count"
+        target = "(user_id, date, priority, is_completed) WHERE tag_id IS NULL"
+        rows = [(user_id, key[0], key[2], key[3], delta) for key, delta in items]
+
+    placeholders = '(' + ', '.join(['%s'] * len(rows[0])) + ')'
+    cursor.execute(f"""
+        INSERT INTO tasks_taskdailyrollup ({columns})
+        VALUES {', '.join([placeholders] * len(rows))}
+        ON CONFLICT {target}
+        DO UPDATE SET task_count = tasks_taskdailyrollup.task_count + EXCLUDED.task_count
+    """, [value for row in rows for value in row])
+
+
+def _delete_empty(cursor, user_id, keys):
+    conditions = []
+    params = [user_id]
+    for date, tag_id, priority, is_completed in keys:
+        if tag_id is None:
+            conditions.append("(date = %s AND tag_id IS NULL AND priority = %s AND is_completed = %s)")
+            params += [date, priority, is_completed]
+        else:
+            conditions.append("(date = %s AND tag_id = %s AND priority = %s AND is_completed = %s)")
+            params += [date, tag_id, priority, is_completed]
+    cursor.execute(f"""
+        DELETE FROM tasks_taskdailyrollup
+        WHERE user_id = %s AND task_count <= 0 AND ({' OR '.join(conditions)})
+    """, params)
+
+
+def apply_rollup_deltas(user_id, deltas):
+    """
+    Adds a Counter of {rollup_key: delta} to the user's TaskDailyRollup rows with
+    upserts, then drops rows whose count reached zero. The same deltas keep the
+    Tag counters in step. Call inside the same transaction as the task write
+    that produced the deltas.
+    """
+    items = [(key, delta) for key, delta in deltas.items() if delta]
+    if not items:
+        return
+    with connection.cursor() as cursor:
+        tagged = [item for item in items if item[0][1] is not None]
+        untagged = [item for item in items if item[0][1] is None]
+        if tagged:
+            _upsert(cursor, user_id, tagged, with_tag=True)
+        if untagged:
+            _upsert(cursor, user_id, untagged, with_tag=False)
+        apply_tag_count_deltas(cursor, tagged)
+        # Only rows that were just decremented can have reached zero
+        emptied = [key for key, delta in items if delta < 0]
+        if emptied:
+            _delete_empty(cursor, user_id, emptied)
+
+
+def rebuild_rollups(user_id=None):
+    """
+    Recomputes TaskDailyRollup from tasks_task, for one user or everyone.
+    """
+    user_filter = "WHERE user_id = %s" if user_id is not None else ""
+    params = [user_id] if user_id is not None else []
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM tasks_taskdailyrollup {user_filter}", params)
+        cursor.execute(f"""
+            INSERT INTO tasks_taskdailyrollup (user_id, date, tag_id, priority, is_completed, task_count)
+            SELECT user_id, date_created, tag_id, priority, is_completed, COUNT(*)
+            FROM tasks_task
+            {user_filter}
+            GROUP BY user_id, date_created, tag_id, priority, is_completed
+        """, params)
+
+
+def diff_rollups(user_id=None):
+    """
+    Compares TaskDailyRollup with counts computed from tasks_task. Returns a
+    list of (user_id, key, expected, actual) for every mismatch.
+    """
+    user_filter = "WHERE user_id = %s" if user_id is not None else ""
+    params = [user_id] if user_id is not None else []
+    with connection.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT user_id, date_created, tag_id, priority, is_completed, COUNT(*)
+            FROM tasks_task
+            {user_filter}
+            GROUP BY user_id, date_created, tag_id, priority, is_completed
+        """, params)
+        expected = {(row[0],) + rollup_key(*row[1:5]): row[5] for row in cursor.fetchall()}
+
+        cursor.execute(f"""
+            SELECT user_id, date, tag_id, priority, is_completed, task_count
+            FROM tasks_taskdailyrollup
+            {user_filter}
+        """, params)
+        actual = {(row[0],) + rollup_key(*row[1:5]): row[5] for row in cursor.fetchall()}
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        if expected.get(key, 0) != actual.get(key, 0):
+            mismatches.append((key[0], key[1:], expected.get(key, 0), actual.get(key, 0)))
+    return mismatches
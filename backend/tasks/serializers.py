@@ -0,0 +1,62 @@
+from mybackend.renderers import encode_json
+from .models import Task
+
+# Built once instead of per row
+PRIORITY_LABELS = dict(Task.PRIORITY_CHOICES)
+
+# Dates are left as date objects: the JSON encoder (orjson, or DRF's
+# JSONEncoder as a fallback) writes them as YYYY-MM-DD without a strftime call.
+
+
+def serialize_task(task):
+    """
+    Formats a TASK_LIST_SELECT row for the task list endpoints.
+    """
+    return {
+        'id': task[0],
+        'title': task[1],
+        'description': task[2],
+        'priority': task[3],
+        'tag_id': task[4],
+        'tag_name': task[5] or "No Tag",
+        'date_created': task[6],
+        'is_completed': task[7]
+    }
+
+
+def serialize_updated_task(task):
+    """
+    Formats an UPDATED_TASK_COLUMNS row returned by an UPDATE.
+    """
+    return {
+        'id': task[0],
+        'title': task[1],
+        'description': task[2],
+        'priority': task[3],
+        'tag_id': task[4],
+        'date_created': task[5],
+        'is_completed': task[6]
+    }
+
+
+def serialize_filtered_task(task):
+    """
+    Same as serialize_task, but with the priority label FilterTasksView returns.
+    """
+    return {
+        'id': task[0],
+        'title': task[1],
+        'description': task[2],
+        'priority': PRIORITY_LABELS.get(task[3], 'Unknown'),
+        'tag_id': task[4],
+        'tag_name': task[5] or "No Tag",
+        'date_created': task[6],
+        'is_completed': task[7]
+    }
+
+
+def encode_task_rows(rows, format_row=serialize_task):
+    """
+    Encodes cursor rows straight to the bytes of a JSON array, in one encoder call.
+    """
+    return encode_json([format_row(row) for row in rows])
@@ -0,0 +1,62 @@
+from django.db import connection
+from django.http import StreamingHttpResponse
+from .serializers import encode_task_rows
+
+# Rows pulled from the server-side cursor per round-trip
+STREAM_CHUNK_SIZE = 2000
+
+# Renderer formats a stream can stand in for. It always writes the JSON
+# document; columnar and MessagePack need the whole result before encoding.
+STREAM_FORMATS = ('json', 'api')
+
+
+def wants_stream(value):
+    """
+    Interprets a `stream` flag from query params ('1', 'true') or a JSON body (true).
+    """
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def stream_format_error(request):
+    """
+    Returns an error message if the renderer negotiated for request can't be
+    streamed, else None.
+    """
+    if request.accepted_renderer.format not in STREAM_FORMATS:
+        return f'Streaming is only available as JSON, not {request.accepted_renderer.media_type}.'
+    return None
+
+
+def _iter_task_json(query, params, format_row, chunk_size, using):
+    # chunked_cursor() is a named (server-side) cursor on PostgreSQL, so rows
+    # are pulled from the database chunk by chunk instead of all at once.
+    cursor = using.chunked_cursor()
+    try:
+        cursor.execute(query, params)
+        yield b'{"tasks":['
+        first = True
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            # Encode the whole chunk as one array, then drop its brackets
+            encoded = encode_task_rows(rows, format_row)[1:-1]
+            yield encoded if first else b',' + encoded
+            first = False
+        yield b']}'
+    finally:
+        cursor.close()
+
+
+def stream_tasks(query, params, format_row, chunk_size=STREAM_CHUNK_SIZE, using=None):
+    """
+    Returns a StreamingHttpResponse that encodes each task row as it is fetched,
+    without materializing the full result set in memory. `using` is the
+    connection to read from (the default connection when omitted).
+    """
+    return StreamingHttpResponse(
+        _iter_task_json(query, params, format_row, chunk_size, using or connection),
+        content_type='application/json',
+    )
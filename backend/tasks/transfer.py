@@ -0,0 +1,334 @@
+"""
+Export and import of a user's tasks and tags as NDJSON or CSV.
+
+Exports stream from a server-side cursor, one chunk of rows at a time, so an
+account of any size is sent in constant memory. NDJSON has one object per
+line: first the user's tags, then the tasks, which refer to their tag by name.
+
+    {"type":"tag","name":"work"}
+    {"type":"task","id":7,"title":"Meeting","description":"","priority":2,"tag":"work","date_created":"2025-01-20","is_completed":false}
+
+CSV has a header and one row per task with the same fields. Tags without
+tasks are only in NDJSON.
+
+Imports read the upload line by line in batches of IMPORT_BATCH_SIZE tasks.
+Each batch creates its missing tag names with one INSERT ... ON CONFLICT
+(user_id, name) DO NOTHING, looks their ids up with one SELECT, and loads its
+tasks with COPY on PostgreSQL. The whole import is one transaction with one
+data version, so it lands completely or not at all.
+"""
+
+import codecs
+import csv
+import datetime
+import io
+import json
+from collections import Counter
+
+from django.db import connection
+from rest_framework.renderers import BaseRenderer
+from mybackend.renderers import encode_json
+from tags.models import Tag
+from .bulk import load_tasks
+from .models import Task
+from .rollups import apply_rollup_deltas, rollup_key
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Rows per server-side cursor fetch while exporting
+EXPORT_CHUNK_SIZE = 5000
+# Tasks parsed before their tags are resolved and they are loaded
+IMPORT_BATCH_SIZE = 50000
+# Tag names per INSERT / SELECT while resolving them
+TAG_BATCH_SIZE = 500
+
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/x-jsonlines')
+TITLE_MAX_LENGTH = Task._meta.get_field('title').max_length
+TAG_NAME_MAX_LENGTH = Tag._meta.get_field('name').max_length
+PRIORITIES = {value for value, _ in Task.PRIORITY_CHOICES}
+
+EXPORT_FIELDS = ('id', 'title', 'description', 'priority', 'tag', 'date_created', 'is_completed')
+
+EXPORT_TASKS_SELECT = """
+    SELECT t.id, t.title, t.description, t.priority, tg.name, t.date_created, t.is_completed
+    FROM tasks_task t
+    LEFT JOIN tags_tag tg ON t.tag_id = tg.id
+    WHERE t.user_id = %s
+    ORDER BY t.id
+"""
+
+_TRUE = ('1', 'true', 't', 'yes', 'y')
+_FALSE = ('', '0', 'false', 'f', 'no', 'n')
+
+_decode_json = orjson.loads if orjson is not None else json.loads
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Used for negotiation and for error bodies; exports are streamed by the view.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return encode_json(data) + b'\n'
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Used for negotiation and for error bodies (a header row and a value row).
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(list(data))
+        writer.writerow(list(data.values()))
+        return buffer.getvalue().encode()
+
+
+EXPORT_RENDERERS = [NDJSONRenderer, CSVRenderer]
+
+
+def _fetch_chunks(using, query, params, chunk_size):
+    # Named (server-side) cursor on PostgreSQL, see tasks/streaming.py
+    cursor = using.chunked_cursor()
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+
+def iter_ndjson(user_id, using, chunk_size=EXPORT_CHUNK_SIZE):
+    for rows in _fetch_chunks(using, "SELECT name FROM tags_tag WHERE user_id = %s ORDER BY id", [user_id], chunk_size):
+        yield b''.join(encode_json({'type': 'tag', 'name': name}) + b'\n' for name, in rows)
+    for rows in _fetch_chunks(using, EXPORT_TASKS_SELECT, [user_id], chunk_size):
+        yield b''.join(
+            encode_json({'type': 'task', **dict(zip(EXPORT_FIELDS, row))}) + b'\n'
+            for row in rows
+        )
+
+
+def iter_csv(user_id, using, chunk_size=EXPORT_CHUNK_SIZE):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for rows in _fetch_chunks(using, EXPORT_TASKS_SELECT, [user_id], chunk_size):
+        for task_id, title, description, priority, tag, date_created, is_completed in rows:
+            writer.writerow((task_id, title, description, priority, tag or '', date_created, 'true' if is_completed else 'false'))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def import_format(content_type, filename=''):
+    """
+    'ndjson' or 'csv' from an upload's content type or file name, else None.
+    """
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    filename = (filename or '').lower()
+    if content_type in ('text/csv', 'application/csv') or filename.endswith('.csv'):
+        return 'csv'
+    if content_type in NDJSON_CONTENT_TYPES or filename.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return None
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError('is_completed must be true or false')
+
+
+def _parse_task(record):
+    """
+    Validates an imported task and returns (title, description, priority,
+    tag name, date_created, is_completed).
+    """
+    title = record.get('title')
+    if not title or not isinstance(title, str):
+        raise ValueError('title is required')
+    if len(title) > TITLE_MAX_LENGTH:
+        raise ValueError('title is too long')
+    description = record.get('description') or ''
+    if not isinstance(description, str):
+        raise ValueError('description must be a string')
+    priority = record.get('priority')
+    try:
+        priority = int(priority) if priority not in (None, '') else 2
+    except (TypeError, ValueError):
+        raise ValueError('priority must be 1, 2 or 3')
+    if priority not in PRIORITIES:
+        raise ValueError('priority must be 1, 2 or 3')
+    tag = record.get('tag') or None
+    if tag is not None and (not isinstance(tag, str) or len(tag) > TAG_NAME_MAX_LENGTH):
+        raise ValueError(f'tag must be a name of at most {TAG_NAME_MAX_LENGTH} characters')
+    try:
+        date_created = datetime.date.fromisoformat(str(record.get('date_created') or ''))
+    except ValueError:
+        raise ValueError('date_created must be a YYYY-MM-DD date')
+    return title, description, priority, tag, date_created, _parse_bool(record.get('is_completed', False))
+
+
+def _ndjson_records(lines):
+    """
+    Yields (line number, 'tag' or 'task', value) from NDJSON lines.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = _decode_json(line)
+        except ValueError:
+            raise ValueError(f'Line {number}: invalid JSON')
+        if not isinstance(record, dict):
+            raise ValueError(f'Line {number}: expected a JSON object')
+        kind = record.get('type', 'task')
+        try:
+            if kind == 'tag':
+                name = record.get('name')
+                if not name or not isinstance(name, str) or len(name) > TAG_NAME_MAX_LENGTH:
+                    raise ValueError(f'tag name is required, at most {TAG_NAME_MAX_LENGTH} characters')
+                yield number, 'tag', name
+            elif kind == 'task':
+                yield number, 'task', _parse_task(record)
+            else:
+                raise ValueError(f'unknown type {kind!r}')
+        except ValueError as e:
+            raise ValueError(f'Line {number}: {e}')
+
+
+def _csv_records(lines):
+    """
+    Yields (line number, 'task', value) from CSV lines with a header row.
+    Quoted fields may span lines.
+    """
+    reader = csv.DictReader(lines)
+    missing = {'title', 'date_created'} - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"CSV header is missing {', '.join(sorted(missing))}")
+    for record in reader:
+        try:
+            yield reader.line_num, 'task', _parse_task(record)
+        except ValueError as e:
+            raise ValueError(f'Line {reader.line_num}: {e}')
+
+
+class TaskImporter:
+    """
+    Loads parsed tags and tasks for one user in batches. Must be used inside
+    the transaction that bumped the user's data version to change_seq.
+    """
+
+    def __init__(self, user_id, change_seq, batch_size=IMPORT_BATCH_SIZE):
+        self.user_id = user_id
+        self.change_seq = change_seq
+        self.batch_size = batch_size
+        # Tag name -> id, for every name seen so far
+        self.tag_ids = {}
+        self.pending_tags = set()
+        self.pending_tasks = []
+        self.rollup_deltas = Counter()
+        self.tasks_imported = 0
+        self.tags_created = 0
+
+    def add_tag(self, name):
+        if name not in self.tag_ids:
+            self.pending_tags.add(name)
+
+    def add_task(self, task):
+        if task[3] is not None and task[3] not in self.tag_ids:
+            self.pending_tags.add(task[3])
+        self.pending_tasks.append(task)
+        if len(self.pending_tasks) >= self.batch_size:
+            self.flush()
+
+    def _resolve_tags(self, cursor):
+        names = sorted(self.pending_tags)
+        self.pending_tags = set()
+        for start in range(0, len(names), TAG_BATCH_SIZE):
+            batch = names[start:start + TAG_BATCH_SIZE]
+            # Existing names are left alone by the (user_id, name) unique index
+            cursor.execute(f"""
+                INSERT INTO tags_tag (user_id, name, task_count, completed_count, change_seq)
+                VALUES {', '.join(['(%s, %s, 0, 0, %s)'] * len(batch))}
+                ON CONFLICT (user_id, name) DO NOTHING
+                RETURNING id, name
+            """, [value for name in batch for value in (self.user_id, name, self.change_seq)])
+            created = cursor.fetchall()
+            self.tags_created += len(created)
+            self.tag_ids.update((name, tag_id) for tag_id, name in created)
+
+            existing = [name for name in batch if name not in self.tag_ids]
+            if existing:
+                cursor.execute(f"""
+                    SELECT id, name FROM tags_tag
+                    WHERE user_id = %s AND name IN ({', '.join(['%s'] * len(existing))})
+                """, [self.user_id] + existing)
+                self.tag_ids.update((name, tag_id) for tag_id, name in cursor.fetchall())
+
+    def flush(self):
+        with connection.cursor() as cursor:
+            if self.pending_tags:
+                self._resolve_tags(cursor)
+            if not self.pending_tasks:
+                return
+            rows = []
+            for title, description, priority, tag, date_created, is_completed in self.pending_tasks:
+                tag_id = self.tag_ids[tag] if tag is not None else None
+                rows.append((title, self.user_id, description, priority, tag_id, date_created, is_completed, self.change_seq))
+                self.rollup_deltas[rollup_key(date_created, tag_id, priority, is_completed)] += 1
+            load_tasks(cursor, rows)
+            self.tasks_imported += len(rows)
+            self.pending_tasks = []
+
+    def finish(self):
+        self.flush()
+        # Also brings the tag counters up to date
+        apply_rollup_deltas(self.user_id, self.rollup_deltas)
+
+
+def import_tasks(user_id, change_seq, lines, file_format):
+    """
+    Imports an iterable of encoded lines (an upload, or the request body) and
+    returns the counts. Raises ValueError, naming the line, on the first
+    invalid record; the caller's transaction then discards everything.
+    """
+    text = codecs.iterdecode(lines, 'utf-8-sig')
+    records = _csv_records(text) if file_format == 'csv' else _ndjson_records(text)
+    importer = TaskImporter(user_id, change_seq)
+    try:
+        for _, kind, value in records:
+            if kind == 'tag':
+                importer.add_tag(value)
+            else:
+                importer.add_task(value)
+    except UnicodeDecodeError:
+        raise ValueError('The file must be UTF-8 encoded')
+    except csv.Error as e:
+        raise ValueError(f'Invalid CSV: {e}')
+    importer.finish()
+    return {'tasks_imported': importer.tasks_imported, 'tags_created': importer.tags_created}
@@ -1,12 +1,18 @@
 from django.urls import path
-from .views import CreateTaskView, UpdateTaskView, DeleteTaskView, GetTasksView, GetTasksByDateView, FilterTasksView
+from .views import CreateTaskView, BulkCreateTaskView, UpdateTaskView, BulkUpdateTaskView, DeleteTaskView, GetTasksView, GetTasksByDateView, FilterTasksView, SearchTasksView, TaskStatsView, ExportTasksView, ImportTasksView
 
 urlpatterns = [
     path('create/', CreateTaskView.as_view(), name='create_task'),
+    path('bulk-create/', BulkCreateTaskView.as_view(), name='bulk_create_task'),
     path('update/', UpdateTaskView.as_view(), name='update_task'),
+    path('bulk-update/', BulkUpdateTaskView.as_view(), name='bulk_update_task'),
     path('delete/', DeleteTaskView.as_view(), name='delete_task'),
     path('get/', GetTasksView.as_view(), name='get_tasks'),
     path('get-by-date/', GetTasksByDateView.as_view(), name='get_tasks_by_date'),
     path('filter/', FilterTasksView.as_view(), name='filter_tasks'),
+    path('search/', SearchTasksView.as_view(), name='search_tasks'),
+    path('stats/', TaskStatsView.as_view(), name='task_stats'),
+    path('export/', ExportTasksView.as_view(), name='export_tasks'),
+    path('import/', ImportTasksView.as_view(), name='import_tasks'),
 
 ]
@@ -1,14 +1,54 @@
 # tasks/views.py
 
-from django.db import connection
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.authtoken.models import Token
+from .bulk import insert_tasks
+from .cache import task_result_cache
+from .filters import build_task_filters
 from .models import Task
+from .queries import TASK_LIST_SELECT
+from .renderers import TASK_LIST_RENDERERS
+from .pagination import (
+    decode_rank_cursor, encode_rank_cursor, parse_limit, parse_page_params, paginate_query, split_page
+)
+from .rollups import ROLLUP_FIELDS, apply_rollup_deltas, lock_rollup_keys, rollup_key
+from .serializers import serialize_filtered_task, serialize_task, serialize_updated_task
+from .streaming import stream_format_error, stream_tasks, wants_stream
+from .transfer import EXPORT_RENDERERS, import_format, import_tasks, iter_csv, iter_ndjson
+from mybackend.db_router import get_read_connection, routes_reads_to_replica
+from mybackend.prepared import execute_prepared
+from sync.changes import record_tombstones
+from sync.models import Tombstone
 from tags.models import Tag
+from users.versioning import bump_data_version, conditional_on_data_version
+from collections import Counter
+import datetime
 import json
 
+# Task columns a client may change through the update endpoints
+UPDATABLE_FIELDS = ('title', 'description', 'priority', 'tag_id', 'is_completed')
+
+# (column, SQL type) used to type the VALUES list of a bulk update; title is
+# checked against its max_length by clean_patch rather than cut short by a cast
+BULK_UPDATE_FIELDS = (
+    ('title', 'text'),
+    ('description', 'text'),
+    ('priority', 'integer'),
+    ('tag_id', 'bigint'),
+    ('is_completed', 'boolean'),
+)
+
+MAX_BULK_SIZE = 1000
+MAX_BULK_CREATE_SIZE = 10000
+
+# Text search configuration used to build Task.search_vector
+SEARCH_CONFIG = 'english'
+
+UPDATED_TASK_COLUMNS = "id, title, description, priority, tag_id, date_created, is_completed"
+
 
 class CreateTaskView(APIView):
     def post(self, request):
@@ -16,17 +56,12 @@ class CreateTaskView(APIView):
         Handles POST requests to create a new task for the authenticated user.
         """
 
-        authorization_token = request.headers.get("Authorization")
         data = request.data
 
-        if not authorization_token:
+        if request.auth is None:
             return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            token = Token.objects.get(key=authorization_token)
-            user_id = token.user_id
-        except Token.DoesNotExist:
-            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_401_UNAUTHORIZED)
+        user_id = request.user.id
 
         title = data.get('title')
         description = data.get('description', '')
@@ -44,81 +79,254 @@ class CreateTaskView(APIView):
             except Tag.DoesNotExist:
                 return Response({'error': 'Invalid tag ID'}, status=status.HTTP_400_BAD_REQUEST)
 
-        with connection.cursor() as cursor:
+        with transaction.atomic(), connection.cursor() as cursor:
+            change_seq = bump_data_version(user_id)
             cursor.execute("""
-                INSERT INTO tasks_task (title, user_id, description, priority, tag_id, date_created, is_completed)
-                VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING id
-            """, [title, user_id, description, priority, tag.id if tag else None, date_created, False])
+                INSERT INTO tasks_task (title, user_id, description, priority, tag_id, date_created, is_completed, change_seq)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
+            """, [title, user_id, description, priority, tag.id if tag else None, date_created, False, change_seq])
             
             task_id = cursor.fetchone()[0]
+            apply_rollup_deltas(user_id, Counter([rollup_key(date_created, tag.id if tag else None, priority, False)]))
 
         return Response({'message': 'Task created successfully', 'task_id': task_id}, status=status.HTTP_201_CREATED)
 
 
+class BulkCreateTaskView(APIView):
+    def post(self, request):
+        """
+        Handles POST requests to create many tasks for the authenticated user at once.
+        """
+        if request.auth is None:
+            return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.id
+
+        tasks = request.data.get('tasks')
+        if not tasks or not isinstance(tasks, list):
+            return Response({'error': 'Tasks must be a non-empty list of tasks.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(tasks) > MAX_BULK_CREATE_SIZE:
+            return Response({'error': f'At most {MAX_BULK_CREATE_SIZE} tasks can be created per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = []
+        tag_ids = set()
+        for index, task in enumerate(tasks):
+            if not isinstance(task, dict) or not (task.get('title') and task.get('date_created')):
+                return Response({'error': f'Title and date_created are required (item {index})'}, status=status.HTTP_400_BAD_REQUEST)
+            if len(str(task['title'])) > Task._meta.get_field('title').max_length:
+                return Response({'error': f'Title is too long (item {index})'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                date_created = datetime.date.fromisoformat(str(task['date_created']))
+                priority = int(task.get('priority', 2))
+                tag_id = int(task['tag_id']) if task.get('tag_id') else None
+            except (TypeError, ValueError):
+                return Response({'error': f'Invalid task data (item {index})'}, status=status.HTTP_400_BAD_REQUEST)
+            if tag_id is not None:
+                tag_ids.add(tag_id)
+            rows.append((task['title'], user_id, task.get('description', ''), priority, tag_id, date_created, False))
+
+        # Validate every referenced tag with one query
+        if tag_ids:
+            valid_tag_ids = set(Tag.objects.filter(id__in=tag_ids, user_id=user_id).values_list('id', flat=True))
+            if tag_ids - valid_tag_ids:
+                return Response({'error': 'Invalid tag ID'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            change_seq = bump_data_version(user_id)
+            task_ids = insert_tasks([row + (change_seq,) for row in rows])
+            apply_rollup_deltas(user_id, Counter(rollup_key(row[5], row[4], row[3], row[6]) for row in rows))
+
+        return Response({'message': 'Tasks created successfully', 'task_ids': task_ids}, status=status.HTTP_201_CREATED)
+
+
+def clean_patch(patch):
+    """
+    Returns the fields of a task update (one patch of a bulk update) converted
+    to the values stored, raising ValueError if one can't be stored.
+    """
+    cleaned = {}
+    if 'title' in patch:
+        title = patch['title']
+        if not title or not isinstance(title, str):
+            raise ValueError('Title must be a non-empty string')
+        if len(title) > Task._meta.get_field('title').max_length:
+            raise ValueError('Title is too long')
+        cleaned['title'] = title
+    if 'description' in patch:
+        if not isinstance(patch['description'], str):
+            raise ValueError('Description must be a string')
+        cleaned['description'] = patch['description']
+    if 'priority' in patch:
+        try:
+            priority = int(patch['priority'])
+        except (TypeError, ValueError):
+            raise ValueError('Invalid priority')
+        if priority not in dict(Task.PRIORITY_CHOICES):
+            raise ValueError('Invalid priority')
+        cleaned['priority'] = priority
+    if 'tag_id' in patch:
+        try:
+            cleaned['tag_id'] = int(patch['tag_id']) if patch['tag_id'] else None
+        except (TypeError, ValueError):
+            raise ValueError('Invalid tag ID')
+    if 'is_completed' in patch:
+        if not isinstance(patch['is_completed'], bool):
+            raise ValueError('is_completed must be true or false')
+        cleaned['is_completed'] = patch['is_completed']
+    return cleaned
+
+
 class UpdateTaskView(APIView):
     def post(self, request):
         """
         Handles POST requests to update a task for the authenticated user.
         """
-        authorization_token = request.headers.get("Authorization")
         data = request.data
 
-        if not authorization_token:
+        if request.auth is None:
             return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            token = Token.objects.get(key=authorization_token)
-            user_id = token.user_id
-        except Token.DoesNotExist:
-            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_401_UNAUTHORIZED)
+        user_id = request.user.id
 
         task_id = data.get('task_id')
         if not task_id:
             return Response({'error': 'Task ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            task_id = int(task_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid task ID'}, status=status.HTTP_400_BAD_REQUEST)
 
-        tag_id = data.get('tag_id', None)
+        try:
+            fields = clean_patch(data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if fields.get('tag_id') and not Tag.objects.filter(id=fields['tag_id'], user_id=user_id).exists():
+            return Response({'error': 'Invalid tag ID'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Build a single UPDATE covering every field present in the payload
+        assignments = []
+        params = []
+        for field in UPDATABLE_FIELDS:
+            if field in fields:
+                assignments.append(f"{field} = %s")
+                params.append(fields[field])
+
+        if not assignments:
+            return Response({'error': 'No fields to update'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Only tag, priority and completion changes move the task between rollup rows
+        track_rollup = any(field in fields for field in ROLLUP_FIELDS)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            change_seq = bump_data_version(user_id)
+            old_keys = lock_rollup_keys(cursor, user_id, [task_id]) if track_rollup else {}
+            cursor.execute(f"""
+                UPDATE tasks_task SET {', '.join(assignments)}, change_seq = %s
+                WHERE id = %s AND user_id = %s
+                RETURNING {UPDATED_TASK_COLUMNS}
+            """, params + [change_seq, task_id, user_id])
+            updated = cursor.fetchone()
+            if updated is None:
+                # Nothing changed, so don't keep the version bump
+                transaction.set_rollback(True)
+            elif track_rollup:
+                deltas = Counter([rollup_key(updated[5], updated[4], updated[3], updated[6])])
+                deltas[old_keys[updated[0]]] -= 1
+                apply_rollup_deltas(user_id, deltas)
+
+        if updated is None:
+            return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({'message': 'Task updated successfully', 'task': serialize_updated_task(updated)}, status=status.HTTP_200_OK)
+
+
+class BulkUpdateTaskView(APIView):
+    def post(self, request):
+        """
+        Handles POST requests to apply many task patches for the authenticated user
+        in a single UPDATE ... FROM (VALUES ...) statement.
+        """
+        if request.auth is None:
+            return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if tag_id:
+        user_id = request.user.id
+
+        patches = request.data.get('tasks')
+        if not patches or not isinstance(patches, list):
+            return Response({'error': 'Tasks must be a non-empty list of task updates.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(patches) > MAX_BULK_SIZE:
+            return Response({'error': f'At most {MAX_BULK_SIZE} tasks can be updated per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        task_ids = []
+        cleaned = []
+        for index, patch in enumerate(patches):
+            if not isinstance(patch, dict) or not patch.get('task_id'):
+                return Response({'error': f'Task ID is required (item {index})'}, status=status.HTTP_400_BAD_REQUEST)
             try:
-                tag = Tag.objects.get(id=tag_id, user_id=user_id)
-            except Tag.DoesNotExist:
+                task_ids.append(int(patch['task_id']))
+            except (TypeError, ValueError):
+                return Response({'error': f'Invalid task ID (item {index})'}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                cleaned.append(clean_patch(patch))
+            except ValueError as e:
+                return Response({'error': f'{e} (item {index})'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(set(task_ids)) != len(task_ids):
+            return Response({'error': 'Each task can only appear once per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Validate every referenced tag with one query
+        tag_ids = {patch['tag_id'] for patch in cleaned if patch.get('tag_id')}
+        if tag_ids:
+            valid_tag_ids = set(Tag.objects.filter(id__in=tag_ids, user_id=user_id).values_list('id', flat=True))
+            if tag_ids - valid_tag_ids:
                 return Response({'error': 'Invalid tag ID'}, status=status.HTTP_400_BAD_REQUEST)
-        else:
-            tag = None
-
-        with connection.cursor() as cursor:
-            # Update title if provided
-            if 'title' in data:
-                cursor.execute(
-                    "UPDATE tasks_task SET title = %s WHERE id = %s AND user_id = %s",
-                    [data['title'], task_id, user_id]
-                )
-            # Update description if provided
-            if 'description' in data:
-                cursor.execute(
-                    "UPDATE tasks_task SET description = %s WHERE id = %s AND user_id = %s",
-                    [data['description'], task_id, user_id]
-                )
-            # Update priority if provided
-            if 'priority' in data:
-                cursor.execute(
-                    "UPDATE tasks_task SET priority = %s WHERE id = %s AND user_id = %s",
-                    [data['priority'], task_id, user_id]
-                )
-            # Update tag_id if provided
-            if 'tag_id' in data:
-                cursor.execute(
-                    "UPDATE tasks_task SET tag_id = %s WHERE id = %s AND user_id = %s",
-                    [tag.id if tag else None, task_id, user_id]
-                )
-            # Update is_completed if provided
-            if 'is_completed' in data:
-                cursor.execute(
-                    "UPDATE tasks_task SET is_completed = %s WHERE id = %s AND user_id = %s",
-                    [data['is_completed'], task_id, user_id]
-                )
-
-        return Response({'message': 'Task updated successfully'}, status=status.HTTP_200_OK)
+
+        # One VALUES row per patch: the task id, then a (provided, value) pair per field
+        rows = []
+        params = []
+        for task_id, patch in zip(task_ids, cleaned):
+            rows.append('(' + ', '.join(['CAST(%s AS bigint)'] + [
+                f'CAST(%s AS boolean), CAST(%s AS {sql_type})' for _, sql_type in BULK_UPDATE_FIELDS
+            ]) + ')')
+            params.append(task_id)
+            for field, _ in BULK_UPDATE_FIELDS:
+                params.extend([field in patch, patch.get(field)])
+
+        columns = ', '.join(['task_id'] + [f'set_{field}, {field}' for field, _ in BULK_UPDATE_FIELDS])
+        assignments = ', '.join(
+            f'{field} = CASE WHEN v.set_{field} THEN v.{field} ELSE t.{field} END'
+            for field, _ in BULK_UPDATE_FIELDS
+        )
+
+        with transaction.atomic():
+            change_seq = bump_data_version(user_id)
+            with connection.cursor() as cursor:
+                old_keys = lock_rollup_keys(cursor, user_id, task_ids)
+                cursor.execute(f"""
+                    WITH v ({columns}) AS (VALUES {', '.join(rows)})
+                    UPDATE tasks_task AS t SET {assignments}, change_seq = %s
+                    FROM v
+                    WHERE t.id = v.task_id AND t.user_id = %s
+                    RETURNING id, date_created, tag_id, priority, is_completed
+                """, params + [change_seq, user_id])
+                updated = cursor.fetchall()
+            updated_ids = {row[0] for row in updated}
+            if updated_ids:
+                deltas = Counter(rollup_key(*row[1:]) for row in updated)
+                for row in updated:
+                    deltas[old_keys[row[0]]] -= 1
+                apply_rollup_deltas(user_id, deltas)
+            else:
+                transaction.set_rollback(True)
+
+        return Response({
+            'message': 'Tasks updated successfully',
+            'updated': [task_id for task_id in task_ids if task_id in updated_ids],
+            'not_found': [task_id for task_id in task_ids if task_id not in updated_ids],
+        }, status=status.HTTP_200_OK)
 
 
 class DeleteTaskView(APIView):
@@ -126,91 +334,105 @@ class DeleteTaskView(APIView):
         """
         Handles DELETE requests to delete a task for the authenticated user.
         """
-        authorization_token = request.headers.get("Authorization")
         task_id = request.data.get("task_id")
 
-        if not authorization_token:
+        if request.auth is None:
             return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
         if not task_id:
             return Response({'error': 'Task ID is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            token = Token.objects.get(key=authorization_token)
-            user_id = token.user_id
-        except Token.DoesNotExist:
-            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_401_UNAUTHORIZED)
+        user_id = request.user.id
 
-        with connection.cursor() as cursor:
+        with transaction.atomic(), connection.cursor() as cursor:
+            change_seq = bump_data_version(user_id)
             cursor.execute(
-                "DELETE FROM tasks_task WHERE id = %s AND user_id = %s",
+                "DELETE FROM tasks_task WHERE id = %s AND user_id = %s RETURNING id, date_created, tag_id, priority, is_completed",
                 [task_id, user_id]
             )
+            deleted = cursor.fetchone()
+            if deleted is None:
+                transaction.set_rollback(True)
+            else:
+                deltas = Counter()
+                deltas[rollup_key(*deleted[1:])] -= 1
+                apply_rollup_deltas(user_id, deltas)
+                record_tombstones(user_id, Tombstone.TASK, [deleted[0]], change_seq)
 
         return Response({'message': 'Task deleted successfully'}, status=status.HTTP_200_OK)
 
 
 class GetTasksView(APIView):
+    renderer_classes = TASK_LIST_RENDERERS
+
+    @routes_reads_to_replica
+    @conditional_on_data_version
     def get(self, request):
         """
         Handles GET requests to retrieve all tasks for the authenticated user.
         """
 
-        authorization_token = request.headers.get("Authorization")
-
-        if not authorization_token:
+        if request.auth is None:
             return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
+        user_id = request.user.id
+
         try:
-            token = Token.objects.get(key=authorization_token)
-            user_id = token.user_id
-        except Token.DoesNotExist:
-            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_401_UNAUTHORIZED)
+            page = parse_page_params(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        stream = wants_stream(request.query_params.get('stream', False))
+        if stream and page.limit is not None:
+            return Response({'error': 'Streaming cannot be combined with pagination.'}, status=status.HTTP_400_BAD_REQUEST)
+        format_error = stream_format_error(request) if stream else None
+        if format_error:
+            return Response({'error': format_error}, status=status.HTTP_406_NOT_ACCEPTABLE)
+
+        query, params = paginate_query(TASK_LIST_SELECT + """
+            WHERE t.user_id = %s
+        """, [user_id], page)
 
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT t.id, t.title, t.description, t.priority, 
-                       tg.id AS tag_id, tg.name AS tag_name, 
-                       t.date_created, t.is_completed 
-                FROM tasks_task t
-                LEFT JOIN tags_tag tg ON t.tag_id = tg.id
-                WHERE t.user_id = %s
-            """, [user_id])
+        if stream:
+            return stream_tasks(query, params, serialize_task, using=get_read_connection())
+
+        cache_key = task_result_cache.make_key(user_id, request.data_version, 'get', {'page': page})
+        cached = task_result_cache.get(cache_key)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
+
+        with get_read_connection().cursor() as cursor:
+            cursor.execute(query, params)
             tasks = cursor.fetchall()
 
-        task_list = []
-        for task in tasks:
-            task_list.append({
-                'id': task[0],
-                'title': task[1],
-                'description': task[2],
-                'priority': task[3],
-                'tag_id': task[4], 
-                'tag_name': task[5] or "No Tag",
-                'date_created': task[6].strftime("%Y-%m-%d"),
-                'is_completed': task[7]
-            })
+        tasks, next_cursor = split_page(tasks, page)
 
-        return Response({'tasks': task_list}, status=status.HTTP_200_OK)
+        task_list = [serialize_task(task) for task in tasks]
+
+        response_data = {'tasks': task_list}
+        if page.limit is not None:
+            response_data['next_cursor'] = next_cursor
+
+        task_result_cache.set(cache_key, response_data)
+
+        return Response(response_data, status=status.HTTP_200_OK)
 
 
 class GetTasksByDateView(APIView):
+    renderer_classes = TASK_LIST_RENDERERS
+
+    @routes_reads_to_replica
+    @conditional_on_data_version
     def post(self, request):
         """
         Handles POST requests to retrieve tasks for the authenticated user by date range.
 
 
         """
-        authorization_token = request.headers.get("Authorization")
-
-        if not authorization_token:
+        if request.auth is None:
             return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            token = Token.objects.get(key=authorization_token.strip())
-            user_id = token.user_id
-        except Token.DoesNotExist:
-            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_401_UNAUTHORIZED)
+        user_id = request.user.id
 
         start_date = request.data.get('start_date')
         end_date = request.data.get('end_date')
@@ -218,127 +440,318 @@ class GetTasksByDateView(APIView):
         if not start_date or not end_date:
             return Response({'error': 'Start date and end date are required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT t.id, t.title, t.description, t.priority, 
-                       tg.id AS tag_id, tg.name AS tag_name, 
-                       t.date_created, t.is_completed 
-                FROM tasks_task t
-                LEFT JOIN tags_tag tg ON t.tag_id = tg.id
-                WHERE t.user_id = %s AND t.date_created BETWEEN %s AND %s
-            """, [user_id, start_date, end_date])
-
+        try:
+            page = parse_page_params(request.data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        query, params = paginate_query(TASK_LIST_SELECT + """
+            WHERE t.user_id = %s AND t.date_created BETWEEN %s AND %s
+        """, [user_id, start_date, end_date], page)
+
+        cache_key = task_result_cache.make_key(user_id, request.data_version, 'get-by-date', {
+            'start_date': start_date,
+            'end_date': end_date,
+            'page': page,
+        })
+        cached = task_result_cache.get(cache_key)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
+
+        with get_read_connection().cursor() as cursor:
+            cursor.execute(query, params)
             tasks = cursor.fetchall()
 
-        task_list = []
-        for task in tasks:
-            task_list.append({
-                'id': task[0],
-                'title': task[1],
-                'description': task[2],
-                'priority': task[3],
-                'tag_id': task[4],
-                'tag_name': task[5] or "No Tag",
-                'date_created': task[6].strftime("%Y-%m-%d"),
-                'is_completed': task[7]
-            })
+        tasks, next_cursor = split_page(tasks, page)
 
-        return Response({'tasks': task_list}, status=status.HTTP_200_OK)
+        task_list = [serialize_task(task) for task in tasks]
+
+        response_data = {'tasks': task_list}
+        if page.limit is not None:
+            response_data['next_cursor'] = next_cursor
+
+        task_result_cache.set(cache_key, response_data)
+
+        return Response(response_data, status=status.HTTP_200_OK)
 
 
 class FilterTasksView(APIView):
+    renderer_classes = TASK_LIST_RENDERERS
+
+    @routes_reads_to_replica
+    @conditional_on_data_version
     def post(self, request):
 
         """
         Handles POST requests to filter tasks for the authenticated user based on 
         criteria.
         """
-        authorization_token = request.headers.get("Authorization")
-        
-        if not authorization_token:
+        if request.auth is None:
             return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            token = Token.objects.get(key=authorization_token)
-            user_id = token.user_id
-        except Token.DoesNotExist:
-            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        user_id = request.user.id
         
         data = request.data
-        tags = data.get('tags', [])  # Expecting list of tag IDs
-        start_date = data.get('start_date')  # Start date for range
-        end_date = data.get('end_date')      # End date for range
-        completed = data.get('completed', 'all')  # 'true', 'false', 'all'
-        priority = data.get('priority')  # 'low', 'medium', 'high'
-        
-        query = """
-            SELECT t.id, t.title, t.description, t.priority, 
-                   tg.id AS tag_id, tg.name AS tag_name, 
-                   t.date_created, t.is_completed 
-            FROM tasks_task t
-            LEFT JOIN tags_tag tg ON t.tag_id = tg.id
-            WHERE t.user_id = %s
-        """
-        params = [user_id]
-        
-        if tags:
-            if not isinstance(tags, list):
-                return Response({'error': 'Tags must be a list of tag IDs.'}, status=status.HTTP_400_BAD_REQUEST)
-            try:
-                tag_ids = [int(tag_id) for tag_id in tags]
-            except ValueError:
-                return Response({'error': 'Invalid tag IDs provided.'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            placeholders = ','.join(['%s'] * len(tag_ids))
-            query += f" AND t.tag_id IN ({placeholders})"
-            params.extend(tag_ids)
-        
+        read_connection = get_read_connection()
 
+        try:
+            filter_sql, filter_params, filters = build_task_filters(data, read_connection.vendor)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        if start_date and end_date:
-            query += " AND t.date_created BETWEEN %s AND %s"
-            params.extend([start_date, end_date])
-        elif start_date and not end_date:
-            query += " AND t.date_created >= %s"
-            params.append(start_date)
-        elif not start_date and end_date:
-            query += " AND t.date_created <= %s"
-            params.append(end_date)
+        query = TASK_LIST_SELECT + """
+            WHERE t.user_id = %s
+        """ + filter_sql
+        params = [user_id] + filter_params
         
-        if completed.lower() == 'true':
-            query += " AND t.is_completed = TRUE"
-        elif completed.lower() == 'false':
-            query += " AND t.is_completed = FALSE"
+        try:
+            page = parse_page_params(data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        stream = wants_stream(data.get('stream', False))
+        if stream and page.limit is not None:
+            return Response({'error': 'Streaming cannot be combined with pagination.'}, status=status.HTTP_400_BAD_REQUEST)
+        format_error = stream_format_error(request) if stream else None
+        if format_error:
+            return Response({'error': format_error}, status=status.HTTP_406_NOT_ACCEPTABLE)
+
+        query, params = paginate_query(query, params, page)
+
+        if stream:
+            return stream_tasks(query, params, serialize_filtered_task, using=read_connection)
+
+        cache_key = task_result_cache.make_key(user_id, request.data_version, 'filter', dict(filters, page=page))
+        cached = task_result_cache.get(cache_key)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
         
-        if priority:
-            priority_mapping = {
-                'low': 1,
-                'medium': 2,
-                'high': 3
-            }
-            priority_value = priority.lower()
-            if priority_value not in priority_mapping:
-                return Response({'error': 'Invalid priority value.'}, status=status.HTTP_400_BAD_REQUEST)
-            query += " AND t.priority = %s"
-            params.append(priority_mapping[priority_value])
+        # The query text is one of a fixed set of filter and page shapes
+        with read_connection.cursor() as cursor:
+            execute_prepared(cursor, query, params)
+            tasks = cursor.fetchall()
+
+        tasks, next_cursor = split_page(tasks, page)
         
-        query += " ORDER BY t.date_created ASC"
+        task_list = [serialize_filtered_task(task) for task in tasks]
         
-        with connection.cursor() as cursor:
+        response_data = {'tasks': task_list}
+        if page.limit is not None:
+            response_data['next_cursor'] = next_cursor
+
+        task_result_cache.set(cache_key, response_data)
+
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class SearchTasksView(APIView):
+    renderer_classes = TASK_LIST_RENDERERS
+    columnar_extra_fields = ('rank',)
+
+    @routes_reads_to_replica
+    @conditional_on_data_version
+    def post(self, request):
+        """
+        Handles POST requests to full-text search the authenticated user's tasks,
+        ranked by relevance and narrowed by the same filters as FilterTasksView.
+        """
+        if request.auth is None:
+            return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if get_read_connection().vendor != 'postgresql':
+            return Response({'error': 'Full-text search requires PostgreSQL'}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        user_id = request.user.id
+        data = request.data
+
+        search_query = str(data.get('query', '')).strip()
+        if not search_query:
+            return Response({'error': 'Search query is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            filter_sql, filter_params, filters = build_task_filters(data)
+            limit = parse_limit(data.get('limit'))
+            after = decode_rank_cursor(data['cursor']) if data.get('cursor') else None
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        cache_key = task_result_cache.make_key(user_id, request.data_version, 'search', dict(
+            filters, query=search_query, limit=limit, after=after
+        ))
+        cached = task_result_cache.get(cache_key)
+        if cached is not None:
+            return Response(cached, status=status.HTTP_200_OK)
+
+        # search_vector and its GIN index come from migration 0003
+        query = """
+            SELECT * FROM (
+                SELECT t.id, t.title, t.description, t.priority, 
+                       tg.id AS tag_id, tg.name AS tag_name, 
+                       t.date_created, t.is_completed,
+                       -- float8, so the ordering and the keyset comparison see the value the cursor holds
+                       ts_rank(t.search_vector, q.query)::float8 AS rank
+                FROM tasks_task t
+                CROSS JOIN websearch_to_tsquery(%s, %s) AS q(query)
+                LEFT JOIN tags_tag tg ON t.tag_id = tg.id
+                WHERE t.user_id = %s AND t.search_vector @@ q.query
+        """ + filter_sql + """
+            ) ranked
+        """
+        params = [SEARCH_CONFIG, search_query, user_id] + filter_params
+
+        if after is not None:
+            query += " WHERE (ranked.rank, ranked.id) < (%s, %s)"
+            params.extend(after)
+        query += " ORDER BY ranked.rank DESC, ranked.id DESC LIMIT %s"
+        params.append(limit + 1)
+
+        with get_read_connection().cursor() as cursor:
             cursor.execute(query, params)
             tasks = cursor.fetchall()
-        
+
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_rank_cursor(tasks[-1][8], tasks[-1][0])
+
         task_list = []
         for task in tasks:
-            task_list.append({
-                'id': task[0],
-                'title': task[1],
-                'description': task[2],
-                'priority': dict(Task.PRIORITY_CHOICES).get(task[3], 'Unknown'),
-                'tag_id': task[4],
-                'tag_name': task[5] or "No Tag",
-                'date_created': task[6].strftime("%Y-%m-%d"),
-                'is_completed': task[7]
+            row = serialize_filtered_task(task)
+            row['rank'] = task[8]
+            task_list.append(row)
+
+        response_data = {'tasks': task_list, 'next_cursor': next_cursor}
+
+        task_result_cache.set(cache_key, response_data)
+
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class TaskStatsView(APIView):
+    @routes_reads_to_replica
+    @conditional_on_data_version
+    def get(self, request):
+        """
+        Handles GET requests for task counts per completion state, priority, tag and
+        day, read from TaskDailyRollup rather than tasks_task.
+        """
+        if request.auth is None:
+            return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.id
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        try:
+            start_date = datetime.date.fromisoformat(start_date) if start_date else None
+            end_date = datetime.date.fromisoformat(end_date) if end_date else None
+        except ValueError:
+            return Response({'error': 'Dates must be in YYYY-MM-DD format'}, status=status.HTTP_400_BAD_REQUEST)
+
+        query = """
+            SELECT r.date, r.tag_id, tg.name AS tag_name, r.priority, r.is_completed, r.task_count
+            FROM tasks_taskdailyrollup r
+            LEFT JOIN tags_tag tg ON r.tag_id = tg.id
+            WHERE r.user_id = %s
+        """
+        params = [user_id]
+        if start_date:
+            query += " AND r.date >= %s"
+            params.append(start_date)
+        if end_date:
+            query += " AND r.date <= %s"
+            params.append(end_date)
+        query += " ORDER BY r.date ASC"
+
+        with get_read_connection().cursor() as cursor:
+            cursor.execute(query, params)
+            rollups = cursor.fetchall()
+
+        priority_labels = dict(Task.PRIORITY_CHOICES)
+        totals = {'total': 0, 'completed': 0, 'open': 0}
+        by_priority = {label: 0 for label in priority_labels.values()}
+        by_tag = {}
+        by_day = {}
+        for date, tag_id, tag_name, priority, is_completed, task_count in rollups:
+            completed_count = task_count if is_completed else 0
+
+            totals['total'] += task_count
+            totals['completed' if is_completed else 'open'] += task_count
+
+            label = priority_labels.get(priority, 'Unknown')
+            by_priority[label] = by_priority.get(label, 0) + task_count
+
+            tag_stats = by_tag.setdefault(tag_id, {
+                'tag_id': tag_id, 'tag_name': tag_name or "No Tag", 'total': 0, 'completed': 0
             })
-        
-        return Response({'tasks': task_list}, status=status.HTTP_200_OK)
+            tag_stats['total'] += task_count
+            tag_stats['completed'] += completed_count
+
+            day = date.strftime("%Y-%m-%d")
+            day_stats = by_day.setdefault(day, {'date': day, 'total': 0, 'completed': 0})
+            day_stats['total'] += task_count
+            day_stats['completed'] += completed_count
+
+        return Response(dict(
+            totals,
+            by_priority=by_priority,
+            by_tag=list(by_tag.values()),
+            by_day=list(by_day.values()),
+        ), status=status.HTTP_200_OK)
+
+
+class ExportTasksView(APIView):
+    renderer_classes = EXPORT_RENDERERS
+
+    @routes_reads_to_replica
+    def get(self, request):
+        """
+        Handles GET requests to stream all of the authenticated user's tasks (and, in NDJSON, tags)
+        as NDJSON or CSV, picked with the Accept header or ?format=ndjson / ?format=csv.
+        """
+        if request.auth is None:
+            return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.id
+
+        if request.accepted_renderer.format == 'csv':
+            content, content_type = iter_csv(user_id, get_read_connection()), 'text/csv; charset=utf-8'
+        else:
+            content, content_type = iter_ndjson(user_id, get_read_connection()), 'application/x-ndjson'
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="tasks.{request.accepted_renderer.format}"'
+        return response
+
+
+class ImportTasksView(APIView):
+    def post(self, request):
+        """
+        Handles POST requests to import tasks and tags from an NDJSON or CSV file, uploaded as the
+        request body or as the `file` field of a multipart form.
+        """
+        if request.auth is None:
+            return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.id
+
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                return Response({'error': 'A file is required'}, status=status.HTTP_400_BAD_REQUEST)
+            lines, file_format = upload, import_format(upload.content_type, upload.name)
+        else:
+            lines, file_format = request.stream, import_format(request.content_type)
+            if lines is None:
+                return Response({'error': 'A file is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if file_format is None:
+            return Response({'error': 'Upload NDJSON (application/x-ndjson) or CSV (text/csv)'}, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        try:
+            with transaction.atomic():
+                change_seq = bump_data_version(user_id)
+                result = import_tasks(user_id, change_seq, lines, file_format)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(dict(message='Tasks imported successfully', **result), status=status.HTTP_201_CREATED)
@@ -0,0 +1,195 @@
+import hashlib
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils.functional import SimpleLazyObject
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.authtoken.models import Token
+from users.models import CustomUser
+
+# Alias in settings.CACHES; LocMemCache by default, shared when TOKEN_CACHE_URL is set
+TOKEN_CACHE_ALIAS = 'tokens'
+
+
+class TokenCache:
+    """
+    Token key -> user id, with hit/miss counters. Only the id is cached; the
+    user itself is loaded fresh when a view needs more than that (CachedUser).
+
+    Entries are removed explicitly when a token or user is deleted. That
+    reaches every worker only when the alias is shared (TOKEN_CACHE_URL);
+    otherwise other processes drop the entry within TOKEN_CACHE_TTL seconds.
+    """
+
+    def __init__(self, alias=TOKEN_CACHE_ALIAS):
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @staticmethod
+    def _token_key(key):
+        # Raw tokens stay out of the cache backend
+        return 'token:' + hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def _user_key(user_id):
+        return f'token-user:{user_id}'
+
+    def _count(self, user_id):
+        with self._lock:
+            if user_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return user_id
+
+    def get(self, key):
+        return self._count(self.backend.get(self._token_key(key)))
+
+    async def aget(self, key):
+        return self._count(await self.backend.aget(self._token_key(key)))
+
+    def set(self, key, user_id):
+        # The reverse entry lets invalidate_user() find the token (one per user)
+        self.backend.set_many({self._token_key(key): user_id, self._user_key(user_id): key})
+
+    async def aset(self, key, user_id):
+        await self.backend.aset_many({self._token_key(key): user_id, self._user_key(user_id): key})
+
+    def invalidate(self, key):
+        self.backend.delete(self._token_key(key))
+
+    def invalidate_user(self, user_id):
+        key = self.backend.get(self._user_key(user_id))
+        self.backend.delete_many([self._user_key(user_id)] + ([self._token_key(key)] if key else []))
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'shared': bool(settings.TOKEN_CACHE_URL),
+                'ttl': settings.TOKEN_CACHE_TTL,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+token_cache = TokenCache()
+
+
+def _load_user(user_id):
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if user is None or not user.is_active:
+        raise exceptions.AuthenticationFailed('User inactive or deleted')
+    return user
+
+
+class CachedUser(SimpleLazyObject):
+    """
+    request.user for a token found in the cache. id and pk need no query; any
+    other attribute loads the user from the database on first use, so
+    is_staff and is_active are always current.
+    """
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id):
+        super().__init__(lambda: _load_user(user_id))
+        self.__dict__['_user_id'] = user_id
+
+    @property
+    def id(self):
+        return self.__dict__['_user_id']
+
+    pk = id
+
+
+def _check_active(token):
+    if not token.user.is_active:
+        raise exceptions.AuthenticationFailed('User inactive or deleted')
+
+
+class CachedTokenAuthentication(BaseAuthentication):
+    """
+    Authenticates the raw token sent in the Authorization header, serving
+    repeat lookups from the token cache.
+    """
+
+    def authenticate(self, request):
+        key = request.headers.get("Authorization", "").strip()
+        if not key:
+            return None
+
+        user_id = token_cache.get(key)
+        if user_id is not None:
+            return CachedUser(user_id), key
+
+        try:
+            token = Token.objects.select_related('user').get(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid or expired token')
+        _check_active(token)
+
+        token_cache.set(key, token.user_id)
+        return token.user, key
+
+    def authenticate_header(self, request):
+        return 'Token'
+
+
+async def aauthenticate(request):
+    """
+    Async counterpart of CachedTokenAuthentication for plain Django async views.
+
+    Returns the user id for the request's token, or None when no token was sent.
+    Misses load the token in a worker thread.
+    """
+    return await aauthenticate_key(request.headers.get("Authorization", "").strip())
+
+
+async def aauthenticate_key(key):
+    """
+    Same as aauthenticate, for callers holding the raw token key.
+    """
+    if not key:
+        return None
+
+    user_id = await token_cache.aget(key)
+    if user_id is not None:
+        return user_id
+
+    try:
+        token = await sync_to_async(Token.objects.select_related('user').get)(key=key)
+    except Token.DoesNotExist:
+        raise exceptions.AuthenticationFailed('Invalid or expired token')
+    _check_active(token)
+
+    await token_cache.aset(key, token.user_id)
+    return token.user_id
+
+
+@receiver(post_delete, sender=Token)
+def _invalidate_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_delete, sender=CustomUser)
+def _invalidate_deleted_user(sender, instance, **kwargs):
+    token_cache.invalidate_user(instance.pk)
@@ -0,0 +1,41 @@
+"""
+Password hashers whose work factor comes from settings.PASSWORD_HASH_WORK_FACTOR.
+
+They keep Django's algorithm names, so existing hashes still verify. Django's
+must_update() then reports hashes made with another work factor, and those are
+rehashed on the user's next login.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+def _work_factor(default):
+    return settings.PASSWORD_HASH_WORK_FACTOR or default
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return _work_factor(hashers.PBKDF2PasswordHasher.iterations)
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    # scrypt's N parameter; must be a power of two
+    @property
+    def work_factor(self):
+        return _work_factor(hashers.ScryptPasswordHasher.work_factor)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return _work_factor(hashers.Argon2PasswordHasher.time_cost)
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    # log2 of the number of rounds
+    @property
+    def rounds(self):
+        return _work_factor(hashers.BCryptSHA256PasswordHasher.rounds)
+
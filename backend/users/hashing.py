@@ -0,0 +1,160 @@
+"""
+Password hashing on a bounded process pool.
+
+Hashing is deliberately CPU-heavy. Running it on the request thread lets a login
+storm take every core away from the rest of the API. Instead, jobs run on
+PASSWORD_HASH_WORKERS processes. At most PASSWORD_HASH_MAX_QUEUE jobs may be
+running or waiting at once; beyond that, callers get HashingBusy right away
+and the views answer 429.
+
+The pool and the queue limit are per server process: with N gunicorn workers
+there are N pools, so PASSWORD_HASH_WORKERS defaults to the cores divided by
+WEB_CONCURRENCY.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = None
+_hash_seconds = None
+
+
+class HashingBusy(Exception):
+    """
+    Raised when the hashing queue is full.
+    """
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _make_password(password):
+    return make_password(password)
+
+
+def _check_password(password, encoded):
+    # Django calls the setter only for a valid password whose hash uses an
+    # outdated hasher or work factor; the new hash is sent back to the caller.
+    rehashed = []
+    valid = check_password(password, encoded, setter=lambda raw: rehashed.append(make_password(raw)))
+    return valid, rehashed[0] if rehashed else None
+
+
+def _get_executor():
+    global _executor, _slots
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_QUEUE)
+                # spawn, not fork: the parent has open database connections and
+                # server threads that a forked child must not inherit
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                )
+    return _executor
+
+
+def _time_make_password():
+    started = time.perf_counter()
+    make_password('timing-probe')
+    return time.perf_counter() - started
+
+
+def _make_passwords(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def _run_many(func, arg_lists):
+    """
+    Runs func(*args) for each entry of arg_lists on the pool, taking one queue
+    slot per job up front so a batch is either admitted whole or rejected.
+    """
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return [func(*args) for args in arg_lists]
+
+    executor = _get_executor()
+    acquired = 0
+    for _ in arg_lists:
+        if not _slots.acquire(blocking=False):
+            for _ in range(acquired):
+                _slots.release()
+            raise HashingBusy()
+        acquired += 1
+
+    futures = []
+    try:
+        for args in arg_lists:
+            futures.append(executor.submit(func, *args))
+    except Exception:
+        for _ in range(acquired - len(futures)):
+            _slots.release()
+        raise
+    finally:
+        for future in futures:
+            future.add_done_callback(lambda _: _slots.release())
+    return [future.result() for future in futures]
+
+
+def _run(func, *args):
+    return _run_many(func, [args])[0]
+
+
+def hash_password(password):
+    """
+    Hashes a new password with the preferred hasher. Raises HashingBusy.
+    """
+    return _run(_make_password, password)
+
+
+def hash_passwords(passwords):
+    """
+    Hashes a batch of new passwords, split across the pool's workers so a
+    batch takes at most one queue slot per worker. Raises HashingBusy.
+    """
+    if not passwords:
+        return []
+    workers = min(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+    chunk_count = min(len(passwords), max(workers, 1))
+    chunk_size = -(-len(passwords) // chunk_count)
+    chunks = [passwords[start:start + chunk_size] for start in range(0, len(passwords), chunk_size)]
+    return [encoded for chunk in _run_many(_make_passwords, [(chunk,) for chunk in chunks]) for encoded in chunk]
+
+
+def batch_limit(seconds):
+    """
+    Returns how many new passwords hash_passwords can hash in about `seconds`
+    on an idle pool. The cost of one hash is measured on the pool the first
+    time, since it depends on the hasher, its work factor and the hardware.
+    Raises HashingBusy.
+    """
+    global _hash_seconds
+    if _hash_seconds is None:
+        _hash_seconds = _run(_time_make_password)
+    return int(seconds * max(1, settings.PASSWORD_HASH_WORKERS) / _hash_seconds)
+
+
+def verify_password(password, encoded):
+    """
+    Checks a password against its stored hash. Returns (valid, new_hash), where
+    new_hash is set when the stored hash should be replaced. Raises HashingBusy.
+    """
+    return _run(_check_password, password, encoded)
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
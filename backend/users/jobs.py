@@ -0,0 +1,24 @@
+from django.db import connection
+from users.authentication import token_cache
+from users.models import CustomUser
+
+
+def delete_user(payload, chunk_size):
+    """
+    Job handler for DeleteUserView: deletes the user's tasks one chunk at a
+    time, then the user, whose tags, rollups and tokens cascade with it.
+    """
+    user_id = payload['user_id']
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            DELETE FROM tasks_task
+            WHERE id IN (SELECT id FROM tasks_task WHERE user_id = %s LIMIT %s)
+        """, [user_id, chunk_size])
+        deleted = cursor.rowcount
+
+    if deleted == chunk_size:
+        return deleted, False
+
+    CustomUser.objects.filter(pk=user_id).delete()
+    token_cache.invalidate_user(user_id)
+    return deleted, True
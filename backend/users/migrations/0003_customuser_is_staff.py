@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-18 18:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_customuser_data_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='is_staff',
+            field=models.BooleanField(default=False),
+        ),
+    ]
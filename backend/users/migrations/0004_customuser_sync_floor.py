@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_customuser_is_staff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='sync_floor',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -7,6 +7,13 @@ class CustomUser(AbstractBaseUser):
     name = models.CharField(max_length=100)
     # Store hashed passwords
     password = models.CharField(max_length=128)  
+    # Bumped by every task/tag write; read endpoints derive their ETag from it
+    data_version = models.BigIntegerField(default=0)
+    # Highest change_seq whose tombstones were pruned; /api/sync/ answers an
+    # older `since` with a full sync
+    sync_floor = models.BigIntegerField(default=0)
+    # Grants the diagnostics endpoints
+    is_staff = models.BooleanField(default=False)
 
     USERNAME_FIELD = 'username'
     REQUIRED_FIELDS = ['email']
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import RegisterView, LoginView, DeleteUserView
+from .views import RegisterView, BulkRegisterView, LoginView, DeleteUserView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
+    path('bulk-register/', BulkRegisterView.as_view(), name='bulk_register'),
     path('login/', LoginView.as_view(), name='login'),
     path('delete/', DeleteUserView.as_view(), name='delete_user'),
 ]
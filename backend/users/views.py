@@ -1,11 +1,26 @@
-from django.contrib.auth.hashers import make_password, check_password
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.authtoken.models import Token
+from jobs.queue import enqueue
 from users.models import CustomUser
+from users.authentication import token_cache
+from users.hashing import HashingBusy, batch_limit, hash_password, hash_passwords, verify_password
+
+MAX_BULK_REGISTER_SIZE = 1000
+
+
+def hashing_busy_response():
+    response = Response({'error': 'Too many requests, please try again shortly'}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    response['Retry-After'] = '1'
+    return response
+
 
 class RegisterView(APIView):
+    authentication_classes = []
+
     def post(self, request):
         """
         Handles user registration using Django ORM.
@@ -25,8 +40,11 @@ class RegisterView(APIView):
         if CustomUser.objects.filter(email=email).exists():
             return Response({'error': 'Email already taken'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Hash the password
-        hashed_password = make_password(password)
+        # Hash the password on the hashing pool
+        try:
+            hashed_password = hash_password(password)
+        except HashingBusy:
+            return hashing_busy_response()
 
         # Create the user using ORM
         user = CustomUser.objects.create(username=username, email=email, name=name, password=hashed_password)
@@ -37,7 +55,96 @@ class RegisterView(APIView):
         return Response({'token': token.key}, status=status.HTTP_201_CREATED)
 
 
+class BulkRegisterView(APIView):
+    authentication_classes = []
+
+    def post(self, request):
+        """
+        Handles registration of many users at once, reporting success or an error per row.
+        """
+        users = request.data.get('users')
+        if not users or not isinstance(users, list):
+            return Response({'error': 'Users must be a non-empty list of users.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Hashing the whole batch has to finish within the request, so the
+        # limit also depends on how long one hash takes on this server
+        try:
+            max_size = max(1, min(MAX_BULK_REGISTER_SIZE, batch_limit(settings.BULK_REGISTER_HASH_SECONDS)))
+        except HashingBusy:
+            return hashing_busy_response()
+        if len(users) > max_size:
+            return Response({'error': f'At most {max_size} users can be registered per request.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_lengths = {field: CustomUser._meta.get_field(field).max_length for field in ('username', 'email', 'name')}
+        errors = {}
+        for index, entry in enumerate(users):
+            if not isinstance(entry, dict) or not all(
+                entry.get(field) and isinstance(entry[field], str) for field in ('username', 'email', 'password')
+            ):
+                errors[index] = 'Missing required fields'
+                continue
+            for field, max_length in max_lengths.items():
+                if len(str(entry.get(field, ''))) > max_length:
+                    errors[index] = f'{field.capitalize()} is too long'
+                    break
+
+        # Check uniqueness for the whole batch with one query per column, then
+        # within the batch itself
+        candidates = [index for index in range(len(users)) if index not in errors]
+        taken = {
+            field: set(CustomUser.objects.filter(
+                **{f'{field}__in': [users[index][field] for index in candidates]}
+            ).values_list(field, flat=True))
+            for field in ('username', 'email')
+        }
+        seen = {'username': set(), 'email': set()}
+        for index in candidates:
+            for field in ('username', 'email'):
+                value = users[index][field]
+                if value in taken[field] or value in seen[field]:
+                    errors[index] = f'{field.capitalize()} already taken'
+                    break
+            else:
+                seen['username'].add(users[index]['username'])
+                seen['email'].add(users[index]['email'])
+
+        valid = [index for index in candidates if index not in errors]
+        try:
+            hashed_passwords = hash_passwords([users[index]['password'] for index in valid])
+        except HashingBusy:
+            return hashing_busy_response()
+
+        new_users = [
+            CustomUser(
+                username=users[index]['username'],
+                email=users[index]['email'],
+                name=users[index].get('name', ''),
+                password=hashed_password,
+            )
+            for index, hashed_password in zip(valid, hashed_passwords)
+        ]
+        try:
+            with transaction.atomic():
+                CustomUser.objects.bulk_create(new_users)
+                tokens = Token.objects.bulk_create([Token(key=Token.generate_key(), user=user) for user in new_users])
+        except IntegrityError:
+            # A concurrent registration took one of the names after the check above
+            return Response({'error': 'Username or email already taken, please retry'}, status=status.HTTP_409_CONFLICT)
+
+        results = [{'index': index, 'error': error} for index, error in errors.items()]
+        results += [
+            {'index': index, 'username': users[index]['username'], 'token': token.key}
+            for index, token in zip(valid, tokens)
+        ]
+        results.sort(key=lambda result: result['index'])
+
+        response_status = status.HTTP_201_CREATED if tokens else status.HTTP_400_BAD_REQUEST
+        return Response({'created': len(tokens), 'failed': len(errors), 'results': results}, status=response_status)
+
+
 class LoginView(APIView):
+    authentication_classes = []
+
     def post(self, request):
         """
         Handles user login using Django ORM.
@@ -54,9 +161,19 @@ class LoginView(APIView):
         except CustomUser.DoesNotExist:
             return Response({'error': 'Invalid login credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
-        if not check_password(password, user.password):
+        try:
+            valid, new_hash = verify_password(password, user.password)
+        except HashingBusy:
+            return hashing_busy_response()
+
+        if not valid:
             return Response({'error': 'Invalid login credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
+        # Upgrade hashes made with an older hasher or work factor, unless the
+        # password was changed while we were checking it
+        if new_hash:
+            CustomUser.objects.filter(pk=user.pk, password=user.password).update(password=new_hash)
+
         # Generate or get existing authentication token
         token, _ = Token.objects.get_or_create(user=user)
 
@@ -68,22 +185,22 @@ class DeleteUserView(APIView):
         """
         Handles user deletion using Django ORM.
         """
-        authorization_token = request.headers.get("Authorization")
-
-        if not authorization_token:
+        if request.auth is None:
             return Response({'error': 'Authorization token is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            # Fetch the user associated with the token
-            token = Token.objects.get(key=authorization_token)
-            user = token.user
-        except Token.DoesNotExist:
-            return Response({'error': 'Invalid or expired token'}, status=status.HTTP_401_UNAUTHORIZED)
-
-        # Delete related records using ORM
-        user.tasks_task_set.all().delete()
-        user.tags_tag_set.all().delete()
-        token.delete()
-        user.delete()
-
-        return Response({'message': 'User and all associated data deleted successfully'}, status=status.HTTP_200_OK)
+        user = request.user
+
+        # Revoke the token and password now; the data itself is deleted in
+        # chunks by a background worker (see users/jobs.py)
+        with transaction.atomic():
+            Token.objects.filter(user=user).delete()
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+            job = enqueue('delete_user', {'user_id': user.id}, user_id=user.id)
+
+        # Every worker stops accepting the token once its cache entry is gone:
+        # at once with a shared token cache, otherwise within TOKEN_CACHE_TTL
+        token_cache.invalidate(request.auth)
+        token_cache.invalidate_user(user.id)
+
+        return Response({'message': 'User deletion scheduled', 'job_id': str(job.id)}, status=status.HTTP_202_ACCEPTED)